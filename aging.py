@@ -0,0 +1,86 @@
+"""Stock aging: how long pieces sit on the shelf and how long they take to sell.
+
+Ages are whole days from datetime64 arithmetic over the whole stock table:
+``now - date_added`` for IN_STOCK pieces and ``sold_date - date_added`` for
+SOLD ones.  Each age is bucketed with one ``searchsorted`` against the
+bucket edges, and per (product, length) totals come from ``bincount`` over
+combined SKU/bucket codes, so no Python loop touches individual pieces.
+"""
+import numpy as np
+import pandas as pd
+
+# First day of each bucket
+AGE_EDGES = np.array([0, 31, 61, 91, 181, 366])
+AGE_LABELS = ["0-30 days", "31-60 days", "61-90 days", "91-180 days", "181-365 days", "Over 365 days"]
+
+REPORTS = ["Pieces in Stock", "Capital Tied Up", "Time to Sell"]
+
+SKU = ["product_name", "length_m"]
+TOTAL = "Total"
+
+
+def age_days(later, earlier):
+    """Whole days from ``earlier`` to ``later`` (datetime64 arrays); NaN where either is missing"""
+    days = (later - earlier) / np.timedelta64(1, "D")
+    return np.floor(days)
+
+
+def bucket(days):
+    """Index into AGE_LABELS per age in days; ages below 0 count as 0"""
+    return np.searchsorted(AGE_EDGES, np.maximum(days, 0), side="right") - 1
+
+
+def _table(sku_codes, skus, days, weights=None):
+    """Per-SKU totals of ``weights`` (or counts) by age bucket, with an average age, plus a totals line"""
+    valid = ~np.isnan(days)
+    sku_codes, days = sku_codes[valid], days[valid]
+    weights = np.ones(len(days)) if weights is None else weights[valid]
+
+    n_buckets = len(AGE_LABELS)
+    cells = np.bincount(sku_codes * n_buckets + bucket(days), weights=weights,
+                        minlength=len(skus) * n_buckets).reshape(len(skus), n_buckets)
+    pieces = np.bincount(sku_codes, minlength=len(skus))
+    total_days = np.bincount(sku_codes, weights=days, minlength=len(skus))
+
+    table = pd.DataFrame(cells, columns=AGE_LABELS, index=skus)
+    table[TOTAL] = cells.sum(axis=1)
+    table["Avg Days"] = np.divide(total_days, pieces, out=np.zeros(len(skus)), where=pieces > 0)
+    table["Max Days"] = pd.Series(days).groupby(sku_codes).max().reindex(range(len(skus)), fill_value=0).to_numpy()
+    table = table[pieces > 0].rename_axis(SKU).reset_index()
+
+    totals = {label: table[label].sum() for label in AGE_LABELS + [TOTAL]}
+    totals.update({"product_name": TOTAL, "length_m": "",
+                   "Avg Days": days.mean() if len(days) else 0, "Max Days": days.max() if len(days) else 0})
+    return pd.concat([table, pd.DataFrame([totals])], ignore_index=True)
+
+
+def aging_report(df_stock, now=None):
+    """``{report name: table}`` for REPORTS over ``df_stock``.
+
+    Pieces in Stock and Capital Tied Up (unit cost) bucket IN_STOCK pieces
+    by days since they were added; Time to Sell buckets SOLD pieces by days
+    from being added to being sold.
+    """
+    now = np.datetime64(pd.Timestamp.now() if now is None else pd.Timestamp(now), "ns")
+
+    # SKU codes from the product and length codes, which are much cheaper to factorize than pairs
+    names, name_values = pd.factorize(df_stock["product_name"], sort=True)
+    lengths, length_values = pd.factorize(df_stock["length_m"].round(), sort=True)
+    known = (names >= 0) & (lengths >= 0)
+    sku_codes, pairs = pd.factorize(names[known] * len(length_values) + lengths[known], sort=True)
+    skus = pd.MultiIndex.from_arrays([name_values[pairs // len(length_values)],
+                                      length_values[pairs % len(length_values)].astype(int)])
+
+    added = df_stock["date_added"].to_numpy(dtype="datetime64[ns]")[known]
+    status = df_stock["status"].to_numpy()[known]
+    in_stock = status == "IN_STOCK"
+    shelf_days = age_days(now, added[in_stock])
+    sold = status == "SOLD"
+    sell_days = age_days(df_stock["sold_date"].to_numpy(dtype="datetime64[ns]")[known][sold], added[sold])
+    unit_cost = df_stock["unit_cost"].fillna(0).to_numpy(dtype=float)[known]
+
+    return {
+        "Pieces in Stock": _table(sku_codes[in_stock], skus, shelf_days),
+        "Capital Tied Up": _table(sku_codes[in_stock], skus, shelf_days, unit_cost[in_stock]),
+        "Time to Sell": _table(sku_codes[sold], skus, sell_days),
+    }
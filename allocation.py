@@ -0,0 +1,194 @@
+"""Allocation of IN_STOCK pieces to cart lines.
+
+Every (product, length) pair keeps a priority queue of its IN_STOCK stock rows,
+ordered by the selected strategy, so allocating N pieces costs O(N log n)
+heap pops instead of a scan of the stock table.  Cart validation, price
+overrides, per-piece profit and line totals are then worked out for all
+lines of a batch of carts in one vectorized pass.
+"""
+import heapq
+
+import numpy as np
+import pandas as pd
+
+SKU = ["product_name", "length_m"]
+
+# Strategy name -> description shown in the UI
+STRATEGIES = {
+    "FIFO": "Oldest stock first (date added)",
+    "LOWEST_COST": "Cheapest cost layer first",
+    "HIGHEST_COST": "Most expensive cost layer first",
+}
+DEFAULT_STRATEGY = "FIFO"
+
+_NO_DATE = np.iinfo(np.int64).max
+
+
+def _date_keys(dates):
+    """Dates as sortable int64 nanoseconds, missing dates last"""
+    values = pd.to_datetime(dates, errors="coerce")
+    return np.where(values.isna(), _NO_DATE, values.to_numpy(dtype="datetime64[ns]").astype(np.int64))
+
+
+def strategy_keys(df, strategy):
+    """Priority tuples ``(primary, date_added, row)`` for the rows of ``df``.
+
+    Pieces without a unit cost come last under the cost strategies; NaN keys
+    would not compare and would break the heap order.
+    """
+    added = _date_keys(df["date_added"])
+    if strategy == "FIFO":
+        primary = added
+    elif strategy == "LOWEST_COST":
+        primary = np.nan_to_num(df["unit_cost"].to_numpy(dtype=float), nan=np.inf)
+    elif strategy == "HIGHEST_COST":
+        primary = np.nan_to_num(-df["unit_cost"].to_numpy(dtype=float), nan=np.inf)
+    else:
+        raise ValueError(f"Unknown allocation strategy: {strategy}")
+    return list(zip(primary.tolist(), added.tolist(), df.index.tolist()))
+
+
+class StockQueues:
+    """Per-(product, length) heaps of IN_STOCK stock row labels.
+
+    Entries are checked against the stock frame when popped, so pieces that
+    were removed or sold through another path are skipped lazily instead of
+    being deleted from the heap.
+    """
+
+    def __init__(self, df_stock, strategy=DEFAULT_STRATEGY):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown allocation strategy: {strategy}")
+        self.strategy = strategy
+        self.rebuild(df_stock)
+
+    def rebuild(self, df_stock):
+        in_stock = df_stock[df_stock["status"] == "IN_STOCK"]
+        entries = pd.Series(strategy_keys(in_stock, self.strategy), index=in_stock.index, dtype=object)
+
+        # A sorted list is already a valid heap
+        self.heaps = {}
+        for sku, group in entries.groupby([in_stock["product_name"], in_stock["length_m"]], sort=False):
+            self.heaps[sku] = sorted(group.tolist())
+
+    def push(self, df_stock, rows):
+        """Queue stock rows that are (back) IN_STOCK"""
+        if len(rows) == 0:
+            return
+        df = df_stock.loc[rows]
+        for sku, entry in zip(zip(df["product_name"], df["length_m"]), strategy_keys(df, self.strategy)):
+            heapq.heappush(self.heaps.setdefault(sku, []), entry)
+
+    def _is_live(self, df_stock, sku, row, taken):
+        return (row not in taken and row in df_stock.index and df_stock.at[row, "status"] == "IN_STOCK"
+                and (df_stock.at[row, "product_name"], df_stock.at[row, "length_m"]) == sku)
+
+    def take(self, df_stock, product, length, qty, taken=None):
+        """Pop up to ``qty`` live rows for one (product, length) in priority order.
+
+        Returns ``(rows, entries)``; fewer than ``qty`` rows means the pair is
+        short.  Pass ``entries`` to ``restore`` to undo the pops.
+        """
+        taken = set() if taken is None else taken
+        heap = self.heaps.get((product, length), [])
+        rows = []
+        entries = []
+        while heap and len(rows) < qty:
+            entry = heapq.heappop(heap)
+            if self._is_live(df_stock, (product, length), entry[-1], taken):
+                rows.append(entry[-1])
+                entries.append(((product, length), entry))
+                taken.add(entry[-1])
+        return rows, entries
+
+    def peek(self, df_stock, product, length):
+        """Row label that would be allocated next, or None"""
+        heap = self.heaps.get((product, length), [])
+        while heap and not self._is_live(df_stock, (product, length), heap[0][-1], set()):
+            heapq.heappop(heap)
+        return heap[0][-1] if heap else None
+
+    def restore(self, entries):
+        for sku, entry in entries:
+            heapq.heappush(self.heaps.setdefault(sku, []), entry)
+
+
+def build_cart(items):
+    """Cart lines as a frame; a missing price is NaN (use the stock price)"""
+    return pd.DataFrame({
+        "product_name": [item["product"] for item in items],
+        "length_m": pd.to_numeric(pd.Series([item["length"] for item in items], dtype=object), errors="coerce"),
+        "qty": pd.to_numeric(pd.Series([item["qty"] for item in items], dtype=object), errors="coerce"),
+        "price": pd.to_numeric(pd.Series([item.get("price") for item in items], dtype=object), errors="coerce"),
+    })
+
+
+def allocate_orders(df_stock, carts, queues):
+    """Pick pieces from ``queues`` for a batch of carts (lists of item dicts).
+
+    Returns ``(lines, picks, errors)``.  ``lines`` has one row per line of
+    every filled cart, with the cart's position in ``carts`` (``order``), the
+    unit price, totals and allocated piece ids; ``picks`` has one row per
+    piece with its stock row label (``row``), ``order``, ``line``, ``price``
+    and ``profit``.  ``errors`` maps the position of each rejected cart to
+    the reason (its first invalid or short line); a rejected cart takes no
+    pieces.  Carts are filled in the order given, and pieces, prices and
+    totals are worked out for the whole batch at once.  ``df_stock`` itself
+    is not modified.
+    """
+    errors = {position: "Please add at least one item to the order"
+              for position, items in enumerate(carts) if not items}
+    cart = build_cart([item for items in carts for item in items])
+    cart["order"] = np.repeat(np.arange(len(carts)), [len(items) for items in carts])
+
+    invalid = (cart["length_m"].isna() | (cart["length_m"] % 1 != 0) | cart["qty"].isna() | (cart["qty"] <= 0) |
+               (cart["qty"] % 1 != 0) | (cart["price"] <= 0))
+    for line in cart[invalid].drop_duplicates("order").itertuples():
+        errors[line.order] = f"Invalid length, quantity or price for {line.product_name} ({line.length_m}m)"
+    cart = cart[~cart["order"].isin(list(errors))]
+
+    picked = {}  # Cart position -> rows, for carts filled so far
+    popped = {}
+    taken = set()
+    for position, product, length, line_qty in zip(cart["order"].tolist(), cart["product_name"],
+                                                   cart["length_m"].astype(int).tolist(),
+                                                   cart["qty"].astype(int).tolist()):
+        if position in errors:
+            continue
+        line_rows, entries = queues.take(df_stock, product, length, line_qty, taken)
+        picked.setdefault(position, []).extend(line_rows)
+        popped.setdefault(position, []).extend(entries)
+        if len(line_rows) < line_qty:
+            queues.restore(popped[position])
+            taken.difference_update(picked[position])
+            errors[position] = f"Only {len(line_rows)} pcs available for {product} ({length}m)"
+
+    cart = cart[~cart["order"].isin(list(errors))].reset_index(drop=True)
+    cart["length_m"] = cart["length_m"].astype(int)
+    cart["qty"] = cart["qty"].astype(int)
+    qty = cart["qty"].to_numpy()
+    rows = [row for position, order_rows in picked.items() if position not in errors for row in order_rows]
+
+    line = np.repeat(np.arange(len(cart)), qty)
+    picks = df_stock.loc[rows, ["piece_id", "unit_cost", "seller_price"]].rename_axis("row").reset_index()
+    picks["line"] = line
+    picks["order"] = cart["order"].to_numpy()[line]
+
+    # Price overrides: lines without a custom price take their first piece's price
+    price = np.array(cart["price"], dtype=float)
+    first = np.cumsum(qty) - qty
+    missing = np.isnan(price)
+    price[missing] = picks["seller_price"].to_numpy(dtype=float)[first[missing]]
+    cart["price"] = price
+    picks["price"] = price[line]
+    picks["profit"] = picks["price"] - picks["unit_cost"]
+
+    # Line totals reflect the cost layer of the pieces actually picked
+    piece_ids = picks["piece_id"].astype(str).to_numpy()
+    cart["total_unit_cost"] = np.bincount(line, weights=picks["unit_cost"].to_numpy(dtype=float),
+                                          minlength=len(cart))
+    cart["total_seller_price"] = price * qty
+    cart["profit_total"] = cart["total_seller_price"] - cart["total_unit_cost"]
+    cart["allocated_piece_ids"] = [",".join(ids) for ids in np.split(piece_ids, first[1:])] if len(cart) else []
+
+    return cart, picks, errors
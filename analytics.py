@@ -0,0 +1,98 @@
+"""Customer analytics: recency, frequency, monetary value and lifetime profit.
+
+Per-customer aggregates come from one groupby over ACTIVE order lines.  They
+are kept between refreshes: new order lines appended to the store are
+aggregated on their own and merged in, and only changes to existing orders
+(cancel/return, reload) trigger a full recompute.  RFM scores are quintiles
+(1-5) over all customers, so they are recomputed on the small per-customer
+table each time.
+"""
+import numpy as np
+import pandas as pd
+
+AGGREGATES = {
+    "first_order": ("order_date", "min"),
+    "last_order": ("order_date", "max"),
+    "orders": ("order_id", "nunique"),
+    "revenue": ("total_seller_price", "sum"),
+    "profit": ("profit_total", "sum"),
+    "pieces": ("qty", "sum"),
+}
+# How partial aggregates of two sets of order lines combine
+_MERGE = {"first_order": "min", "last_order": "max", "orders": "sum", "revenue": "sum", "profit": "sum",
+          "pieces": "sum"}
+
+SEGMENTS = ["Champions", "Loyal", "New", "At Risk", "Lapsed", "Regular"]
+
+
+def aggregate(orders):
+    """Per-customer aggregates of the ACTIVE order lines in ``orders``"""
+    active = orders[(orders["status"] == "ACTIVE") & orders["customer_id"].notna()]
+    return active.groupby("customer_id").agg(**AGGREGATES)
+
+
+def merge(old, new):
+    """Combine aggregates of two disjoint sets of orders"""
+    if old.empty:
+        return new
+    if new.empty:
+        return old
+    return pd.concat([old, new]).groupby(level=0).agg(_MERGE)
+
+
+def _quintile(values):
+    return np.ceil(values.rank(pct=True) * 5).clip(1, 5).astype(int)
+
+
+def score(aggregates, now=None):
+    """Add recency, R/F/M scores, average order value and a segment to ``aggregates``"""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    df = aggregates.copy()
+    df["recency_days"] = (now - df["last_order"]).dt.days
+    df["r_score"] = _quintile(-df["recency_days"])
+    df["f_score"] = _quintile(df["orders"])
+    df["m_score"] = _quintile(df["revenue"])
+    df["avg_order_value"] = df["revenue"] / df["orders"]
+
+    r, f = df["r_score"], df["f_score"]
+    df["segment"] = np.select(
+        [(r >= 4) & (f >= 4), f >= 4, (r >= 4) & (df["orders"] == 1), (r <= 2) & (f >= 3), r <= 2],
+        SEGMENTS[:-1], default=SEGMENTS[-1])
+    return df
+
+
+class CustomerAnalytics:
+    """Cached RFM table for a DataStore, refreshed incrementally"""
+
+    def __init__(self, store):
+        self.store = store
+        self._aggregates = None
+        self._rows = 0
+        self._edits = None
+        self._key = None
+        self._table = None
+
+    def table(self, now=None):
+        """One row per customer with details, aggregates, scores and segment, best customers first"""
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        store = self.store
+        with store.lock:
+            key = (store.version, now.date())
+            if key == self._key:
+                return self._table
+
+            orders = store.orders
+            if self._aggregates is None or store.order_edits != self._edits or len(orders) < self._rows:
+                aggregates = aggregate(orders)
+            else:
+                aggregates = merge(self._aggregates, aggregate(orders.iloc[self._rows:]))
+            self._aggregates = aggregates
+            self._rows = len(orders)
+            self._edits = store.order_edits
+            customers = store.customers.frame().set_index("customer_id")
+
+        table = customers.join(score(aggregates, now), how="inner")
+        table = table.sort_values(["m_score", "revenue"], ascending=False).rename_axis("customer_id").reset_index()
+        self._key = key
+        self._table = table
+        return table
@@ -0,0 +1,210 @@
+"""Incremental, deduplicated backups of the data store.
+
+A snapshot cuts the stock, orders and customer tables into chunks of
+``CHUNK_ROWS`` rows.  Each chunk is written as gzipped CSV named after the
+SHA-256 of its contents under ``backups/chunks/``, and a chunk that is
+already there is not written again.  Rows are only ever appended or changed
+in place, so a new snapshot adds just the chunks holding new or changed rows
+and a small JSON manifest under ``backups/snapshots/`` listing the chunks of
+every table.  Unchanged chunks are recognized from a vectorized hash of their
+rows without being serialized again.
+
+``prune()`` applies ``RETENTION`` and deletes chunks no remaining snapshot
+refers to.  ``restore()`` reads each chunk of a snapshot once and rewrites
+the workbooks from it.  ``BackupScheduler`` takes snapshots on a background
+thread; only copying the tables holds the store lock.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from customers import CUSTOMER_COLUMNS
+from store import ORDER_COLUMNS, STOCK_COLUMNS, normalize_orders, normalize_stock
+
+BACKUP_DIR = "backups"
+CHUNK_ROWS = 5000
+BACKUP_INTERVAL = 15 * 60  # Seconds between scheduled snapshots
+
+# (maximum age, keep one snapshot per period); every snapshot is kept in the first band
+RETENTION = [
+    (timedelta(days=2), None),
+    (timedelta(days=30), timedelta(days=1)),
+    (timedelta(days=365), timedelta(weeks=1)),
+]
+
+TABLES = {
+    "stock": STOCK_COLUMNS,
+    "orders": ORDER_COLUMNS,
+    "customers": CUSTOMER_COLUMNS,
+}
+
+_NAME_FORMAT = "%Y%m%d-%H%M%S-%f"
+
+
+class BackupSet:
+    """Snapshots of one DataStore kept under ``directory``"""
+
+    def __init__(self, store, directory=None):
+        self.store = store
+        self.directory = directory or os.path.join(os.path.dirname(os.path.abspath(store.stock_file)), BACKUP_DIR)
+        self.lock = threading.Lock()
+        self._version = None
+        self._chunks = {}  # (table, row hash of a chunk) -> chunk name, for the latest snapshot
+
+    def _chunk_path(self, digest):
+        return os.path.join(self.directory, "chunks", digest[:2], digest + ".csv.gz")
+
+    def _snapshot_path(self, name):
+        return os.path.join(self.directory, "snapshots", name + ".json")
+
+    def snapshots(self):
+        """Snapshot names, newest first"""
+        path = os.path.join(self.directory, "snapshots")
+        if not os.path.isdir(path):
+            return []
+        return sorted((name[:-5] for name in os.listdir(path) if name.endswith(".json")), reverse=True)
+
+    def manifest(self, name):
+        with open(self._snapshot_path(name), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_chunk(self, df):
+        """Store one chunk unless it already exists; returns ``(name, bytes written)``"""
+        data = df.to_csv(index=False).encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._chunk_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = gzip.compress(data, compresslevel=6)
+        with open(path + ".tmp", "wb") as f:
+            f.write(compressed)
+        os.replace(path + ".tmp", path)
+        return digest, len(compressed)
+
+    def snapshot(self):
+        """Back up the store if it changed since the last snapshot; returns the new snapshot's name or None"""
+        with self.lock:
+            with self.store.lock:
+                version = self.store.version
+                if version == self._version:
+                    return None
+                frames = {"stock": self.store.stock[TABLES["stock"]].copy(),
+                          "orders": self.store.orders[TABLES["orders"]].copy(),
+                          "customers": self.store.customers.frame()}
+
+            tables = {}
+            chunks = {}
+            written = 0
+            for table, df in frames.items():
+                row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+                names = []
+                for start in range(0, len(df), CHUNK_ROWS):
+                    key = (table, hashlib.blake2b(row_hashes[start:start + CHUNK_ROWS].tobytes()).hexdigest())
+                    name = self._chunks.get(key)
+                    if name is None or not os.path.exists(self._chunk_path(name)):
+                        name, size = self._write_chunk(df.iloc[start:start + CHUNK_ROWS])
+                        written += size
+                    chunks[key] = name
+                    names.append(name)
+                tables[table] = names
+            self._chunks = chunks
+            self._version = version
+
+            latest = self.snapshots()
+            if latest and self.manifest(latest[0])["tables"] == tables:
+                return None
+
+            now = datetime.now()
+            name = now.strftime(_NAME_FORMAT)
+            manifest = {"created": now.isoformat(timespec="seconds"), "pieces": len(frames["stock"]),
+                        "order_lines": len(frames["orders"]), "customers": len(frames["customers"]),
+                        "new_bytes": written, "tables": tables}
+            path = self._snapshot_path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(path + ".tmp", path)
+            return name
+
+    def prune(self, now=None):
+        """Drop snapshots outside ``RETENTION`` and the chunks only they used; returns the number dropped"""
+        now = now or datetime.now()
+        with self.lock:
+            names = self.snapshots()
+            kept = names[:1]  # The latest snapshot is always kept
+            periods = set()
+            for name in names[1:]:
+                created = datetime.strptime(name, _NAME_FORMAT)
+                band = next((i for i, (age, _) in enumerate(RETENTION) if now - created <= age), None)
+                if band is None:
+                    continue
+                every = RETENTION[band][1]
+                if every is not None:
+                    period = (band, int(created.timestamp() // every.total_seconds()))
+                    if period in periods:
+                        continue
+                    periods.add(period)
+                kept.append(name)
+
+            dropped = [name for name in names if name not in kept]
+            for name in dropped:
+                os.remove(self._snapshot_path(name))
+            if dropped:
+                used = {digest for name in kept for chunks in self.manifest(name)["tables"].values()
+                        for digest in chunks}
+                chunk_dir = os.path.join(self.directory, "chunks")
+                for folder in os.listdir(chunk_dir):
+                    for entry in os.scandir(os.path.join(chunk_dir, folder)):
+                        if entry.name.split(".")[0] not in used:
+                            os.remove(entry.path)
+            return len(dropped)
+
+    def _read_table(self, table, names):
+        frames = {}
+        for name in dict.fromkeys(names):
+            with gzip.open(self._chunk_path(name), "rt", encoding="utf-8") as f:
+                frames[name] = pd.read_csv(f, dtype=object)
+        if not names:
+            return pd.DataFrame(columns=TABLES[table])
+        return pd.concat([frames[name] for name in names], ignore_index=True)
+
+    def restore(self, name):
+        """Replace the store's workbooks with snapshot ``name`` and reload them"""
+        with self.lock:
+            tables = self.manifest(name)["tables"]
+            stock = normalize_stock(self._read_table("stock", tables["stock"]))
+            orders = normalize_orders(self._read_table("orders", tables["orders"]))
+            customers = self._read_table("customers", tables["customers"]).fillna("")
+            self.store.replace(stock, orders, customers)
+            self._version = None
+
+
+class BackupScheduler(threading.Thread):
+    """Takes a snapshot and prunes old ones every ``interval`` seconds"""
+
+    def __init__(self, backups, interval=BACKUP_INTERVAL):
+        super().__init__(daemon=True)
+        self.backups = backups
+        self.interval = interval
+        self.last_error = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        while True:
+            try:
+                self.backups.snapshot()
+                self.backups.prune()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e  # Shown in the Backups window; the next run tries again
+            if self._stopped.wait(self.interval):
+                return
+
+    def stop(self):
+        self._stopped.set()
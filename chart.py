@@ -0,0 +1,126 @@
+"""Line chart of a daily series on a Tk canvas, with zoom and pan.
+
+The chart only slices the series it is given.  When the visible range has
+more days than the canvas has pixels, each pixel column is drawn from the
+minimum and maximum of its days, so spikes stay visible at any zoom.
+"""
+import tkinter as tk
+from tkinter import ttk
+
+import numpy as np
+
+MARGIN_LEFT = 90
+MARGIN_RIGHT = 20
+MARGIN_TOP = 15
+MARGIN_BOTTOM = 30
+MIN_DAYS = 7
+
+
+class TrendChart(ttk.Frame):
+    """Zoomable chart: mouse wheel zooms around the pointer, dragging pans"""
+
+    def __init__(self, parent, width=900, height=240):
+        super().__init__(parent)
+        self.canvas = tk.Canvas(self, width=width, height=height, background="white", highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        self.days = np.array([], dtype="datetime64[D]")
+        self.values = np.array([])
+        self.money = False
+        self.view = (0, 0)
+        self._drag = None
+
+        self.canvas.bind("<Configure>", lambda e: self.redraw())
+        self.canvas.bind("<MouseWheel>", lambda e: self.zoom(0.8 if e.delta > 0 else 1.25, e.x))
+        self.canvas.bind("<Button-4>", lambda e: self.zoom(0.8, e.x))
+        self.canvas.bind("<Button-5>", lambda e: self.zoom(1.25, e.x))
+        self.canvas.bind("<ButtonPress-1>", self._start_drag)
+        self.canvas.bind("<B1-Motion>", self._pan)
+
+    def set_series(self, days, values, money=False):
+        """Show a new series, keeping the visible date range where it still applies"""
+        old_days, (start, end) = self.days, self.view
+        self.days, self.values, self.money = days, values, money
+        if len(old_days) and end > start:
+            self.show_range(old_days[start], old_days[end - 1])
+        else:
+            self.view = (0, len(days))
+            self.redraw()
+
+    def show_range(self, first=None, last=None):
+        """Show the days from ``first`` to ``last`` (datetime64[D]); None means the ends of the series"""
+        start = 0 if first is None else int(np.searchsorted(self.days, first))
+        end = len(self.days) if last is None else int(np.searchsorted(self.days, last, side="right"))
+        self._set_view(start, end)
+
+    def show_last(self, days):
+        self._set_view(len(self.days) - days, len(self.days))
+
+    def _set_view(self, start, end):
+        span = min(max(end - start, MIN_DAYS), len(self.days))
+        start = min(max(start, 0), len(self.days) - span)
+        self.view = (start, start + span)
+        self.redraw()
+
+    def _plot_width(self):
+        return max(self.canvas.winfo_width() - MARGIN_LEFT - MARGIN_RIGHT, 1)
+
+    def zoom(self, factor, x):
+        start, end = self.view
+        # Keep the day under the pointer where it is
+        anchor = start + (end - start) * min(max((x - MARGIN_LEFT) / self._plot_width(), 0), 1)
+        new_start = anchor - (anchor - start) * factor
+        self._set_view(int(round(new_start)), int(round(new_start + (end - start) * factor)))
+
+    def _start_drag(self, event):
+        self._drag = (event.x, self.view)
+
+    def _pan(self, event):
+        if self._drag is None:
+            return
+        x, (start, end) = self._drag
+        shift = int(round((x - event.x) * (end - start) / self._plot_width()))
+        self._set_view(start + shift, end + shift)
+
+    def redraw(self):
+        canvas = self.canvas
+        canvas.delete("all")
+        start, end = self.view
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if end <= start or width <= MARGIN_LEFT + MARGIN_RIGHT:
+            canvas.create_text(width // 2, height // 2, text="No data", fill="gray")
+            return
+
+        values = self.values[start:end]
+        plot_width = self._plot_width()
+        plot_height = max(height - MARGIN_TOP - MARGIN_BOTTOM, 1)
+
+        # One min/max pair per pixel column when there are more days than pixels
+        if len(values) > plot_width:
+            edges = np.linspace(0, len(values), plot_width + 1).astype(int)[:-1]
+            xs = np.repeat(np.arange(plot_width), 2)
+            ys = np.column_stack([np.minimum.reduceat(values, edges), np.maximum.reduceat(values, edges)]).ravel()
+        else:
+            xs = np.arange(len(values)) * plot_width / max(len(values) - 1, 1)
+            ys = values
+
+        low, high = float(min(ys.min(), 0)), float(ys.max())
+        high = high if high > low else low + 1
+        points = np.column_stack([MARGIN_LEFT + xs, MARGIN_TOP + (high - ys) / (high - low) * plot_height])
+
+        bottom, right = MARGIN_TOP + plot_height, MARGIN_LEFT + plot_width
+        canvas.create_line(MARGIN_LEFT, MARGIN_TOP, MARGIN_LEFT, bottom, fill="gray")
+        canvas.create_line(MARGIN_LEFT, bottom, right, bottom, fill="gray")
+        if low < 0:
+            zero = MARGIN_TOP + high / (high - low) * plot_height
+            canvas.create_line(MARGIN_LEFT, zero, right, zero, fill="lightgray", dash=(2, 2))
+        for value, y in ((high, MARGIN_TOP), ((high + low) / 2, MARGIN_TOP + plot_height / 2), (low, bottom)):
+            text = f"Rs. {value:,.0f}" if self.money else f"{value:,.0f}"
+            canvas.create_text(MARGIN_LEFT - 5, y, text=text, anchor="e", font=("Arial", 8))
+        canvas.create_text(MARGIN_LEFT, bottom + 5, text=str(self.days[start]), anchor="nw", font=("Arial", 8))
+        canvas.create_text(right, bottom + 5, text=str(self.days[end - 1]), anchor="ne", font=("Arial", 8))
+
+        if len(points) == 1:
+            x, y = points[0]
+            canvas.create_oval(x - 2, y - 2, x + 2, y + 2, fill="darkblue", outline="")
+        else:
+            canvas.create_line(*points.ravel().tolist(), fill="darkblue")
@@ -0,0 +1,151 @@
+"""Customer master table, indexed by normalized phone number and name.
+
+Every order line references a ``customer_id``, which groups a customer's
+orders (e.g. for ``analytics.py``).  Order lines keep the name, address,
+phones and city they were shipped to; ``customers.xlsx`` holds each
+customer's latest details for lookups.  Placing an order with a known phone
+number reuses (and refreshes) that customer's record without touching their
+earlier orders.
+"""
+import math
+import os
+import re
+
+import pandas as pd
+
+CUSTOMERS_FILE = "customers.xlsx"
+CUSTOMER_DETAILS = ["customer_name", "address", "phone1", "phone2", "city"]
+CUSTOMER_COLUMNS = ["customer_id"] + CUSTOMER_DETAILS
+
+_ID_PATTERN = re.compile(r"^CUST_(\d+)$")
+
+
+def cell_text(value):
+    """Cell value as stripped text; Excel turns phone numbers into ints/floats"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def normalize_phone(value):
+    """Digits only, in local 0XXXXXXXXX form where that can be recovered"""
+    digits = re.sub(r"\D", "", cell_text(value))
+    if len(digits) == 11 and digits.startswith("94"):
+        digits = "0" + digits[2:]
+    elif len(digits) == 9 and not digits.startswith("0"):
+        digits = "0" + digits  # Leading zero lost in Excel
+    return digits
+
+
+def normalize_phones(values):
+    """Vectorized ``normalize_phone`` for a Series"""
+    text = values.fillna("").astype(str).str.replace(r"\.0$", "", regex=True)
+    digits = text.str.replace(r"\D", "", regex=True)
+    length = digits.str.len()
+    digits = digits.where(~((length == 11) & digits.str.startswith("94")), "0" + digits.str[2:])
+    return digits.where(~((length == 9) & ~digits.str.startswith("0")), "0" + digits)
+
+
+def normalize_name(value):
+    return " ".join(cell_text(value).split()).casefold()
+
+
+class CustomerBook:
+    """Deduplicated customers with phone and name indexes"""
+
+    def __init__(self, path=CUSTOMERS_FILE):
+        self.path = path
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            df = pd.read_excel(self.path, dtype=str).reindex(columns=CUSTOMER_COLUMNS).fillna("")
+        else:
+            df = pd.DataFrame(columns=CUSTOMER_COLUMNS)
+
+        self.records = {row[0]: dict(zip(CUSTOMER_DETAILS, map(cell_text, row[1:])))
+                        for row in df.itertuples(index=False, name=None) if row[0]}
+        self.by_phone = {}
+        self.by_name = {}
+        for customer_id, record in self.records.items():
+            self._index(customer_id, record)
+        self._next = max((int(m.group(1)) for m in map(_ID_PATTERN.match, self.records) if m), default=0) + 1
+        self.dirty = False
+
+    def _index(self, customer_id, record):
+        for col in ("phone1", "phone2"):
+            phone = normalize_phone(record[col])
+            if phone:
+                self.by_phone[phone] = customer_id
+        name = normalize_name(record["customer_name"])
+        if name:
+            ids = self.by_name.setdefault(name, [])
+            if customer_id not in ids:
+                ids.append(customer_id)
+
+    def get(self, customer_id):
+        record = self.records.get(customer_id)
+        return None if record is None else dict(record, customer_id=customer_id)
+
+    def find_by_phone(self, phone):
+        """Customer record for a phone number (either phone), or None"""
+        return self.get(self.by_phone.get(normalize_phone(phone)))
+
+    def find_by_name(self, name):
+        """All customer records with this name (case and spacing ignored)"""
+        return [self.get(customer_id) for customer_id in self.by_name.get(normalize_name(name), [])]
+
+    def resolve(self, details):
+        """customer_id for ``details`` (CUSTOMER_DETAILS keys), adding or refreshing the record.
+
+        Customers are matched on phone1, then phone2, then on a name only one
+        customer has.  Returns None when the details are all empty.
+        """
+        details = {col: cell_text(details.get(col)) for col in CUSTOMER_DETAILS}
+        if not any(details.values()):
+            return None
+
+        customer_id = None
+        for col in ("phone1", "phone2"):
+            phone = normalize_phone(details[col])
+            if phone and phone in self.by_phone:
+                customer_id = self.by_phone[phone]
+                break
+        if customer_id is None and not details["phone1"] and not details["phone2"]:
+            matches = self.by_name.get(normalize_name(details["customer_name"]), [])
+            if len(matches) == 1:
+                customer_id = matches[0]
+
+        if customer_id is None:
+            customer_id = f"CUST_{self._next:06d}"
+            self._next += 1
+            self.records[customer_id] = details
+        else:
+            record = self.records[customer_id]
+            updated = {col: value or record[col] for col, value in details.items()}
+            if updated == record:
+                return customer_id
+            self.records[customer_id] = updated
+
+        self._index(customer_id, self.records[customer_id])
+        self.dirty = True
+        return customer_id
+
+    def assign(self, df):
+        """customer_id per order row of ``df``, resolving each distinct set of details once"""
+        keys = pd.Series(list(zip(*(df[col].map(cell_text) for col in CUSTOMER_DETAILS))), index=df.index,
+                         dtype=object)
+        ids = {key: self.resolve(dict(zip(CUSTOMER_DETAILS, key))) for key in keys.drop_duplicates()}
+        return keys.map(ids.get)
+
+    def details(self, customer_ids):
+        """CUSTOMER_DETAILS for each id, aligned with ``customer_ids``"""
+        empty = dict.fromkeys(CUSTOMER_DETAILS, "")
+        return pd.DataFrame([self.records.get(customer_id, empty) for customer_id in customer_ids],
+                            columns=CUSTOMER_DETAILS)
+
+    def frame(self):
+        return pd.DataFrame([dict(record, customer_id=customer_id) for customer_id, record in self.records.items()],
+                            columns=CUSTOMER_COLUMNS)
@@ -0,0 +1,83 @@
+"""Streaming exports of stock/order views and reports to CSV, XLSX or Parquet.
+
+Frames are written in chunks of ``CHUNK_ROWS`` through write-only writers
+(plain CSV appends, openpyxl's write-only workbook, pyarrow's ParquetWriter),
+so the extra memory an export needs does not grow with the number of rows.
+Parquet export needs the optional ``pyarrow`` package.
+"""
+import os
+import threading
+
+import openpyxl
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+CHUNK_ROWS = 50000
+
+EXPORT_FILETYPES = [("Excel workbook", "*.xlsx"), ("CSV file", "*.csv"), ("Parquet file", "*.parquet")]
+
+
+def iter_chunks(df, chunk_rows=CHUNK_ROWS):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def export_csv(df, path, chunk_rows=CHUNK_ROWS):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        fh.write(",".join(map(str, df.columns)) + "\n")
+        for chunk in iter_chunks(df, chunk_rows):
+            chunk.to_csv(fh, header=False, index=False, date_format="%Y-%m-%d %H:%M:%S")
+
+
+def export_xlsx(df, path, chunk_rows=CHUNK_ROWS):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append([str(col) for col in df.columns])
+    for chunk in iter_chunks(df, chunk_rows):
+        # Python scalars with None for missing values, which openpyxl writes as empty cells
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(path)
+
+
+def export_parquet(df, path, chunk_rows=CHUNK_ROWS):
+    if pq is None:
+        raise ValueError("Parquet export needs the pyarrow package")
+
+    # Schema from the whole frame, so a chunk of all-missing values keeps its column type
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in iter_chunks(df, chunk_rows):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+WRITERS = {".csv": export_csv, ".xlsx": export_xlsx, ".parquet": export_parquet}
+
+
+def export_frame(df, path, chunk_rows=CHUNK_ROWS):
+    """Write ``df`` to ``path``; the format follows the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported export format: {ext or path}")
+    WRITERS[ext](df, path, chunk_rows)
+
+
+def export_in_background(df, path, on_done):
+    """Run ``export_frame`` on a daemon thread; ``on_done(error_or_None)`` is called when it ends"""
+    def run():
+        try:
+            export_frame(df, path)
+        except Exception as e:
+            on_done(e)
+        else:
+            on_done(None)
+
+    thread = threading.Thread(target=run, name="export", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,125 @@
+"""Per-SKU demand forecasts, days of cover and reorder points.
+
+Demand is the qty of ACTIVE order lines per (product, length) and day.  The
+daily totals of the last ``WINDOW_DAYS`` days are laid out as one SKU x day
+matrix, from which the moving average, the exponentially smoothed rate and
+the day-to-day spread of every SKU come out in a few array operations.
+
+Daily totals are kept between refreshes.  New order lines are aggregated
+on their own and added in; cancelling or returning an order (or a reload)
+rebuilds them from all order lines.
+"""
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+WINDOW_DAYS = 90  # History considered for smoothing
+AVERAGE_DAYS = 28  # Moving average and variability window
+SMOOTHING = 0.1  # Weight of the most recent day in the smoothed rate
+LEAD_TIME_DAYS = 7  # Days between placing a restock and receiving it
+REVIEW_DAYS = 14  # Days of demand a restock should cover beyond the lead time
+SERVICE_Z = 1.65  # Safety stock for roughly a 95% chance of not running out during the lead time
+
+REORDER_NOW = "Reorder Now"
+WATCH = "Watch"
+OK = "OK"
+
+SKU = ["product_name", "length_m"]
+
+
+def daily_demand(orders):
+    """Qty of ACTIVE order lines per (product, length, day)"""
+    active = orders[orders["status"] == "ACTIVE"].dropna(subset=["item_name", "length_m", "order_date"])
+    return active.groupby([active["item_name"].rename("product_name"), active["length_m"].astype(int),
+                           active["order_date"].dt.normalize().rename("day")])["qty"].sum().astype(float)
+
+
+def merge(old, new):
+    """Add the daily totals of two disjoint sets of order lines"""
+    if old.empty:
+        return new
+    if new.empty:
+        return old
+    return pd.concat([old, new]).groupby(level=[0, 1, 2]).sum()
+
+
+def forecast(daily, on_hand, now=None):
+    """Demand rates, cover and reorder figures per SKU, most urgent first.
+
+    ``daily`` is a ``daily_demand`` series and ``on_hand`` the IN_STOCK
+    piece count per (product, length).
+    """
+    today = (pd.Timestamp.now() if now is None else pd.Timestamp(now)).normalize()
+    days = daily.index.get_level_values("day")
+    age = (today - days).days.to_numpy()
+    recent = daily[(age >= 0) & (age < WINDOW_DAYS)]
+    age = age[(age >= 0) & (age < WINDOW_DAYS)]
+
+    skus = recent.index.droplevel("day").unique().union(on_hand.index)
+    matrix = np.zeros((len(skus), WINDOW_DAYS))
+    np.add.at(matrix, (skus.get_indexer(recent.index.droplevel("day")), WINDOW_DAYS - 1 - age), recent.to_numpy())
+
+    last = matrix[:, -AVERAGE_DAYS:]
+    weights = SMOOTHING * (1 - SMOOTHING) ** np.arange(WINDOW_DAYS)[::-1]
+    table = pd.DataFrame({
+        "in_stock": on_hand.reindex(skus, fill_value=0).to_numpy(),
+        "avg_daily": last.mean(axis=1),
+        "smoothed_daily": matrix @ (weights / weights.sum()),
+        "sold_window": matrix.sum(axis=1),
+    }, index=skus)
+    rate = table["smoothed_daily"]
+
+    safety = SERVICE_Z * last.std(axis=1) * math.sqrt(LEAD_TIME_DAYS)
+    table["days_of_cover"] = (table["in_stock"] / rate.where(rate > 0)).fillna(np.inf)
+    table["reorder_point"] = np.ceil(rate * LEAD_TIME_DAYS + safety)
+    table["order_qty"] = np.maximum(
+        np.ceil(rate * (LEAD_TIME_DAYS + REVIEW_DAYS) + safety - table["in_stock"]), 0).astype(int)
+    table["status"] = np.select(
+        [(rate > 0) & (table["in_stock"] <= table["reorder_point"]),
+         table["days_of_cover"] < LEAD_TIME_DAYS + REVIEW_DAYS], [REORDER_NOW, WATCH], default=OK)
+
+    table = table.rename_axis(SKU).reset_index()
+    return table.sort_values(["days_of_cover", "smoothed_daily"], ascending=[True, False],
+                             kind="stable").reset_index(drop=True)
+
+
+class DemandForecast:
+    """Cached reorder table for a DataStore, refreshed incrementally"""
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self._daily = None
+        self._rows = 0
+        self._edits = None
+        self._key = None
+        self._table = None
+
+    def table(self, now=None):
+        """One row per (product, length) with demand rates, cover and reorder figures, most urgent first"""
+        now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+        store = self.store
+        with self.lock, store.lock:
+            key = (store.version, now.date())
+            if key == self._key:
+                return self._table
+
+            orders = store.orders
+            if self._daily is None or store.order_edits != self._edits or len(orders) < self._rows:
+                daily = daily_demand(orders)
+            else:
+                daily = merge(self._daily, daily_demand(orders.iloc[self._rows:]))
+            # Days that have left the window are never needed again
+            daily = daily[daily.index.get_level_values("day") > now.normalize() - pd.Timedelta(days=WINDOW_DAYS)]
+            self._daily = daily
+            self._rows = len(orders)
+            self._edits = store.order_edits
+
+            in_stock = store.stock[store.stock["status"] == "IN_STOCK"].dropna(subset=SKU)
+            on_hand = in_stock.groupby([in_stock["product_name"], in_stock["length_m"].astype(int)]).size()
+
+            self._table = forecast(daily, on_hand, now)
+            self._key = key
+            return self._table
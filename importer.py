@@ -0,0 +1,157 @@
+"""Streaming import of large legacy stock and orders workbooks.
+
+Rows are read with openpyxl's read-only ``iter_rows`` and handled in chunks of
+``CHUNK_SIZE``: each chunk is coerced to the current column types, invalid
+rows are rejected, rows already in the store are skipped, and the typed chunk
+is appended to the store straight away; the store is saved once at the end.
+Besides the store's own frames and the set of keys already seen, the import
+only ever holds one raw and one typed chunk in memory, whatever the size of
+the workbook.
+
+Command line: ``python importer.py {stock,orders} FILE [--chunk-size N]``
+"""
+import argparse
+import sys
+
+import openpyxl
+import pandas as pd
+
+from store import (DataLockedError, DataStore, ORDER_STATUSES, STOCK_STATUSES, init_files, normalize_orders,
+                   normalize_stock)
+
+CHUNK_SIZE = 5000
+
+KINDS = {
+    # kind: (normalizer, valid statuses, key column, required columns)
+    "stock": (normalize_stock, STOCK_STATUSES, "piece_id", ["piece_id", "product_name", "length_m"]),
+    "orders": (normalize_orders, ORDER_STATUSES, "order_id", ["order_id", "item_name", "length_m", "qty"]),
+}
+
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE):
+    """Yield ``(raw_frame, rows_read, total_rows)`` per chunk of the first sheet.
+
+    ``total_rows`` is None when the workbook does not record its dimensions.
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        total = ws.max_row - 1 if ws.max_row else None
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        columns = [str(c).strip() if c is not None else f"column_{i}" for i, c in enumerate(header)]
+        width = len(columns)
+        batch = []
+        done = 0
+        for row in rows:
+            if not any(v is not None for v in row):
+                continue
+            batch.append(tuple(row[:width]) + (None,) * (width - len(row)))
+            if len(batch) >= chunk_size:
+                done += len(batch)
+                yield pd.DataFrame.from_records(batch, columns=columns), done, total
+                batch = []
+        if batch:
+            done += len(batch)
+            yield pd.DataFrame.from_records(batch, columns=columns), done, total
+    finally:
+        wb.close()
+
+
+def clean_chunk(raw, kind):
+    """Coerce one raw chunk; returns ``(valid_rows, rejected_count)``"""
+    normalize, statuses, _, required = KINDS[kind]
+    df = normalize(raw)
+
+    for col in ("piece_id", "order_id", "product_name", "item_name"):
+        if col in df.columns:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str).str.strip())
+    df["status"] = df["status"].astype(str).str.strip().str.upper()
+
+    valid = df[required].notna().all(axis=1) & df["status"].isin(statuses)
+    if kind == "stock":
+        # Rebuild profit where the legacy file did not store it
+        df["profit"] = df["profit"].fillna(df["seller_price"] - df["unit_cost"])
+    return df[valid], int((~valid).sum())
+
+
+def import_workbook(store, path, kind, chunk_size=CHUNK_SIZE, progress=None, save=True):
+    """Stream ``path`` into ``store`` and return import counts.
+
+    ``progress(rows_read, total_rows)`` is called after every chunk.  Stock
+    pieces whose piece_id is already known are skipped; order lines are
+    skipped when their order_id already existed before the import, so
+    importing the same file twice is harmless.
+    """
+    _, _, key, required = KINDS[kind]
+    with store.lock:
+        existing = store.stock if kind == "stock" else store.orders
+        known = set(existing[key].dropna().astype(str))
+
+    seen = set()
+    counts = {"read": 0, "imported": 0, "rejected": 0, "duplicates": 0}
+    for raw, done, total in iter_chunks(path, chunk_size):
+        missing = [col for col in required if col not in raw.columns]
+        if missing:
+            raise ValueError(f"{path} is not a {kind} workbook (missing columns: {', '.join(missing)})")
+
+        df, rejected = clean_chunk(raw, kind)
+        keys = df[key]
+        fresh = ~keys.isin(known)
+        if kind == "stock":
+            fresh &= ~keys.isin(seen) & ~keys.duplicated()
+            seen.update(keys[fresh])
+        df = df[fresh]
+
+        counts["read"] = done
+        counts["rejected"] += rejected
+        counts["duplicates"] += int((~fresh).sum())
+        counts["imported"] += len(df)
+        if kind == "stock":
+            store.ingest(stock_chunks=[df], save=False)
+        else:
+            store.ingest(order_chunks=[df], save=False)
+
+        if progress:
+            progress(done, total)
+
+    if save and counts["imported"]:
+        store.save()
+    return counts
+
+
+def _print_progress(done, total, width=40):
+    if total:
+        filled = int(width * min(done, total) / total)
+        sys.stderr.write(f"\r[{'#' * filled}{'.' * (width - filled)}] {done:,}/{total:,} rows")
+    else:
+        sys.stderr.write(f"\r{done:,} rows")
+    sys.stderr.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a legacy stock or orders workbook")
+    parser.add_argument("kind", choices=list(KINDS))
+    parser.add_argument("path")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    init_files()
+    try:
+        store = DataStore()
+    except DataLockedError as e:
+        raise SystemExit(str(e))
+    try:
+        counts = import_workbook(store, args.path, args.kind, args.chunk_size, _print_progress)
+    finally:
+        store.close()
+    sys.stderr.write("\n")
+    print(f"Imported {counts['imported']:,} rows, rejected {counts['rejected']:,}, "
+          f"skipped {counts['duplicates']:,} duplicates")
+
+
+if __name__ == "__main__":
+    main()
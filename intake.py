@@ -0,0 +1,152 @@
+"""Batched order intake with group commit.
+
+Orders submitted back-to-back (phone rush, bulk import, API traffic) are
+collected for a short window, allocated together against the in-memory stock
+and written to the workbooks with a single save.  Each caller gets its own
+``Future`` carrying the order id or the reason the order was rejected.
+
+A placed order stays placed: if the save fails, the order is still in the
+in-memory store, its future still gets the order id, and the writer retries
+the save until it succeeds.  Reporting a failure there would make a client
+retry and place the order twice.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from store import OrderError
+
+_STOP = object()
+
+
+class OrderIntake:
+    """Single writer for a ``DataStore``.
+
+    ``window`` is how long (in seconds) to keep collecting after the first
+    submission of a batch; ``max_batch`` caps how many submissions share one
+    commit.  After a failed save, ``save_error`` holds the error and the save
+    is retried every ``retry_interval`` seconds.
+    """
+
+    def __init__(self, store, window=0.05, max_batch=500, retry_interval=1.0):
+        self.store = store
+        self.window = window
+        self.max_batch = max_batch
+        self.retry_interval = retry_interval
+        self.save_error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="order-intake", daemon=True)
+        self._thread.start()
+
+    def submit_order(self, customer, items):
+        """Queue one order; the future resolves to its order id"""
+        future = Future()
+        self._queue.put(("order", (customer, items), future))
+        return future
+
+    def submit(self, func, *args):
+        """Queue any other store mutation, called as ``func(*args, save=False)``"""
+        future = Future()
+        self._queue.put(("call", (func, args), future))
+        return future
+
+    def place_orders(self, orders, timeout=None):
+        """Submit many ``(customer, items)`` orders and wait for all of them.
+
+        Returns ``(order_id, error)`` per order, in the order given.
+        """
+        futures = [self.submit_order(customer, items) for customer, items in orders]
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(timeout), None))
+            except (OrderError, ValueError) as e:
+                results.append((None, e))
+        return results
+
+    def close(self):
+        """Commit whatever is queued and stop the writer thread"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                entry = self._queue.get(timeout=self.retry_interval if self.save_error else None)
+            except queue.Empty:
+                self._save()
+                continue
+            if entry is _STOP:
+                break
+
+            batch = [entry]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._commit(batch)
+
+        if self.save_error:
+            self._save()
+
+    def _save(self):
+        try:
+            self.store.save()
+        except Exception as e:
+            self.save_error = e  # Everything unsaved stays marked dirty for the next attempt
+        else:
+            self.save_error = None
+
+    def _commit(self, batch):
+        results = []
+        pending_orders = []
+
+        def flush_orders():
+            # Consecutive orders are allocated together in one pass
+            if not pending_orders:
+                return
+            outcomes = self.store.place_orders([payload for payload, _ in pending_orders], save=False)
+            results.extend((future, outcome) for (_, future), outcome in zip(pending_orders, outcomes))
+            pending_orders.clear()
+
+        failure = None
+        try:
+            for kind, payload, future in batch:
+                if kind == "order":
+                    pending_orders.append((payload, future))
+                    continue
+
+                flush_orders()
+                func, args = payload
+                try:
+                    results.append((future, (func(*args, save=False), None)))
+                except (OrderError, ValueError) as e:
+                    results.append((future, (None, e)))
+            flush_orders()
+        except Exception as e:
+            failure = e  # What was applied before it stands and is saved below
+
+        # One group commit for everything that succeeded
+        if any(error is None for _, (_, error) in results):
+            self._save()
+
+        for future, (result, error) in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(failure)
@@ -0,0 +1,155 @@
+"""Consistency checks between the stock and orders tables.
+
+Order lines name their pieces in ``allocated_piece_ids``; ACTIVE lines are
+the live sales.  ``check`` splits every line's piece ids into one
+(order line, piece) pair and joins the pairs to the stock rows by piece id,
+so each rule below is a vectorized join or anti-join over the two tables:
+
+* every piece id an order names exists in stock,
+* a piece is allocated to at most one ACTIVE order line,
+* a SOLD piece is allocated to an ACTIVE order line, and names that order
+  (a stray SOLD piece is told apart by whether it names no order, an order
+  that does not exist, or an existing order),
+* a piece an ACTIVE order line holds is SOLD,
+* ``profit == seller_price - unit_cost`` for pieces and
+  ``profit_total == total_seller_price - total_unit_cost`` for order lines,
+* piece ids are unique.
+
+``fixes`` works out the field values that resolve the fixable problems;
+ambiguous ones (unknown or duplicated pieces, pieces held by several
+orders, stray SOLD pieces that name an order) are only reported.
+"""
+import numpy as np
+import pandas as pd
+
+from undo import ORDER_FIELDS, STOCK_FIELDS
+
+# Problem -> description shown in reports
+PROBLEMS = {
+    "duplicate_piece": "Piece id appears on more than one stock row",
+    "unknown_piece": "Order line names a piece id that is not in stock",
+    "several_orders": "Piece is allocated to more than one active order",
+    "sold_without_order": "SOLD piece names no order and is not allocated to any active order",
+    "sold_to_missing_order": "SOLD piece names an order that is not in the orders table",
+    "sold_to_inactive_order": "SOLD piece names an order, but no active line of it holds the piece",
+    "not_sold": "Piece allocated to an active order is not SOLD",
+    "wrong_order": "SOLD piece names a different order than the one holding it",
+    "piece_profit": "Piece profit is not seller price - unit cost",
+    "line_profit": "Order line profit is not total seller price - total unit cost",
+}
+FIXABLE = ("sold_without_order", "not_sold", "wrong_order", "piece_profit", "line_profit")
+
+REPORT_COLUMNS = ["problem", "piece_id", "order_id", "stock_row", "order_row"]
+
+TOLERANCE = 0.01  # Rupees
+
+
+def _report(problem, piece_id, order_id, stock_row, order_row):
+    values = [problem, piece_id, order_id, stock_row, order_row]
+    # Arrays, not Series, so rows taken from the two tables are not aligned on their labels
+    values = [np.asarray(value, dtype=object) if isinstance(value, (pd.Series, pd.Index)) else value
+              for value in values]
+    return pd.DataFrame(dict(zip(REPORT_COLUMNS, values)), columns=REPORT_COLUMNS)
+
+
+def allocations(df_stock, df_orders):
+    """One row per (order line, allocated piece id), with the piece's stock row (-1 if unknown)"""
+    ids = df_orders["allocated_piece_ids"].dropna().astype(str)
+    ids = ids[ids.str.strip() != ""]
+    counts = ids.str.count(",").to_numpy() + 1
+    order_rows = ids.index.to_numpy().repeat(counts)
+    piece_ids = pd.Series(",".join(ids).split(",") if len(ids) else [], dtype=object).str.strip().to_numpy()
+
+    unique = ~df_stock["piece_id"].duplicated().to_numpy()
+    labels = df_stock.index.to_numpy()[unique]
+    found = pd.Index(df_stock["piece_id"].to_numpy()[unique]).get_indexer(piece_ids)
+    return pd.DataFrame({"order_row": order_rows, "piece_id": piece_ids,
+                         "order_id": df_orders.loc[order_rows, "order_id"].to_numpy(),
+                         "status": df_orders.loc[order_rows, "status"].to_numpy(),
+                         "stock_row": np.where(found >= 0, labels[found], -1)})
+
+
+def _mismatch(profit, sell, cost):
+    known = sell.notna() & cost.notna()
+    return known & ~np.isclose(profit.fillna(np.inf), sell - cost, rtol=0, atol=TOLERANCE)
+
+
+def check(df_stock, df_orders):
+    """Every problem found between ``df_stock`` and ``df_orders``, one row each (``REPORT_COLUMNS``)"""
+    found = []
+    duplicated = df_stock["piece_id"].notna() & df_stock["piece_id"].duplicated(keep=False)
+    dup = df_stock[duplicated]
+    found.append(_report("duplicate_piece", dup["piece_id"], dup["order_id"], dup.index, -1))
+
+    pairs = allocations(df_stock, df_orders)
+    unknown = pairs[pairs["stock_row"] < 0]
+    found.append(_report("unknown_piece", unknown["piece_id"], unknown["order_id"], -1, unknown["order_row"]))
+
+    active = pairs[(pairs["status"] == "ACTIVE") & (pairs["stock_row"] >= 0)]
+    holders = active["stock_row"].value_counts()
+    several = active["stock_row"].isin(holders.index[holders > 1])
+    shared = active[several]
+    found.append(_report("several_orders", shared["piece_id"], shared["order_id"], shared["stock_row"],
+                         shared["order_row"]))
+
+    # Pieces held by exactly one active order line, against their stock rows
+    held = active[~several]
+    piece = df_stock.loc[held["stock_row"]]
+    not_sold = (piece["status"] != "SOLD").to_numpy()
+    wrong = ~not_sold & (piece["order_id"].astype(object).to_numpy() != held["order_id"].to_numpy())
+    for problem, mask in (("not_sold", not_sold), ("wrong_order", wrong)):
+        rows = held[mask]
+        found.append(_report(problem, rows["piece_id"], rows["order_id"], rows["stock_row"], rows["order_row"]))
+
+    # Only a stray piece naming no order is put back in stock; one naming an order needs a look first
+    sold = df_stock[(df_stock["status"] == "SOLD") & ~df_stock.index.isin(active["stock_row"])]
+    named = sold["order_id"].notna() & (sold["order_id"].astype(str).str.strip() != "")
+    known = sold["order_id"].isin(df_orders["order_id"].dropna())
+    for problem, mask in (("sold_without_order", ~named), ("sold_to_missing_order", named & ~known),
+                          ("sold_to_inactive_order", named & known)):
+        rows = sold[mask]
+        found.append(_report(problem, rows["piece_id"], rows["order_id"], rows.index, -1))
+
+    bad = df_stock[_mismatch(df_stock["profit"], df_stock["seller_price"], df_stock["unit_cost"])]
+    found.append(_report("piece_profit", bad["piece_id"], bad["order_id"], bad.index, -1))
+    bad = df_orders[_mismatch(df_orders["profit_total"], df_orders["total_seller_price"],
+                              df_orders["total_unit_cost"])]
+    found.append(_report("line_profit", None, bad["order_id"], -1, bad.index))
+
+    report = pd.concat(found, ignore_index=True)
+    report[["stock_row", "order_row"]] = report[["stock_row", "order_row"]].astype(np.int64)
+    return report
+
+
+def fixes(report, df_stock, df_orders):
+    """New values of the undoable fields that resolve the fixable problems in ``report``.
+
+    Returns ``(stock, orders)`` frames of ``STOCK_FIELDS`` / ``ORDER_FIELDS``
+    indexed by the rows to change.  Stray SOLD pieces go back in stock,
+    pieces held by one active order are marked sold to it, and profits are
+    recomputed from the prices.
+    """
+    fixable = report[report["problem"].isin(FIXABLE)]
+    by_problem = {problem: rows for problem, rows in fixable.groupby("problem")}
+    empty = fixable.iloc[:0]
+
+    stock = df_stock.loc[fixable.loc[fixable["stock_row"] >= 0, "stock_row"].unique(), STOCK_FIELDS].copy()
+    stray = by_problem.get("sold_without_order", empty)["stock_row"].to_numpy()
+    stock.loc[stray, "status"] = "IN_STOCK"
+    stock.loc[stray, "sold_date"] = pd.NaT
+    stock.loc[stray, "order_id"] = None
+
+    held = pd.concat([by_problem.get("not_sold", empty), by_problem.get("wrong_order", empty)])
+    rows = held["stock_row"].to_numpy()
+    stock.loc[rows, "status"] = "SOLD"
+    stock.loc[rows, "order_id"] = held["order_id"].to_numpy()
+    stock.loc[rows, "sold_date"] = df_orders.loc[held["order_row"], "order_date"].to_numpy()
+
+    rows = by_problem.get("piece_profit", empty)["stock_row"].to_numpy()
+    stock.loc[rows, "profit"] = (df_stock.loc[rows, "seller_price"] - df_stock.loc[rows, "unit_cost"]).to_numpy()
+
+    rows = by_problem.get("line_profit", empty)["order_row"].to_numpy()
+    orders = df_orders.loc[rows, ORDER_FIELDS].copy()
+    orders["profit_total"] = (df_orders.loc[rows, "total_seller_price"] -
+                              df_orders.loc[rows, "total_unit_cost"]).to_numpy()
+    return stock, orders
@@ -1,61 +1,67 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, filedialog
 import pandas as pd
-import os
 from datetime import datetime, timedelta
 import calendar
-
-STOCK_FILE = "stock.xlsx"
-ORDERS_FILE = "orders.xlsx"
-
-
-# Ensure Excel files exist
-# Ensure Excel files exist with proper date formatting
-# Ensure Excel files exist with proper date formatting
-def init_files():
-    if not os.path.exists(STOCK_FILE):
-        df = pd.DataFrame(
-            columns=["piece_id", "product_name", "length_m", "date_added", "seller_price", "unit_cost", "profit",
-                     "status", "sold_date", "order_id"])
-        # Save with explicit datetime format
-        try:
-            with pd.ExcelWriter(STOCK_FILE, engine='openpyxl', datetime_format='YYYY-MM-DD HH:MM:SS') as writer:
-                df.to_excel(writer, index=False)
-        except:
-            # Fallback if openpyxl not available
-            df.to_excel(STOCK_FILE, index=False)
-
-    if not os.path.exists(ORDERS_FILE):
-        df = pd.DataFrame(
-            columns=["order_id", "order_date", "customer_name", "address", "phone1", "phone2", "city", "item_name",
-                     "length_m", "qty", "total_unit_cost", "total_seller_price", "profit_total", "allocated_piece_ids",
-                     "status"])
-        # Save with explicit datetime format
-        try:
-            with pd.ExcelWriter(ORDERS_FILE, engine='openpyxl', datetime_format='YYYY-MM-DD HH:MM:SS') as writer:
-                df.to_excel(writer, index=False)
-        except:
-            # Fallback if openpyxl not available
-            df.to_excel(ORDERS_FILE, index=False)
-
-
-# Load product names from stock
-def get_product_names():
-    if os.path.exists(STOCK_FILE):
-        df = pd.read_excel(STOCK_FILE)
-        if "product_name" in df.columns:
-            return sorted(df["product_name"].dropna().unique().tolist())
-    return []
+import queue
+import threading
+
+from aging import AGE_LABELS, REPORTS as AGING_REPORTS, aging_report
+from allocation import STRATEGIES
+from analytics import SEGMENTS, CustomerAnalytics
+from backup import BackupScheduler, BackupSet
+from chart import TrendChart
+from exporter import EXPORT_FILETYPES, export_in_background
+from forecast import LEAD_TIME_DAYS, REORDER_NOW, REVIEW_DAYS, DemandForecast
+from importer import import_workbook
+from integrity import FIXABLE, PROBLEMS
+from metrics import DEFAULT_VIEW, FIELDS, VIEWS, compute_metrics, format_metrics, profit_percentage
+from partitions import period_range
+from pivot import SOURCES, PivotEngine
+from result_cache import ResultCache
+from store import DataLockedError, DataStore, OrderError, init_files
+from table_sort import column_order, sort_view, sorted_positions
+from timeseries import MONEY_SERIES, SERIES, TrendSeries
 
 
 class StockApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, view=DEFAULT_VIEW):
         super().__init__()
         self.title("LED Strip Stock & Orders App")
         self.geometry("1400x800")
 
+        # Profit shown as margin (on sell price) or markup (on cost); see metrics.VIEWS
+        self.metrics_view = view
+
+        # In-memory stock and orders, shared by every tab
+        try:
+            self.store = DataStore()
+        except DataLockedError as e:
+            self.withdraw()
+            messagebox.showerror("Data In Use", str(e), parent=self)
+            self.destroy()
+            raise SystemExit(1)
+        # Summary and report results, reused until the store's data version changes
+        self.result_cache = ResultCache()
+        self.customer_analytics = CustomerAnalytics(self.store)
+        self.pivot_engine = PivotEngine(self.store)
+        self.demand_forecast = DemandForecast(self.store)
+        self.trend_series = TrendSeries(self.store)
+        # Build the order search index in the background so the first search is instant
+        threading.Thread(target=self.store.refresh_search_index, daemon=True).start()
+        threading.Thread(target=self.pivot_engine.typed, args=("Orders",), daemon=True).start()
+        threading.Thread(target=self.trend_series.series, daemon=True).start()
+        # Incremental snapshots of the data, taken on a schedule in the background
+        self.backups = BackupSet(self.store)
+        self.backup_scheduler = BackupScheduler(self.backups)
+        self.backup_scheduler.start()
+        # Column each table is sorted by, as (column, descending), and the plain heading labels
+        self.table_sort = {"stock": None, "orders": None}
+        self.table_headings = {}
+
         # Initialize product_names here
-        self.product_names = get_product_names()
+        self.product_names = self.store.product_names()
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
@@ -63,30 +69,234 @@ class StockApp(tk.Tk):
         self.stock_tab = ttk.Frame(self.notebook)
         self.orders_tab = ttk.Frame(self.notebook)
         self.summary_tab = ttk.Frame(self.notebook)
+        self.pivot_tab = ttk.Frame(self.notebook)
 
         self.notebook.add(self.stock_tab, text="Stock Management")
         self.notebook.add(self.orders_tab, text="Order Management")
         self.notebook.add(self.summary_tab, text="Summary Report")
+        self.notebook.add(self.pivot_tab, text="Pivot Analysis")
 
         self.create_stock_tab()
         self.create_orders_tab()
         self.create_summary_tab()
+        self.create_pivot_tab()
+        self.create_menus()
+        if self.store.stale_journal:
+            messagebox.showwarning("Stock Workbook Edited",
+                                   f"{self.store.stock_file} was changed after the app last saved stock, so the "
+                                   f"unsaved stock changes were set aside in {self.store.stale_journal}.")
+        self.check_data(startup=True)
 
         # Auto-refresh product names in comboboxes
         self.update_product_comboboxes()
 
         # Bind tab change event to refresh summary
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_change)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Write the stock workbook in full and release the data directory before exiting"""
+        self.backup_scheduler.stop()
+        try:
+            self.store.close()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save data: {e}")
+        self.destroy()
 
     def on_tab_change(self, event):
         """Refresh summary tab when it is selected"""
         current_tab = self.notebook.index(self.notebook.select())
         if current_tab == 2:  # Summary tab is index 2
             self.update_summary()
+        elif current_tab == 3:  # Pivot tab; unchanged pivots come straight from the cache
+            self.update_pivot()
+
+    def create_menus(self):
+        """File menu for backups, Edit menu and Ctrl+Z / Ctrl+Y for undoing stock and order changes"""
+        menubar = tk.Menu(self)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Backups...", command=self.show_backups)
+        file_menu.add_command(label="Check Data", command=self.check_data)
+        menubar.add_cascade(label="File", menu=file_menu)
+
+        self.edit_menu = tk.Menu(menubar, tearoff=0, postcommand=self.update_edit_menu)
+        self.edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        self.edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        menubar.add_cascade(label="Edit", menu=self.edit_menu)
+        self.config(menu=menubar)
+        self.bind("<Control-z>", self.undo)
+        self.bind("<Control-y>", self.redo)
+
+    def update_edit_menu(self):
+        """Name the change Undo and Redo would revert or repeat"""
+        history = self.store.undo_history
+        for index, (action, label) in enumerate([("Undo", history.undo_label()), ("Redo", history.redo_label())]):
+            self.edit_menu.entryconfig(index, label=f"{action} {label}" if label else action,
+                                       state="normal" if label else "disabled")
+
+    def undo(self, event=None):
+        """Revert the latest stock or order change"""
+        self.undo_or_redo(self.store.undo, event)
+
+    def redo(self, event=None):
+        """Apply the latest undone change again"""
+        self.undo_or_redo(self.store.redo, event)
+
+    def undo_or_redo(self, step, event=None):
+        # Leave the shortcuts alone while typing in a field
+        if event is not None and isinstance(event.widget, (tk.Entry, ttk.Entry, tk.Text)):
+            return
+        try:
+            label = step()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save changes: {e}")
+            return
+        if label is None:
+            self.bell()
+            return
+
+        # Refresh data
+        self.load_orders()
+        self.load_stock()
+        self.update_product_comboboxes()
+
+        # Auto-update summary if it's visible
+        current_tab = self.notebook.index(self.notebook.select())
+        if current_tab == 2:  # Summary tab is index 2
+            self.update_summary()
+
+    def check_data(self, startup=False):
+        """Check stock against orders on a worker thread and offer to repair what can be fixed"""
+        finished = queue.Queue()
+
+        def worker():
+            try:
+                finished.put((self.store.check_integrity(), None))
+            except Exception as e:
+                finished.put((None, e))
+
+        def poll():
+            try:
+                report, error = finished.get_nowait()
+            except queue.Empty:
+                self.after(200, poll)
+                return
+
+            if error is not None:
+                messagebox.showerror("Error", f"Data check failed: {error}")
+                return
+            if report.empty:
+                if not startup:
+                    messagebox.showinfo("Data Check", "No problems found")
+                return
+
+            text = "Stock and orders do not agree:\n\n" + "\n".join(
+                f"{count:,} x {PROBLEMS[problem]}" for problem, count in report["problem"].value_counts().items())
+            fixable = int(report["problem"].isin(FIXABLE).sum())
+            if not fixable:
+                messagebox.showwarning("Data Check", text + "\n\nThese have to be corrected by hand.")
+                return
+            if not messagebox.askyesno("Data Check", text + f"\n\nRepair {fixable:,} of them now? "
+                                                            "The repair can be undone."):
+                return
+
+            self.store.check_integrity(repair=True)
+            self.load_orders()
+            self.load_stock()
+            self.update_product_comboboxes()
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def show_backups(self):
+        # Snapshots taken so far, with on-demand backup and point-in-time restore
+        window = tk.Toplevel(self)
+        window.title("Backups")
+        window.geometry("700x450")
+
+        control_frame = ttk.Frame(window)
+        control_frame.pack(fill="x", padx=10, pady=10)
+
+        status_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=status_var).grid(row=0, column=2, padx=5, pady=5, sticky="w")
+
+        columns = [("created", "Taken", 160), ("pieces", "Pieces", 100), ("order_lines", "Order Lines", 100),
+                   ("customers", "Customers", 100), ("new_bytes", "New Data (KB)", 110)]
+        table = ttk.Treeview(window, columns=[col for col, _, _ in columns], show="headings", selectmode="browse")
+        for col, heading, width in columns:
+            table.heading(col, text=heading)
+            table.column(col, width=width, anchor="w" if col == "created" else "e")
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            table.delete(*table.get_children())
+            for name in self.backups.snapshots():
+                manifest = self.backups.manifest(name)
+                table.insert("", "end", iid=name, values=(
+                    manifest["created"].replace("T", " "), f"{manifest['pieces']:,}", f"{manifest['order_lines']:,}",
+                    f"{manifest['customers']:,}", f"{manifest['new_bytes'] / 1024:,.1f}"))
+            error = self.backup_scheduler.last_error
+            status_var.set(f"Last scheduled backup failed: {error}" if error else
+                           f"{len(table.get_children()):,} snapshots in {self.backups.directory}")
+
+        def run_in_background(work, done):
+            # Backups and restores run on a worker thread; Tk widgets are only touched from poll()
+            finished = queue.Queue()
+
+            def worker():
+                try:
+                    finished.put((work(), None))
+                except Exception as e:
+                    finished.put((None, e))
+
+            def poll():
+                try:
+                    result, error = finished.get_nowait()
+                except queue.Empty:
+                    window.after(200, poll)
+                    return
+                if error is not None:
+                    messagebox.showerror("Error", str(error), parent=window)
+                else:
+                    done(result)
+                refresh()
+
+            threading.Thread(target=worker, daemon=True).start()
+            poll()
+
+        def back_up_now():
+            status_var.set("Backing up...")
+            run_in_background(self.backups.snapshot, lambda name: None if name else messagebox.showinfo(
+                "Backups", "Nothing has changed since the last snapshot", parent=window))
+
+        def restore_selected():
+            selected = table.selection()
+            if not selected:
+                messagebox.showwarning("Warning", "Please select a snapshot to restore", parent=window)
+                return
+            taken = table.item(selected[0])["values"][0]
+            if not messagebox.askyesno("Confirm", f"Replace all stock, orders and customers with the snapshot "
+                                                  f"taken {taken}?\n\nChanges made since then will be lost.",
+                                       parent=window):
+                return
+
+            def restored(result):
+                messagebox.showinfo("Success", f"Restored the snapshot taken {taken}", parent=window)
+                self.load_stock()
+                self.load_orders()
+                self.update_product_comboboxes()
+
+            status_var.set("Restoring...")
+            run_in_background(lambda: self.backups.restore(selected[0]), restored)
+
+        ttk.Button(control_frame, text="Back Up Now", command=back_up_now).grid(row=0, column=0, padx=5, pady=5)
+        ttk.Button(control_frame, text="Restore Selected", command=restore_selected).grid(row=0, column=1, padx=5,
+                                                                                          pady=5)
+        refresh()
 
     def update_product_comboboxes(self):
-        # Refresh product names from file
-        self.product_names = get_product_names()
+        # Refresh product names from the store
+        self.product_names = self.store.product_names()
 
         # Update comboboxes only if they exist
         if hasattr(self, 'product_cb'):
@@ -188,7 +398,7 @@ class StockApp(tk.Tk):
         ttk.Label(filter_frame, text="Status:").grid(row=0, column=4, padx=5, pady=5)
         self.filter_status_var = tk.StringVar()
         self.filter_status_cb = ttk.Combobox(filter_frame, textvariable=self.filter_status_var,
-                                             values=["All", "IN_STOCK", "SOLD", "REMOVED"], width=12)
+                                             values=["All", "IN_STOCK", "SOLD", "REMOVED", "VOIDED"], width=12)
         self.filter_status_cb.set("IN_STOCK")
         self.filter_status_cb.grid(row=0, column=5, padx=5, pady=5)
         self.filter_status_cb.bind('<<ComboboxSelected>>', lambda e: self.apply_stock_filters())
@@ -214,6 +424,14 @@ class StockApp(tk.Tk):
         remove_btn = ttk.Button(remove_frame, text="Remove Selected", command=self.remove_selected_stock)
         remove_btn.grid(row=0, column=1, padx=5, pady=5, sticky="e")
 
+        import_stock_btn = ttk.Button(remove_frame, text="Import Legacy Stock...",
+                                      command=lambda: self.import_legacy_workbook("stock"))
+        import_stock_btn.grid(row=0, column=2, padx=5, pady=5, sticky="e")
+
+        export_stock_btn = ttk.Button(remove_frame, text="Export View...",
+                                      command=lambda: self.export_frame(self.stock_view, "stock"))
+        export_stock_btn.grid(row=0, column=3, padx=5, pady=5, sticky="e")
+
         # Bottom frame for Stock Preview (LARGE TABLE)
         bottom_frame = ttk.LabelFrame(main_frame, text="Stock Preview")
         bottom_frame.pack(fill="both", expand=True, padx=5, pady=5)
@@ -243,8 +461,9 @@ class StockApp(tk.Tk):
                    ("status", "Status", 100)]
 
         for col_id, heading, width in columns:
-            self.stock_table.heading(col_id, text=heading)
+            self.stock_table.heading(col_id, text=heading, command=lambda c=col_id: self.sort_table("stock", c))
             self.stock_table.column(col_id, width=width, anchor="center")
+        self.table_headings["stock"] = {col_id: heading for col_id, heading, _ in columns}
 
         self.stock_table.pack(fill="both", expand=True)
 
@@ -310,7 +529,7 @@ class StockApp(tk.Tk):
         status_filter = self.filter_status_var.get()
         date_filter = self.filter_date_var.get()
 
-        df = pd.read_excel(STOCK_FILE)
+        df = self.store.stock_frame()
 
         # Apply filters
         if product_filter and product_filter != "All":
@@ -322,53 +541,74 @@ class StockApp(tk.Tk):
         if status_filter and status_filter != "All":
             df = df[df["status"] == status_filter]
 
-        # Apply date filter
-        if date_filter and date_filter != "All":
-            try:
-                # Convert dates safely
-                df["date_added"] = pd.to_datetime(df["date_added"], errors='coerce', format='mixed')
-                today = datetime.now().date()
-
-                # Drop rows with invalid dates
-                df = df.dropna(subset=['date_added'])
-
-                if date_filter == "Today":
-                    df = df[df["date_added"].dt.date == today]
-                elif date_filter == "Last 7 Days":
-                    seven_days_ago = today - timedelta(days=7)
-                    df = df[df["date_added"].dt.date >= seven_days_ago]
-                elif date_filter == "This Month":
-                    df = df[df["date_added"].dt.month == today.month]
-                elif date_filter == "Last Month":
-                    last_month = today.month - 1 if today.month > 1 else 12
-                    df = df[df["date_added"].dt.month == last_month]
-                elif date_filter == "Last 3 Months":
-                    three_months_ago = today - timedelta(days=90)
-                    df = df[df["date_added"].dt.date >= three_months_ago]
-                elif date_filter == "Last 6 Months":
-                    six_months_ago = today - timedelta(days=180)
-                    df = df[df["date_added"].dt.date >= six_months_ago]
-                elif date_filter == "Last 12 Months":
-                    twelve_months_ago = today - timedelta(days=365)
-                    df = df[df["date_added"].dt.date >= twelve_months_ago]
-            except Exception as e:
-                messagebox.showerror("Error", f"Date filter error: {str(e)}")
-                return
+        # Apply date filter; the same ranges as the orders tab, so months don't match across years
+        date_range = period_range(date_filter)
+        if date_range:
+            start, end = date_range
+            in_range = df["date_added"] >= start
+            if end is not None:
+                in_range &= df["date_added"] < end
+            df = df[in_range]
 
         # Display filtered results
-        for row in self.stock_table.get_children():
-            self.stock_table.delete(row)
-
-        for _, row in df.iterrows():
-            self.stock_table.insert("", "end", values=(
-                row["piece_id"], row["product_name"], row["length_m"],
-                row["date_added"], row["seller_price"], row["unit_cost"],
-                row["profit"], row["status"]
-            ))
+        self.show_stock_rows(df)
 
         # Update totals
+        self.stock_view = df
         self.update_stock_totals(df)
 
+    def show_stock_rows(self, df):
+        """Fill the stock table with ``df`` in the current sort order"""
+        self.stock_table.delete(*self.stock_table.get_children())
+        rows = self.sorted_rows("stock", df)
+        # Items are keyed by store row position so a re-sort can reorder them in place
+        for position, row in zip(rows.index, rows.itertuples(index=False)):
+            date_added = row.date_added.strftime("%Y-%m-%d %H:%M") if pd.notna(row.date_added) else "N/A"
+            self.stock_table.insert("", "end", iid=position, values=(
+                row.piece_id, row.product_name, row.length_m,
+                date_added, row.seller_price, row.unit_cost,
+                row.profit, row.status
+            ))
+
+    def sorted_rows(self, table, view, limit=None):
+        """``view`` in the table's sort order, using a cached permutation of the whole column.
+
+        A ``view`` of None is the whole orders table; only its first ``limit`` rows are copied.
+        """
+        if self.table_sort[table] is None:
+            return view if limit is None else view.head(limit)
+        column, descending = self.table_sort[table]
+        key = ("sort", table, column)
+        with self.store.lock:
+            version = self.store.version
+            found, order = self.result_cache.lookup(key, version)
+            if not found:
+                values = getattr(self.store, table)[column].copy()
+        if not found:
+            order = column_order(values)
+            self.result_cache.put(key, version, order)
+        if view is None:
+            return self.store.orders_frame(sorted_positions(order, descending)[:limit])
+        return sort_view(view, order, descending, limit)
+
+    def sort_table(self, table, column):
+        """Sort a table by a clicked heading; clicking the same heading again reverses it"""
+        current = self.table_sort[table]
+        descending = current is not None and current[0] == column and not current[1]
+        self.table_sort[table] = (column, descending)
+
+        treeview = self.stock_table if table == "stock" else self.orders_table
+        for col_id, heading in self.table_headings[table].items():
+            arrow = (" \u25bc" if descending else " \u25b2") if col_id == column else ""
+            treeview.heading(col_id, text=heading + arrow)
+
+        if table == "orders" and self.orders_limit is not None:
+            # Only the first rows of the history are shown, so which rows those are changes
+            self.show_order_rows(self.sorted_rows("orders", self.orders_view, self.orders_limit))
+            return
+        view = self.stock_view if table == "stock" else self.orders_view
+        treeview.set_children("", *self.sorted_rows(table, view).index.tolist())
+
     def update_stock_totals(self, df):
         """Update the total sell price, cost and profit for displayed items"""
         total_sell_price = df["seller_price"].sum()
@@ -376,14 +616,14 @@ class StockApp(tk.Tk):
         total_profit = df["profit"].sum()
         total_quantity = len(df)
 
-        # Calculate profit margin (percentage of profit based on selling price)
-        profit_margin = (total_profit / total_sell_price * 100) if total_sell_price > 0 else 0
+        # Margin or markup, depending on the view
+        profit_pct = profit_percentage(total_profit, total_sell_price, total_cost, self.metrics_view)
 
         self.total_sell_price_var.set(f"Rs. {total_sell_price:,.2f}")
         self.total_cost_var.set(f"Rs. {total_cost:,.2f}")
         self.total_profit_var.set(f"Rs. {total_profit:,.2f}")
         self.total_quantity_var.set(f"{total_quantity:,}")
-        self.profit_percentage_var.set(f"{profit_margin:.2f}%")
+        self.profit_percentage_var.set(f"{profit_pct:.2f}%")
 
     def clear_stock_filters(self):
         self.filter_product_var.set("")
@@ -411,18 +651,11 @@ class StockApp(tk.Tk):
             messagebox.showerror("Error", "Please enter valid numbers")
             return
 
-        df = pd.read_excel(STOCK_FILE)
-        date_added = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        rows = []
-        for i in range(pcs):
-            piece_id = f"{product}_{length}m_{len(df) + i + 1}"
-            profit = seller_price - unit_cost
-            rows.append(
-                [piece_id, product, length, date_added, seller_price, unit_cost, profit, "IN_STOCK", None, None])
-
-        new_df = pd.DataFrame(rows, columns=df.columns)
-        df = pd.concat([df, new_df], ignore_index=True)
-        df.to_excel(STOCK_FILE, index=False)
+        try:
+            self.store.add_stock(product, length, pcs, unit_cost, seller_price)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
         messagebox.showinfo("Success", f"Added {pcs} pcs of {product} ({length}m)")
 
         # Clear input fields
@@ -437,10 +670,6 @@ class StockApp(tk.Tk):
         if current_tab == 2:  # Summary tab is index 2
             self.update_summary()
 
-            # Save with proper date formatting
-        with pd.ExcelWriter(STOCK_FILE, engine='openpyxl', datetime_format='YYYY-MM-DD HH:MM:SS') as writer:
-            df.to_excel(writer, index=False)
-
     def remove_selected_stock(self):
         selected_items = self.stock_table.selection()
         if not selected_items:
@@ -451,16 +680,14 @@ class StockApp(tk.Tk):
         if not result:
             return
 
-        df = pd.read_excel(STOCK_FILE)
         pieces_to_remove = []
 
         for item in selected_items:
             piece_id = self.stock_table.item(item)['values'][0]
-            pieces_to_remove.append(piece_id)
+            pieces_to_remove.append(str(piece_id))
 
         # Mark as REMOVED instead of actually deleting
-        df.loc[df['piece_id'].isin(pieces_to_remove), 'status'] = 'REMOVED'
-        df.to_excel(STOCK_FILE, index=False)
+        self.store.remove_pieces(pieces_to_remove)
 
         messagebox.showinfo("Success", f"Removed {len(selected_items)} item(s)")
         self.load_stock()
@@ -471,18 +698,8 @@ class StockApp(tk.Tk):
             self.update_summary()
 
     def load_stock(self):
-        for row in self.stock_table.get_children():
-            self.stock_table.delete(row)
-
-        # Read with explicit date formatting
-        df = pd.read_excel(STOCK_FILE)
-
-        # Convert date columns with proper formatting
-        date_columns = ['date_added', 'sold_date']
-        for col in date_columns:
-            if col in df.columns:
-                # First try to convert with specific format, then fallback to coerce
-                df[col] = pd.to_datetime(df[col], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        # Dates are already parsed by the store
+        df = self.store.stock_frame()
 
         # Apply current filter
         status_filter = self.filter_status_var.get() if hasattr(self, 'filter_status_var') else "IN_STOCK"
@@ -491,18 +708,10 @@ class StockApp(tk.Tk):
         else:
             df = df[df['status'] == 'IN_STOCK']
 
-        for _, row in df.iterrows():
-            # Format dates for display
-            date_added = row["date_added"].strftime("%Y-%m-%d %H:%M") if pd.notna(row["date_added"]) else "N/A"
-            sold_date = row["sold_date"].strftime("%Y-%m-%d %H:%M") if pd.notna(row["sold_date"]) else "N/A"
-
-            self.stock_table.insert("", "end", values=(
-                row["piece_id"], row["product_name"], row["length_m"],
-                date_added, row["seller_price"], row["unit_cost"],
-                row["profit"], row["status"]
-            ))
+        self.show_stock_rows(df)
 
         # Update totals
+        self.stock_view = df
         self.update_stock_totals(df)
 
     def create_orders_tab(self):
@@ -529,6 +738,7 @@ class StockApp(tk.Tk):
         self.cust_name = ttk.Entry(cust_col1, width=25)
         self.cust_name.grid(row=0, column=1, padx=5, pady=5, sticky="w")
         self.cust_name.bind('<Return>', lambda e: self.cust_address.focus())
+        self.cust_name.bind('<FocusOut>', lambda e: self.autofill_customer(by_name=True))
 
         ttk.Label(cust_col1, text="Address:").grid(row=1, column=0, padx=5, pady=5, sticky="e")
         self.cust_address = ttk.Entry(cust_col1, width=25)
@@ -539,6 +749,8 @@ class StockApp(tk.Tk):
         self.cust_phone1 = ttk.Entry(cust_col1, width=25)
         self.cust_phone1.grid(row=2, column=1, padx=5, pady=5, sticky="w")
         self.cust_phone1.bind('<Return>', lambda e: self.cust_phone2.focus())
+        # Known phone numbers fill in the rest of the customer details
+        self.cust_phone1.bind('<KeyRelease>', lambda e: self.autofill_customer())
 
         ttk.Label(cust_col2, text="Phone 2:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
         self.cust_phone2 = ttk.Entry(cust_col2, width=25)
@@ -643,6 +855,14 @@ class StockApp(tk.Tk):
         order_btn = ttk.Button(order_btn_frame, text="Place Order", command=self.place_order)
         order_btn.pack(side="right", padx=5, pady=5)
 
+        # Which pieces get allocated first (FIFO, cost layers, ...)
+        self.strategy_var = tk.StringVar(value=self.store.strategy)
+        self.strategy_cb = ttk.Combobox(order_btn_frame, textvariable=self.strategy_var,
+                                        values=list(STRATEGIES), state="readonly", width=15)
+        self.strategy_cb.pack(side="right", padx=5, pady=5)
+        self.strategy_cb.bind('<<ComboboxSelected>>', self.on_strategy_change)
+        ttk.Label(order_btn_frame, text="Allocation:").pack(side="right", padx=5, pady=5)
+
         # Bottom frame for Order History & Filters (FULL WIDTH)
         history_frame = ttk.LabelFrame(main_frame, text="Order History & Filters")
         history_frame.pack(fill="both", expand=True, padx=5, pady=5)
@@ -660,6 +880,16 @@ class StockApp(tk.Tk):
                                 command=self.cancel_or_return_order)
         return_btn.pack(side="right", padx=5, pady=5)
 
+        import_orders_btn = ttk.Button(filter_top_frame, text="Import Legacy Orders...",
+                                       command=lambda: self.import_legacy_workbook("orders"))
+        import_orders_btn.pack(side="right", padx=5, pady=5)
+
+        export_orders_btn = ttk.Button(filter_top_frame, text="Export View...",
+                                       command=lambda: self.export_frame(
+                                           self.store.orders_frame() if self.orders_view is None else self.orders_view,
+                                           "orders"))
+        export_orders_btn.pack(side="right", padx=5, pady=5)
+
         # Filter controls
         order_filter_frame = ttk.Frame(filter_left_frame)
         order_filter_frame.pack(fill="x", pady=5)
@@ -692,7 +922,8 @@ class StockApp(tk.Tk):
         ttk.Label(order_filter_frame, text="Status:").grid(row=0, column=6, padx=5, pady=5)
         self.order_filter_status_var = tk.StringVar()
         self.order_filter_status_cb = ttk.Combobox(order_filter_frame, textvariable=self.order_filter_status_var,
-                                                   values=["All", "ACTIVE", "CANCELLED", "RETURNED"], width=12)
+                                                   values=["All", "ACTIVE", "CANCELLED", "RETURNED", "VOIDED"],
+                                                   width=12)
         self.order_filter_status_cb.set("ACTIVE")
         self.order_filter_status_cb.grid(row=0, column=7, padx=5, pady=5)
         self.order_filter_status_cb.bind('<<ComboboxSelected>>', lambda e: self.apply_order_filters())
@@ -700,6 +931,15 @@ class StockApp(tk.Tk):
         clear_order_filter_btn = ttk.Button(order_filter_frame, text="Clear Filters", command=self.clear_order_filters)
         clear_order_filter_btn.grid(row=0, column=8, padx=5, pady=5)
 
+        # Full-text search over the whole order history (inverted index in search.py)
+        ttk.Label(order_filter_frame, text="Search:").grid(row=1, column=0, padx=5, pady=5)
+        self.order_search_var = tk.StringVar()
+        self.order_search_entry = ttk.Entry(order_filter_frame, textvariable=self.order_search_var, width=50)
+        self.order_search_entry.grid(row=1, column=1, columnspan=3, padx=5, pady=5, sticky="w")
+        self.order_search_entry.bind('<KeyRelease>', self.on_order_search)
+        ttk.Label(order_filter_frame, text="order id, customer, phone, address or city",
+                  foreground="gray").grid(row=1, column=4, columnspan=4, padx=5, pady=5, sticky="w")
+
         # Orders history with scrollbar
         table_frame = ttk.Frame(history_frame)
         table_frame.pack(fill="both", expand=True, padx=10, pady=5)
@@ -725,8 +965,9 @@ class StockApp(tk.Tk):
                    ("status", "Status", 80)]
 
         for col_id, heading, width in columns:
-            self.orders_table.heading(col_id, text=heading)
+            self.orders_table.heading(col_id, text=heading, command=lambda c=col_id: self.sort_table("orders", c))
             self.orders_table.column(col_id, width=width, anchor="center")
+        self.table_headings["orders"] = {col_id: heading for col_id, heading, _ in columns}
 
         self.orders_table.pack(fill="both", expand=True)
 
@@ -835,6 +1076,97 @@ class StockApp(tk.Tk):
             # Handle invalid input (non-numeric)
             pass
 
+    def import_legacy_workbook(self, kind):
+        """Stream a legacy stock or orders workbook into the store with a progress bar"""
+        path = filedialog.askopenfilename(title=f"Import legacy {kind} workbook",
+                                          filetypes=[("Excel workbooks", "*.xlsx *.xlsm"), ("All files", "*.*")])
+        if not path:
+            return
+
+        popup = tk.Toplevel(self)
+        popup.title(f"Importing {kind}")
+        popup.geometry("420x120")
+        popup.transient(self)
+        popup.grab_set()
+
+        status_var = tk.StringVar(value="Reading workbook...")
+        ttk.Label(popup, textvariable=status_var).pack(pady=10)
+        progress_bar = ttk.Progressbar(popup, length=380, mode="determinate")
+        progress_bar.pack(pady=5)
+
+        # The import runs on a worker thread; Tk widgets are only touched from poll()
+        updates = queue.Queue()
+
+        def worker():
+            try:
+                counts = import_workbook(self.store, path, kind,
+                                         progress=lambda done, total: updates.put(("progress", (done, total))))
+                updates.put(("done", counts))
+            except Exception as e:
+                updates.put(("error", e))
+
+        def poll():
+            try:
+                while True:
+                    message, payload = updates.get_nowait()
+                    if message == "progress":
+                        done, total = payload
+                        if total:
+                            progress_bar["maximum"] = total
+                            progress_bar["value"] = done
+                            status_var.set(f"{done:,} of {total:,} rows")
+                        else:
+                            status_var.set(f"{done:,} rows")
+                        continue
+
+                    popup.destroy()
+                    if message == "error":
+                        messagebox.showerror("Error", f"Import failed: {payload}")
+                        return
+
+                    messagebox.showinfo("Success",
+                                        f"Imported {payload['imported']:,} {kind} rows\n"
+                                        f"Rejected: {payload['rejected']:,}\n"
+                                        f"Skipped duplicates: {payload['duplicates']:,}")
+                    self.load_stock()
+                    self.load_orders()
+                    self.update_product_comboboxes()
+                    return
+            except queue.Empty:
+                pass
+            popup.after(100, poll)
+
+        threading.Thread(target=worker, daemon=True).start()
+        poll()
+
+    def export_frame(self, df, name):
+        """Export a filtered view or report to CSV/XLSX/Parquet on a background thread"""
+        if df is None or df.empty:
+            messagebox.showwarning("Warning", "Nothing to export")
+            return
+
+        path = filedialog.asksaveasfilename(title=f"Export {name}", initialfile=f"{name}.xlsx",
+                                            defaultextension=".xlsx", filetypes=EXPORT_FILETYPES)
+        if not path:
+            return
+
+        finished = queue.Queue()
+        export_in_background(df, path, finished.put)
+
+        def poll():
+            try:
+                error = finished.get_nowait()
+            except queue.Empty:
+                self.after(200, poll)
+                return
+
+            if error is not None:
+                messagebox.showerror("Error", f"Export failed: {error}")
+            else:
+                messagebox.showinfo("Success", f"Exported {len(df):,} rows to {path}")
+
+        poll()
+
     def clear_customer_form(self):
         """Clear all customer input fields"""
         self.cust_name.delete(0, tk.END)
@@ -842,6 +1174,31 @@ class StockApp(tk.Tk):
         self.cust_phone1.delete(0, tk.END)
         self.cust_phone2.delete(0, tk.END)
         self.cust_city.delete(0, tk.END)
+        self.autofilled = {}
+
+    def autofill_customer(self, by_name=False):
+        """Fill the customer form from the customer table for a known phone (or unique name)"""
+        fields = {"customer_name": self.cust_name, "address": self.cust_address, "phone2": self.cust_phone2,
+                  "city": self.cust_city}
+        if by_name:
+            if self.cust_phone1.get().strip():
+                return
+            customer = self.store.find_customer(name=self.cust_name.get())
+            fields = {"phone1": self.cust_phone1, "address": self.cust_address, "phone2": self.cust_phone2,
+                      "city": self.cust_city}
+        else:
+            customer = self.store.find_customer(phone=self.cust_phone1.get())
+        if customer is None:
+            return
+
+        # Only replace fields that are empty or were themselves filled in automatically
+        previous = getattr(self, "autofilled", {})
+        for col, entry in fields.items():
+            current = entry.get().strip()
+            if not current or current == previous.get(col):
+                entry.delete(0, tk.END)
+                entry.insert(0, customer[col])
+        self.autofilled = {col: customer[col] for col in fields}
 
     def cancel_or_return_order(self):
         selected_item = self.orders_table.selection()
@@ -850,10 +1207,9 @@ class StockApp(tk.Tk):
             return
 
         order_id = self.orders_table.item(selected_item[0])['values'][0]
-        order_status = self.orders_table.item(selected_item[0])['values'][8] if len(
-            self.orders_table.item(selected_item[0])['values']) > 8 else "ACTIVE"
+        order_status = self.orders_table.item(selected_item[0])['values'][8]
 
-        if order_status in ["CANCELLED", "RETURNED"]:
+        if order_status in ["CANCELLED", "RETURNED", "VOIDED"]:
             messagebox.showwarning("Warning", f"This order has already been {order_status.lower()}")
             return
 
@@ -877,28 +1233,12 @@ class StockApp(tk.Tk):
 
     def process_order_action(self, order_id, action):
         """Process order cancellation or return"""
-        # Update order status
-        df_orders = pd.read_excel(ORDERS_FILE)
-        df_orders.loc[df_orders['order_id'] == order_id, 'status'] = action
-        df_orders.to_excel(ORDERS_FILE, index=False)
-
-        # Get all allocated piece IDs for this order
-        allocated_pieces = df_orders.loc[df_orders['order_id'] == order_id, 'allocated_piece_ids']
-
-        # Update stock status back to IN_STOCK for ALL pieces in this order
-        df_stock = pd.read_excel(STOCK_FILE)
-
-        for piece_ids_str in allocated_pieces:
-            if pd.isna(piece_ids_str):
-                continue
-
-            piece_ids = piece_ids_str.split(',')
-            for piece_id in piece_ids:
-                df_stock.loc[df_stock['piece_id'] == piece_id, 'status'] = 'IN_STOCK'
-                df_stock.loc[df_stock['piece_id'] == piece_id, 'sold_date'] = None
-                df_stock.loc[df_stock['piece_id'] == piece_id, 'order_id'] = None
-
-        df_stock.to_excel(STOCK_FILE, index=False)
+        # Update order status and put ALL pieces in this order back in stock
+        try:
+            self.store.process_order_action(order_id, action)
+        except OrderError as e:
+            messagebox.showerror("Error", str(e))
+            return
 
         messagebox.showinfo("Success",
                             f"Order {order_id} {action.lower()} successfully. All items added back to stock.")
@@ -963,10 +1303,7 @@ class StockApp(tk.Tk):
                 already_added_qty += item["qty"]
 
         # Check availability (considering already added items)
-        df = pd.read_excel(STOCK_FILE)
-        total_available = len(df[
-                                  (df["product_name"] == product) & (df["length_m"] == length) & (
-                                          df["status"] == "IN_STOCK")])
+        total_available = self.store.available_count(product, length)
 
         actually_available = total_available - already_added_qty
 
@@ -975,15 +1312,13 @@ class StockApp(tk.Tk):
                                  f"Only {actually_available} pcs available (after considering already added items)")
             return
 
-        # Get price from first available piece
-        available_pieces = df[
-            (df["product_name"] == product) & (df["length_m"] == length) & (df["status"] == "IN_STOCK")]
+        # Get price from the piece the allocation strategy will pick first
+        price = self.store.next_price(product, length)
 
-        if len(available_pieces) == 0:
+        if price is None:
             messagebox.showerror("Error", "No available pieces found")
             return
 
-        price = available_pieces.iloc[0]["seller_price"]
         total = price * qty
 
         # Add to order items list
@@ -1011,6 +1346,10 @@ class StockApp(tk.Tk):
         self.qty_var.set(1)
         self.order_product_cb.focus()
 
+    def on_strategy_change(self, event=None):
+        """Switch the allocation strategy used for new orders"""
+        self.store.set_allocation_strategy(self.strategy_var.get())
+
     def update_order_total(self):
         total = sum(item["total"] for item in self.order_items)
         self.order_total_var.set(f"Rs. {total:,.2f}")
@@ -1020,81 +1359,68 @@ class StockApp(tk.Tk):
         product_filter = self.order_filter_product_var.get()
         date_filter = self.order_filter_date_var.get()
         status_filter = self.order_filter_status_var.get()
-
-        df = pd.read_excel(ORDERS_FILE) if os.path.exists(ORDERS_FILE) else pd.DataFrame()
-        if df.empty:
+        product_filter = "" if product_filter == "All" else product_filter
+        status_filter = "" if status_filter == "All" else status_filter
+
+        # Date filters only scan the order partitions they cover; a search only reads its matches
+        date_range = period_range(date_filter)
+        search = self.order_search_var.get().strip()
+        if not (date_range or search or customer_filter or product_filter or status_filter):
+            # Unfiltered: the latest orders and the running totals, as on startup
+            self.load_orders()
             return
 
-        # Apply filters
-        if customer_filter:
-            df = df[df["customer_name"].str.lower().str.contains(customer_filter, na=False)]
-
-        if product_filter and product_filter != "All":
-            df = df[df["item_name"] == product_filter]
-
-        if date_filter and date_filter != "All":
-            # Handle date conversion safely
-            try:
-                # Try different date formats
-                df["order_date"] = pd.to_datetime(df["order_date"], errors='coerce', format='mixed')
-                today = datetime.now().date()
-
-                # Drop rows with invalid dates
-                df = df.dropna(subset=['order_date'])
-
-                if date_filter == "Today":
-                    df = df[df["order_date"].dt.date == today]
-                elif date_filter == "Last 7 Days":
-                    seven_days_ago = today - timedelta(days=7)
-                    df = df[df["order_date"].dt.date >= seven_days_ago]
-                elif date_filter == "This Month":
-                    df = df[df["order_date"].dt.month == today.month]
-                elif date_filter == "Last Month":
-                    last_month = today.month - 1 if today.month > 1 else 12
-                    df = df[df["order_date"].dt.month == last_month]
-                elif date_filter == "Last 3 Months":
-                    three_months_ago = today - timedelta(days=90)
-                    df = df[df["order_date"].dt.date >= three_months_ago]
-                elif date_filter == "Last 6 Months":
-                    six_months_ago = today - timedelta(days=180)
-                    df = df[df["order_date"].dt.date >= six_months_ago]
-                elif date_filter == "Last 12 Months":
-                    twelve_months_ago = today - timedelta(days=365)
-                    df = df[df["order_date"].dt.date >= twelve_months_ago]
-            except Exception as e:
-                messagebox.showerror("Error", f"Date filter error: {str(e)}")
-                return
-
-        if status_filter and status_filter != "All":
-            if "status" not in df.columns:
-                df["status"] = "ACTIVE"  # Default status for old orders
-            df = df[df["status"] == status_filter]
+        if search:
+            df = self.store.search_orders(search)
+            if date_range:
+                start, end = date_range
+                in_range = df["order_date"] >= start
+                if end is not None:
+                    in_range &= df["order_date"] < end
+                df = df[in_range]
+            if customer_filter:
+                df = df[df["customer_name"].str.lower().str.contains(customer_filter, regex=False, na=False)]
+            if product_filter:
+                df = df[df["item_name"] == product_filter]
+            if status_filter:
+                df = df[df["status"] == status_filter]
+        else:
+            # Only the matching lines are copied out of the store
+            df = self.store.filter_orders(*(date_range or (None, None)), customer=customer_filter,
+                                          product=product_filter, status=status_filter)
 
         # Display filtered results
-        for row in self.orders_table.get_children():
-            self.orders_table.delete(row)
-
-        for _, row in df.iterrows():
-            self.orders_table.insert("", "end", values=(
-                row["order_id"],
-                row["order_date"].strftime("%Y-%m-%d %H:%M") if hasattr(row["order_date"], 'strftime') else str(
-                    row["order_date"]),
-                row["customer_name"],
-                row["city"],
-                row["item_name"],
-                row["length_m"],
-                row["qty"],
-                row["total_seller_price"],
-                row.get("status", "ACTIVE")  # Default to ACTIVE if status column doesn't exist
-            ))
+        self.show_order_rows(self.sorted_rows("orders", df))
 
         # Update order summary
+        self.orders_view = df
+        self.orders_limit = None
         self.update_orders_summary(df)
 
-    def update_orders_summary(self, df):
-        """Update the total price and total pieces for displayed orders"""
-        total_price = df["total_seller_price"].sum()
-        total_pcs = df["qty"].sum()
+    def show_order_rows(self, df):
+        """Fill the orders table with ``df``, in the order given"""
+        self.orders_table.delete(*self.orders_table.get_children())
+        # Dates are already parsed and every line has a status (see schema.py)
+        for position, row in zip(df.index, df.itertuples(index=False)):
+            order_date = row.order_date.strftime("%Y-%m-%d %H:%M") if pd.notna(row.order_date) else "N/A"
+            self.orders_table.insert("", "end", iid=position, values=(
+                row.order_id, order_date, row.customer_name, row.city, row.item_name,
+                row.length_m, row.qty, row.total_seller_price, row.status
+            ))
+
+    def on_order_search(self, event=None):
+        # Wait for a pause in typing before searching
+        if getattr(self, "order_search_job", None):
+            self.after_cancel(self.order_search_job)
+        self.order_search_job = self.after(150, self.apply_order_filters)
+
+    def update_orders_summary(self, df=None):
+        """Update the total price and total pieces for displayed orders (every order if ``df`` is None)"""
+        if df is None:
+            total_price, total_pcs = self.store.order_totals()
+        else:
+            total_price = df["total_seller_price"].sum()
+            total_pcs = df["qty"].sum()
 
         self.orders_total_price_var.set(f"Rs. {total_price:,.2f}")
         self.orders_total_pcs_var.set(f"{total_pcs:,}")
@@ -1104,6 +1430,7 @@ class StockApp(tk.Tk):
         self.order_filter_product_var.set("")
         self.order_filter_date_var.set("All")
         self.order_filter_status_var.set("ACTIVE")
+        self.order_search_var.set("")
         self.load_orders()
 
     def update_order_product_suggestions(self, event):
@@ -1138,9 +1465,7 @@ class StockApp(tk.Tk):
 
         # හැකි තාක් quickly stock check කිරීමට
         try:
-            df = pd.read_excel(STOCK_FILE)
-            total_available = len(
-                df[(df["product_name"] == product) & (df["length_m"] == length) & (df["status"] == "IN_STOCK")])
+            total_available = self.store.available_count(product, length)
 
             # Calculate actually available (total minus already added)
             actually_available = total_available - already_added_qty
@@ -1158,86 +1483,24 @@ class StockApp(tk.Tk):
             messagebox.showerror("Error", "Please add at least one item to the order")
             return
 
-        name = self.cust_name.get().strip()
-        address = self.cust_address.get().strip()
-        phone1 = self.cust_phone1.get().strip()
-        phone2 = self.cust_phone2.get().strip()
-        city = self.cust_city.get().strip()
+        customer = {
+            "name": self.cust_name.get().strip(),
+            "address": self.cust_address.get().strip(),
+            "phone1": self.cust_phone1.get().strip(),
+            "phone2": self.cust_phone2.get().strip(),
+            "city": self.cust_city.get().strip(),
+        }
 
-        if not name or not address or not phone1 or not city:
+        if not customer["name"] or not customer["address"] or not customer["phone1"] or not customer["city"]:
             messagebox.showerror("Error", "Customer details are required")
             return
 
-        order_id = f"ORD_{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-        df_stock = pd.read_excel(STOCK_FILE)
-        order_rows = []
-        allocated_pieces = []
-
-        for item in self.order_items:
-            product = item["product"]
-            length = item["length"]
-            qty = item["qty"]
-            custom_price = item["price"]  # Use the custom price from order items
-
-            # Get available pieces for this item
-            available_pieces = df_stock[
-                (df_stock["product_name"] == product) & (df_stock["length_m"] == length) & (
-                        df_stock["status"] == "IN_STOCK")].head(qty)
-
-            if len(available_pieces) < qty:
-                messagebox.showerror("Error", f"Only {len(available_pieces)} pcs available for {product} ({length}m)")
-                return
-
-            # Update stock to SOLD with custom price
-            df_stock.loc[available_pieces.index, "status"] = "SOLD"
-            df_stock.loc[available_pieces.index, "sold_date"] = order_date
-            df_stock.loc[available_pieces.index, "order_id"] = order_id
-            df_stock.loc[available_pieces.index, "seller_price"] = custom_price
-            df_stock.loc[available_pieces.index, "profit"] = custom_price - df_stock.loc[
-                available_pieces.index, "unit_cost"]
-
-            # Calculate totals
-            total_cost = available_pieces["unit_cost"].sum()
-            total_price = custom_price * qty
-            total_profit = total_price - total_cost
-
-            # Add to order rows
-            order_rows.append({
-                "order_id": order_id,
-                "order_date": order_date,
-                "customer_name": name,
-                "address": address,
-                "phone1": phone1,
-                "phone2": phone2,
-                "city": city,
-                "item_name": product,
-                "length_m": length,
-                "qty": qty,
-                "total_unit_cost": total_cost,
-                "total_seller_price": total_price,
-                "profit_total": total_profit,
-                "allocated_piece_ids": ",".join(available_pieces["piece_id"].tolist()),
-                "status": "ACTIVE"
-            })
-
-            # Add to allocated pieces
-            allocated_pieces.extend(available_pieces["piece_id"].tolist())
-
-        # Save updated stock
-        df_stock.to_excel(STOCK_FILE, index=False)
-
-        # Save order(s)
-        odf = pd.read_excel(ORDERS_FILE) if os.path.exists(ORDERS_FILE) else pd.DataFrame(columns=[
-            "order_id", "order_date", "customer_name", "address", "phone1", "phone2", "city", "item_name",
-            "length_m", "qty", "total_unit_cost", "total_seller_price", "profit_total", "allocated_piece_ids", "status"
-        ])
-
-        for order_row in order_rows:
-            odf = pd.concat([odf, pd.DataFrame([order_row])], ignore_index=True)
-
-        odf.to_excel(ORDERS_FILE, index=False)
+        # Allocate stock and save the order (uses the custom prices from order items)
+        try:
+            order_id = self.store.place_order(customer, self.order_items)
+        except OrderError as e:
+            messagebox.showerror("Error", str(e))
+            return
 
         messagebox.showinfo("Success", f"Order {order_id} placed successfully!")
 
@@ -1264,65 +1527,20 @@ class StockApp(tk.Tk):
         if current_tab == 2:  # Summary tab is index 2
             self.update_summary()
 
-        # Save orders with proper date formatting
-        with pd.ExcelWriter(ORDERS_FILE, engine='openpyxl', datetime_format='YYYY-MM-DD HH:MM:SS') as writer:
-            odf.to_excel(writer, index=False)
-
     def load_orders(self):
-        for row in self.orders_table.get_children():
-            self.orders_table.delete(row)
-
-        if os.path.exists(ORDERS_FILE):
-            # Read with explicit date formatting
-            df = pd.read_excel(ORDERS_FILE)
-
-            # Convert order_date with proper formatting - handle mixed types
-            if 'order_date' in df.columns:
-                # First convert all to string to handle mixed types
-                df['order_date'] = df['order_date'].astype(str)
-
-                # Now convert to datetime with multiple format attempts
-                df['order_date'] = pd.to_datetime(
-                    df['order_date'],
-                    errors='coerce',
-                    format='mixed',  # Try multiple formats
-                    dayfirst=False  # Use month-first format (MM/DD/YYYY)
-                )
-
-                # Drop rows with invalid dates
-                df = df.dropna(subset=['order_date'])
-
-            # Show latest orders first (only if we have valid dates)
-            if not df.empty and 'order_date' in df.columns:
-                df = df.sort_values("order_date", ascending=False)
-
-            for _, row in df.head(100).iterrows():
-                # Handle date display safely
-                order_date = row["order_date"]
-                if hasattr(order_date, 'strftime'):
-                    formatted_date = order_date.strftime("%Y-%m-%d %H:%M")
-                else:
-                    # If it's still a string, try to format it
-                    try:
-                        formatted_date = pd.to_datetime(str(order_date)).strftime("%Y-%m-%d %H:%M")
-                    except:
-                        formatted_date = str(order_date)
-
-                self.orders_table.insert("", "end", values=(
-                    row["order_id"],
-                    formatted_date,
-                    row["customer_name"],
-                    row["city"],
-                    row["item_name"],
-                    row["length_m"],
-                    row["qty"],
-                    row["total_seller_price"],
-                    row.get("status", "ACTIVE")
-                ))
+        # Only the 100 rows shown are copied: the latest come from the newest partitions, a
+        # sorted table takes its first rows from the cached column order
+        if self.table_sort["orders"] is None:
+            latest = self.store.latest_orders(100)
+            latest = latest.dropna(subset=['order_date'])
+        else:
+            latest = self.sorted_rows("orders", None, 100)
+        self.show_order_rows(latest)
 
-        # Update order summary
-        if not df.empty:
-            self.update_orders_summary(df)
+        # The view is the whole history, copied only if it is exported; totals are running sums
+        self.orders_view = None
+        self.orders_limit = 100
+        self.update_orders_summary()
 
     def create_summary_tab(self):
         main_frame = ttk.Frame(self.summary_tab)
@@ -1361,6 +1579,30 @@ class StockApp(tk.Tk):
         sales_report_btn = ttk.Button(filter_frame, text="Sales Report", command=self.show_sales_report)
         sales_report_btn.grid(row=0, column=6, padx=5, pady=5)
 
+        as_of_btn = ttk.Button(filter_frame, text="Stock Value As Of...", command=self.show_inventory_as_of)
+        as_of_btn.grid(row=0, column=7, padx=5, pady=5)
+
+        customers_btn = ttk.Button(filter_frame, text="Customer Analytics", command=self.show_customer_analytics)
+        customers_btn.grid(row=0, column=8, padx=5, pady=5)
+
+        reorder_btn = ttk.Button(filter_frame, text="Reorder List", command=self.show_reorder_list)
+        reorder_btn.grid(row=0, column=9, padx=5, pady=5)
+
+        # Shown while a newer summary is being computed in the background
+        self.summary_status_var = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.summary_status_var, foreground="gray").grid(row=0, column=10,
+                                                                                              padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Profit View:").grid(row=1, column=0, padx=5, pady=5)
+        self.summary_view_var = tk.StringVar(value=self.metrics_view)
+        summary_view_cb = ttk.Combobox(filter_frame, textvariable=self.summary_view_var, values=list(VIEWS),
+                                       width=15, state="readonly")
+        summary_view_cb.grid(row=1, column=1, padx=5, pady=5)
+        summary_view_cb.bind('<<ComboboxSelected>>', self.on_summary_view_change)
+
+        aging_btn = ttk.Button(filter_frame, text="Stock Aging", command=self.show_stock_aging)
+        aging_btn.grid(row=1, column=2, padx=5, pady=5)
+
         # Summary Frame
         summary_frame = ttk.LabelFrame(main_frame, text="Business Summary")
         summary_frame.pack(fill="both", expand=True, pady=5)
@@ -1381,9 +1623,21 @@ class StockApp(tk.Tk):
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+        self.build_summary_widgets()
+
         # Initial summary update
         self.update_summary()
 
+    def on_summary_view_change(self, event=None):
+        """Switch between margin and markup; the computed figures are shown again, not recomputed"""
+        self.metrics_view = self.summary_view_var.get()
+        for child in self.scrollable_summary_frame.winfo_children():
+            child.destroy()
+        self.build_summary_widgets()
+        if getattr(self, "summary_last", None):
+            self.show_summary(*self.summary_last)
+        self.update_stock_totals(self.stock_view)
+
     def on_summary_date_change(self, event):
         if self.summary_date_var.get() == "Custom Range":
             self.select_custom_date_range()
@@ -1446,16 +1700,25 @@ class StockApp(tk.Tk):
                                   values=self.product_names, width=20)
         product_cb.grid(row=0, column=3, padx=5, pady=5)
 
+        # Last generated report, for export
+        current_report = {"df": None, "name": "sales_report"}
+
         def generate_report():
             year = int(year_var.get())
             product_filter = product_var.get() if product_var.get() else None
 
             report_df = self.generate_sales_report_data(year, product_filter)
             self.display_sales_report(report_df, report_text, year, product_filter)
+            current_report["df"] = report_df
+            current_report["name"] = f"sales_report_{year}"
 
         generate_btn = ttk.Button(control_frame, text="Generate Report", command=generate_report)
         generate_btn.grid(row=0, column=4, padx=5, pady=5)
 
+        export_btn = ttk.Button(control_frame, text="Export Report...",
+                                command=lambda: self.export_frame(current_report["df"], current_report["name"]))
+        export_btn.grid(row=0, column=5, padx=5, pady=5)
+
         # Text area for report
         report_text = scrolledtext.ScrolledText(report_window, wrap=tk.WORD, font=("Courier New", 10))
         report_text.pack(fill="both", expand=True, padx=10, pady=10)
@@ -1463,17 +1726,234 @@ class StockApp(tk.Tk):
         # Generate initial report for current year
         initial_report = self.generate_sales_report_data(datetime.now().year)
         self.display_sales_report(initial_report, report_text, datetime.now().year)
+        current_report["df"] = initial_report
+        current_report["name"] = f"sales_report_{datetime.now().year}"
+
+    def show_inventory_as_of(self):
+        # Stock counts and value on a past date, from the daily valuation snapshots
+        report_window = tk.Toplevel(self)
+        report_window.title("Stock Value As Of")
+        report_window.geometry("800x500")
+
+        control_frame = ttk.Frame(report_window)
+        control_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(control_frame, text="Date (YYYY-MM-DD):").grid(row=0, column=0, padx=5, pady=5)
+        date_entry = ttk.Entry(control_frame, width=12)
+        date_entry.insert(0, datetime.now().strftime("%Y-%m-%d"))
+        date_entry.grid(row=0, column=1, padx=5, pady=5)
+
+        current_report = {"df": None, "name": "stock_value"}
+
+        def show_report():
+            try:
+                as_of = datetime.strptime(date_entry.get(), "%Y-%m-%d")
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid date in YYYY-MM-DD format")
+                return
+
+            product_filter = self.summary_product_var.get() or None
+            length_filter = self.summary_length_var.get()
+            length = int(length_filter) if length_filter and length_filter != "All" else None
+            df = self.store.inventory_as_of(as_of, product_filter, length)
+            current_report["df"] = df
+            current_report["name"] = f"stock_value_{as_of:%Y%m%d}"
+
+            report_text.delete(1.0, tk.END)
+            report_text.insert(tk.END, f"STOCK VALUE AS OF {as_of:%Y-%m-%d}\n")
+            report_text.insert(tk.END, "=" * 80 + "\n")
+            report_text.insert(tk.END, f"{'Product':<20} {'Length':>7} {'Status':<10} {'PCS':>8} "
+                                       f"{'Cost Value':>15} {'Sell Value':>15}\n")
+            report_text.insert(tk.END, "-" * 80 + "\n")
+            for _, row in df.iterrows():
+                report_text.insert(tk.END, f"{str(row['product_name']):<20} {row['length_m']:>6}m "
+                                           f"{row['status']:<10} {row['pieces']:>8,} {row['cost_value']:>15,.2f} "
+                                           f"{row['sell_value']:>15,.2f}\n")
+            report_text.insert(tk.END, "-" * 80 + "\n")
+
+            for status in ("IN_STOCK", "SOLD", "REMOVED"):
+                rows = df[df["status"] == status]
+                report_text.insert(tk.END, f"{status:<39} {rows['pieces'].sum():>8,} "
+                                           f"{rows['cost_value'].sum():>15,.2f} {rows['sell_value'].sum():>15,.2f}\n")
+
+        ttk.Button(control_frame, text="Show", command=show_report).grid(row=0, column=2, padx=5, pady=5)
+        ttk.Button(control_frame, text="Export...",
+                   command=lambda: self.export_frame(current_report["df"], current_report["name"])
+                   ).grid(row=0, column=3, padx=5, pady=5)
+
+        report_text = scrolledtext.ScrolledText(report_window, wrap=tk.NONE, font=("Courier New", 10))
+        report_text.pack(fill="both", expand=True, padx=10, pady=10)
+
+        show_report()
+
+    def show_customer_analytics(self):
+        # Best and lapsed customers by recency, frequency and monetary value
+        window = tk.Toplevel(self)
+        window.title("Customer Analytics")
+        window.geometry("1200x600")
+
+        control_frame = ttk.Frame(window)
+        control_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(control_frame, text="Segment:").grid(row=0, column=0, padx=5, pady=5)
+        segment_var = tk.StringVar(value="All")
+        segment_cb = ttk.Combobox(control_frame, textvariable=segment_var, values=["All"] + SEGMENTS, width=15)
+        segment_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        count_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=count_var).grid(row=0, column=3, padx=5, pady=5)
+
+        columns = [("customer_name", "Customer", 160), ("phone1", "Phone", 100), ("city", "City", 100),
+                   ("segment", "Segment", 90), ("recency_days", "Days Since", 80), ("orders", "Orders", 60),
+                   ("revenue", "Revenue (Rs)", 110), ("profit", "Lifetime Profit (Rs)", 130),
+                   ("avg_order_value", "Avg Order (Rs)", 110), ("last_order", "Last Order", 100),
+                   ("rfm", "R-F-M", 60)]
+        table = ttk.Treeview(window, columns=[col for col, _, _ in columns], show="headings")
+        for col, heading, width in columns:
+            table.heading(col, text=heading)
+            table.column(col, width=width)
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        current = {"df": None}
+
+        def refresh(event=None):
+            df = self.customer_analytics.table()
+            if segment_var.get() != "All":
+                df = df[df["segment"] == segment_var.get()]
+            current["df"] = df
+
+            for row in table.get_children():
+                table.delete(row)
+            for _, row in df.head(1000).iterrows():
+                table.insert("", "end", values=(
+                    row["customer_name"], row["phone1"], row["city"], row["segment"], row["recency_days"],
+                    row["orders"], f"{row['revenue']:,.2f}", f"{row['profit']:,.2f}",
+                    f"{row['avg_order_value']:,.2f}", row["last_order"].strftime("%Y-%m-%d"),
+                    f"{row['r_score']}-{row['f_score']}-{row['m_score']}"))
+            count_var.set(f"{len(df):,} customers" + (" (showing first 1,000)" if len(df) > 1000 else ""))
+
+        segment_cb.bind('<<ComboboxSelected>>', refresh)
+        ttk.Button(control_frame, text="Export...",
+                   command=lambda: self.export_frame(current["df"], "customer_analytics")
+                   ).grid(row=0, column=2, padx=5, pady=5)
+
+        refresh()
+
+    def show_reorder_list(self):
+        # Products and lengths by how soon they run out at the current rate of demand
+        window = tk.Toplevel(self)
+        window.title("Reorder List")
+        window.geometry("1100x600")
+
+        control_frame = ttk.Frame(window)
+        control_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(control_frame, text="Status:").grid(row=0, column=0, padx=5, pady=5)
+        status_var = tk.StringVar(value="All")
+        status_cb = ttk.Combobox(control_frame, textvariable=status_var,
+                                 values=["All", REORDER_NOW, "Watch", "OK"], width=15)
+        status_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        count_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=count_var).grid(row=0, column=3, padx=5, pady=5)
+        ttk.Label(control_frame, text=f"Lead time {LEAD_TIME_DAYS} days, restocks cover {REVIEW_DAYS} more days",
+                  foreground="gray").grid(row=0, column=4, padx=5, pady=5)
+
+        columns = [("product_name", "Product", 160), ("length_m", "Length (m)", 80), ("status", "Status", 100),
+                   ("in_stock", "In Stock", 80), ("smoothed_daily", "Demand/Day", 90),
+                   ("avg_daily", "28-Day Avg/Day", 100), ("days_of_cover", "Days of Cover", 100),
+                   ("reorder_point", "Reorder Point", 100), ("order_qty", "Suggested Qty", 100)]
+        table = ttk.Treeview(window, columns=[col for col, _, _ in columns], show="headings")
+        for col, heading, width in columns:
+            table.heading(col, text=heading)
+            table.column(col, width=width, anchor="center")
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+        table.tag_configure(REORDER_NOW, foreground="red")
+        table.tag_configure("Watch", foreground="orange")
+
+        current = {"df": None}
+
+        def refresh(event=None):
+            df = self.demand_forecast.table()
+            if status_var.get() != "All":
+                df = df[df["status"] == status_var.get()]
+            current["df"] = df
+
+            table.delete(*table.get_children())
+            for _, row in df.iterrows():
+                cover = "-" if row["days_of_cover"] == float("inf") else f"{row['days_of_cover']:.1f}"
+                table.insert("", "end", tags=(row["status"],), values=(
+                    row["product_name"], row["length_m"], row["status"], row["in_stock"],
+                    f"{row['smoothed_daily']:.2f}", f"{row['avg_daily']:.2f}", cover,
+                    f"{row['reorder_point']:.0f}", row["order_qty"]))
+            count_var.set(f"{len(df):,} items, {int((df['status'] == REORDER_NOW).sum()):,} to reorder now")
+
+        status_cb.bind('<<ComboboxSelected>>', refresh)
+        ttk.Button(control_frame, text="Export...",
+                   command=lambda: self.export_frame(current["df"], "reorder_list")
+                   ).grid(row=0, column=2, padx=5, pady=5)
+
+        refresh()
+
+    def show_stock_aging(self):
+        # Days on the shelf and days to sell, bucketed per product and length
+        window = tk.Toplevel(self)
+        window.title("Stock Aging")
+        window.geometry("1200x600")
+
+        control_frame = ttk.Frame(window)
+        control_frame.pack(fill="x", padx=10, pady=10)
+
+        ttk.Label(control_frame, text="Report:").grid(row=0, column=0, padx=5, pady=5)
+        report_var = tk.StringVar(value=AGING_REPORTS[0])
+        report_cb = ttk.Combobox(control_frame, textvariable=report_var, values=AGING_REPORTS, width=18,
+                                 state="readonly")
+        report_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        columns = [("product_name", "Product", 160), ("length_m", "Length (m)", 80)] + \
+                  [(label, label, 95) for label in AGE_LABELS] + \
+                  [("Total", "Total", 100), ("Avg Days", "Avg Days", 80), ("Max Days", "Max Days", 80)]
+        table = ttk.Treeview(window, columns=[f"c{i}" for i in range(len(columns))], show="headings")
+        for i, (_, heading, width) in enumerate(columns):
+            table.heading(f"c{i}", text=heading)
+            table.column(f"c{i}", width=width, anchor="center")
+        table.pack(fill="both", expand=True, padx=10, pady=10)
+
+        current = {"df": None}
+
+        def refresh(event=None):
+            # Ages move on daily, so the report is cached per day as well as per data version
+            reports = self.result_cache.get(("aging", datetime.now().date()), self.store.version,
+                                            lambda: aging_report(self.store.stock_frame()))
+            df = reports[report_var.get()]
+            current["df"] = df
+
+            money = report_var.get() == "Capital Tied Up"
+            table.delete(*table.get_children())
+            for row in df.itertuples(index=False):
+                cells = [f"Rs. {value:,.2f}" if money else f"{value:,.0f}" for value in row[2:-2]]
+                table.insert("", "end", values=[row[0], row[1]] + cells + [f"{row[-2]:.0f}", f"{row[-1]:.0f}"])
+
+        report_cb.bind('<<ComboboxSelected>>', refresh)
+        ttk.Button(control_frame, text="Export...",
+                   command=lambda: self.export_frame(current["df"], "stock_aging")
+                   ).grid(row=0, column=2, padx=5, pady=5)
+
+        refresh()
 
     def generate_sales_report_data(self, year, product_filter=None):
+        # The same year and product with unchanged data is served from the cache
+        return self.result_cache.get(("sales_report", year, product_filter), self.store.version,
+                                     lambda: self.build_sales_report_data(year, product_filter))
+
+    def build_sales_report_data(self, year, product_filter=None):
         # Load orders data
-        if not os.path.exists(ORDERS_FILE):
+        # Only the partitions of the requested year are scanned
+        df_orders = self.store.orders_between(datetime(year, 1, 1), datetime(year + 1, 1, 1))
+        if df_orders.empty:
             return pd.DataFrame()
 
-        df_orders = pd.read_excel(ORDERS_FILE)
-
-        # Filter by year and status (only ACTIVE orders for sales report)
-        df_orders['order_date'] = pd.to_datetime(df_orders['order_date'], errors='coerce')
-        df_orders = df_orders[df_orders['order_date'].dt.year == year]
+        # Filter by status (only ACTIVE orders for sales report)
         df_orders = df_orders[df_orders['status'] == 'ACTIVE']
 
         # Apply product filter if specified
@@ -1584,120 +2064,23 @@ class StockApp(tk.Tk):
             yearly_row = yearly_data.iloc[0]
             report_text.insert(tk.END, f"• Yearly Profit Margin: {yearly_row['profit_percentage']:.2f}%\n")
 
-    def update_summary(self):
-        # Clear previous summary
-        for widget in self.scrollable_summary_frame.winfo_children():
-            widget.destroy()
-
-        # Load data with filters
-        df_stock = pd.read_excel(STOCK_FILE)
-        df_orders = pd.read_excel(ORDERS_FILE) if os.path.exists(ORDERS_FILE) else pd.DataFrame()
-
-        # Apply date filter to orders safely
-        date_filter = self.summary_date_var.get()
-        product_filter = self.summary_product_var.get()
-        length_filter = self.summary_length_var.get()
+    def build_summary_widgets(self):
+        # Summary layout is built once; update_summary only pushes new values and colors
+        self.summary_vars = {}
+        self.summary_labels = {}
+
+        def field(parent, key, text, row, column, size, bold_value=False, foreground=None):
+            padx, pady = (15, 8) if size == 11 else (10, 5)
+            ttk.Label(parent, text=text, font=("Arial", size, "bold")).grid(row=row, column=column, sticky="w",
+                                                                            padx=padx, pady=pady)
+            var = tk.StringVar()
+            label = ttk.Label(parent, textvariable=var, font=("Arial", size, "bold") if bold_value else ("Arial", size))
+            if foreground:
+                label.configure(foreground=foreground)
+            label.grid(row=row, column=column + 1, sticky="w", padx=padx, pady=pady)
+            self.summary_vars[key] = var
+            self.summary_labels[key] = label
 
-        if not df_orders.empty and date_filter != "All Time":
-            try:
-                # Convert dates safely
-                df_orders["order_date"] = pd.to_datetime(df_orders["order_date"], errors='coerce', format='mixed')
-                df_orders = df_orders.dropna(subset=['order_date'])
-
-                today = datetime.now().date()
-
-                if date_filter == "Today":
-                    df_orders = df_orders[df_orders["order_date"].dt.date == today]
-                elif date_filter == "Last 7 Days":
-                    seven_days_ago = today - timedelta(days=7)
-                    df_orders = df_orders[df_orders["order_date"].dt.date >= seven_days_ago]
-                elif date_filter == "This Month":
-                    df_orders = df_orders[df_orders["order_date"].dt.month == today.month]
-                    df_orders = df_orders[df_orders["order_date"].dt.year == today.year]
-                elif date_filter == "Last Month":
-                    last_month = today.month - 1 if today.month > 1 else 12
-                    last_month_year = today.year if today.month > 1 else today.year - 1
-                    df_orders = df_orders[df_orders["order_date"].dt.month == last_month]
-                    df_orders = df_orders[df_orders["order_date"].dt.year == last_month_year]
-                elif date_filter == "Last 3 Months":
-                    three_months_ago = today - timedelta(days=90)
-                    df_orders = df_orders[df_orders["order_date"].dt.date >= three_months_ago]
-                elif date_filter == "Last 6 Months":
-                    six_months_ago = today - timedelta(days=180)
-                    df_orders = df_orders[df_orders["order_date"].dt.date >= six_months_ago]
-                elif date_filter == "Last 12 Months":
-                    twelve_months_ago = today - timedelta(days=365)
-                    df_orders = df_orders[df_orders["order_date"].dt.date >= twelve_months_ago]
-                elif date_filter == "Custom Range" and hasattr(self, 'custom_start_date') and hasattr(self,
-                                                                                                      'custom_end_date'):
-                    start_date = datetime.strptime(self.custom_start_date, "%Y-%m-%d").date()
-                    end_date = datetime.strptime(self.custom_end_date, "%Y-%m-%d").date()
-                    df_orders = df_orders[(df_orders["order_date"].dt.date >= start_date) &
-                                          (df_orders["order_date"].dt.date <= end_date)]
-            except Exception as e:
-                messagebox.showerror("Error", f"Date filter error: {str(e)}")
-                return
-
-        # Apply product filter
-        if product_filter:
-            df_stock = df_stock[df_stock["product_name"] == product_filter]
-            if not df_orders.empty:
-                df_orders = df_orders[df_orders["item_name"] == product_filter]
-
-        # Apply length filter
-        if length_filter and length_filter != "All":
-            df_stock = df_stock[df_stock["length_m"] == int(length_filter)]
-            if not df_orders.empty:
-                df_orders = df_orders[df_orders["length_m"] == int(length_filter)]
-
-        # Calculate metrics
-        total_instock = len(df_stock[df_stock["status"] == "IN_STOCK"])
-        total_sold = len(df_stock[df_stock["status"] == "SOLD"])
-        total_removed = len(df_stock[df_stock["status"] == "REMOVED"])
-
-        total_cost = df_stock["unit_cost"].sum()
-        seller_value = df_stock["seller_price"].sum()
-        total_profit = seller_value - total_cost
-
-        # Calculate profit percentage
-        profit_percentage = (total_profit / total_cost * 100) if total_cost > 0 else 0
-
-        # Only count ACTIVE orders for profit and revenue
-        if not df_orders.empty:
-            if "status" in df_orders.columns:
-                active_orders = df_orders[df_orders["status"] == "ACTIVE"]
-                total_order_profit = active_orders["profit_total"].sum()
-                total_revenue = active_orders["total_seller_price"].sum()
-                total_order_cost = active_orders["total_unit_cost"].sum()
-                cancelled_orders = df_orders[df_orders["status"] == "CANCELLED"]
-                returned_orders = df_orders[df_orders["status"] == "RETURNED"]
-                total_cancelled = len(cancelled_orders)
-                total_returned = len(returned_orders)
-            else:
-                total_order_profit = df_orders["profit_total"].sum()
-                total_revenue = df_orders["total_seller_price"].sum()
-                total_order_cost = df_orders["total_unit_cost"].sum()
-                total_cancelled = 0
-                total_returned = 0
-        else:
-            total_order_profit = 0
-            total_revenue = 0
-            total_order_cost = 0
-            total_cancelled = 0
-            total_returned = 0
-
-        total_orders = len(df_orders) if not df_orders.empty else 0
-        active_orders_count = total_orders - total_cancelled - total_returned
-
-        # Calculate order profit percentage
-        order_profit_percentage = (total_order_profit / total_order_cost * 100) if total_order_cost > 0 else 0
-
-        # Calculate additional business metrics
-        inventory_turnover = total_revenue / seller_value if seller_value > 0 else 0
-        cancellation_rate = (total_cancelled / total_orders * 100) if total_orders > 0 else 0
-        return_rate = (total_returned / total_orders * 100) if total_orders > 0 else 0
-
-        # Display metrics - Enhanced Business Summary
         # Header
         ttk.Label(self.scrollable_summary_frame, text="📊 BUSINESS PERFORMANCE DASHBOARD",
                   font=("Arial", 14, "bold"), foreground="darkblue").grid(row=0, column=0, columnspan=4, pady=15)
@@ -1706,118 +2089,116 @@ class StockApp(tk.Tk):
         metrics_frame = ttk.LabelFrame(self.scrollable_summary_frame, text="🚀 Key Performance Indicators")
         metrics_frame.grid(row=1, column=0, columnspan=4, padx=10, pady=10, sticky="ew")
 
-        # Row 1
-        ttk.Label(metrics_frame, text="Total Revenue:", font=("Arial", 11, "bold")).grid(row=0, column=0, sticky="w",
-                                                                                         padx=15, pady=8)
-        ttk.Label(metrics_frame, text=f"Rs. {total_revenue:,.2f}", font=("Arial", 11, "bold"), foreground="green").grid(
-            row=0, column=1, sticky="w", padx=15, pady=8)
-
-        ttk.Label(metrics_frame, text="Total Order Cost:", font=("Arial", 11, "bold")).grid(row=0, column=2, sticky="w",
-                                                                                            padx=15, pady=8)
-        ttk.Label(metrics_frame, text=f"Rs. {total_order_cost:,.2f}", font=("Arial", 11, "bold")).grid(
-            row=0, column=3, sticky="w", padx=15, pady=8)
-
-        ttk.Label(metrics_frame, text="Active Orders:", font=("Arial", 11, "bold")).grid(row=0, column=4, sticky="w",
-                                                                                         padx=15, pady=8)
-        ttk.Label(metrics_frame, text=f"{active_orders_count}", font=("Arial", 11)).grid(row=0, column=5, sticky="w",
-                                                                                         padx=15, pady=8)
-
-
-        # Row 2
-        ttk.Label(metrics_frame, text="Total Profit:", font=("Arial", 11, "bold")).grid(row=1, column=0, sticky="w",
-                                                                                        padx=15, pady=8)
-        ttk.Label(metrics_frame, text=f"Rs. {total_order_profit:,.2f}", font=("Arial", 11, "bold"),
-                  foreground="darkgreen").grid(
-            row=1, column=1, sticky="w", padx=15, pady=8)
-
-        ttk.Label(metrics_frame, text="Profit Margin:", font=("Arial", 11, "bold")).grid(row=1, column=2, sticky="w",
-                                                                                         padx=15, pady=8)
-        order_profit_margin = (total_order_profit / total_revenue * 100) if total_revenue > 0 else 0
-        order_profit_color = "darkgreen" if order_profit_margin >= 20 else "orange" if order_profit_margin >= 10 else "red"
-        ttk.Label(metrics_frame, text=f"{order_profit_margin:.2f}%", font=("Arial", 11, "bold"),
-                  foreground=order_profit_color).grid(row=1, column=3, sticky="w", padx=15, pady=8)
+        view = VIEWS[self.metrics_view]
+        for i, key in enumerate(view["kpis"]):
+            text, bold_value, foreground = FIELDS[key]
+            field(metrics_frame, key, text, i // 3, i % 3 * 2, 11, bold_value=bold_value, foreground=foreground)
 
         # Stock Analysis Section
         stock_frame = ttk.LabelFrame(self.scrollable_summary_frame, text="📦 Stock Analysis")
         stock_frame.grid(row=2, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
 
-        ttk.Label(stock_frame, text="IN_STOCK Items:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="w",
-                                                                                        padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"{total_instock}", font=("Arial", 10)).grid(row=0, column=1, sticky="w", padx=10,
-                                                                                 pady=5)
-
-        ttk.Label(stock_frame, text="SOLD Items:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w",
-                                                                                    padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"{total_sold}", font=("Arial", 10)).grid(row=1, column=1, sticky="w", padx=10,
-                                                                              pady=5)
-
-        ttk.Label(stock_frame, text="REMOVED Items:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="w",
-                                                                                       padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"{total_removed}", font=("Arial", 10)).grid(row=2, column=1, sticky="w", padx=10,
-                                                                                 pady=5)
-
-        ttk.Label(stock_frame, text="Inventory Value:", font=("Arial", 10, "bold")).grid(row=3, column=0, sticky="w",
-                                                                                         padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"Rs. {seller_value:,.2f}", font=("Arial", 10)).grid(row=3, column=1, sticky="w",
-                                                                                         padx=10, pady=5)
-
-        ttk.Label(stock_frame, text="Inventory Cost:", font=("Arial", 10, "bold")).grid(row=4, column=0, sticky="w",
-                                                                                        padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"Rs. {total_cost:,.2f}", font=("Arial", 10)).grid(row=4, column=1, sticky="w",
-                                                                                       padx=10, pady=5)
-
-        ttk.Label(stock_frame, text="Inventory Profit:", font=("Arial", 10, "bold")).grid(row=5, column=0, sticky="w",
-                                                                                          padx=10, pady=5)
-        ttk.Label(stock_frame, text=f"Rs. {total_profit:,.2f}", font=("Arial", 10),
-                  foreground="green" if total_profit > 0 else "red").grid(row=5, column=1, sticky="w", padx=10, pady=5)
-
-        ttk.Label(stock_frame, text="Profit Margin:", font=("Arial", 10, "bold")).grid(row=6, column=0, sticky="w",
-                                                                                       padx=10, pady=5)
-        profit_margin = (total_profit / seller_value * 100) if seller_value > 0 else 0
-        profit_margin_color = "green" if profit_margin > 0 else "red"
-        ttk.Label(stock_frame, text=f"{profit_margin:.2f}%", font=("Arial", 10), foreground=profit_margin_color).grid(
-            row=6, column=1, sticky="w", padx=10, pady=5)
+        field(stock_frame, "total_instock", "IN_STOCK Items:", 0, 0, 10)
+        field(stock_frame, "total_sold", "SOLD Items:", 1, 0, 10)
+        field(stock_frame, "total_removed", "REMOVED Items:", 2, 0, 10)
+        field(stock_frame, "seller_value", "Inventory Value:", 3, 0, 10)
+        field(stock_frame, "total_cost", "Inventory Cost:", 4, 0, 10)
+        field(stock_frame, "total_profit", "Inventory Profit:", 5, 0, 10)
+        field(stock_frame, view["stock_profit"], FIELDS[view["stock_profit"]][0], 6, 0, 10)
 
         # Order Analysis Section
         order_frame = ttk.LabelFrame(self.scrollable_summary_frame, text="📋 Order Analysis")
         order_frame.grid(row=2, column=2, columnspan=2, padx=10, pady=10, sticky="nsew")
 
-        ttk.Label(order_frame, text="Total Orders:", font=("Arial", 10, "bold")).grid(row=0, column=0, sticky="w",
-                                                                                      padx=10, pady=5)
-        ttk.Label(order_frame, text=f"{total_orders}", font=("Arial", 10)).grid(row=0, column=1, sticky="w", padx=10,
-                                                                                pady=5)
-
-        ttk.Label(order_frame, text="Cancellation Rate:", font=("Arial", 10, "bold")).grid(row=1, column=0, sticky="w",
-                                                                                           padx=10, pady=5)
-        cancel_color = "red" if cancellation_rate > 5 else "orange" if cancellation_rate > 2 else "darkgreen"
-        ttk.Label(order_frame, text=f"{cancellation_rate:.2f}%", font=("Arial", 10), foreground=cancel_color).grid(
-            row=1, column=1, sticky="w", padx=10, pady=5)
-
-        ttk.Label(order_frame, text="Return Rate:", font=("Arial", 10, "bold")).grid(row=2, column=0, sticky="w",
-                                                                                     padx=10, pady=5)
-        return_color = "red" if return_rate > 5 else "orange" if return_rate > 2 else "darkgreen"
-        ttk.Label(order_frame, text=f"{return_rate:.2f}%", font=("Arial", 10), foreground=return_color).grid(row=2,
-                                                                                                             column=1,
-                                                                                                             sticky="w",
-                                                                                                             padx=10,
-                                                                                                             pady=5)
-
-        ttk.Label(order_frame, text="Success Rate:", font=("Arial", 10, "bold")).grid(row=3, column=0, sticky="w",
-                                                                                      padx=10, pady=5)
-        success_rate = 100 - cancellation_rate - return_rate
-        success_color = "darkgreen" if success_rate >= 90 else "orange" if success_rate >= 80 else "red"
-        ttk.Label(order_frame, text=f"{success_rate:.2f}%", font=("Arial", 10), foreground=success_color).grid(row=3,
-                                                                                                               column=1,
-                                                                                                               sticky="w",
-                                                                                                               padx=10,
-                                                                                                               pady=5)
+        field(order_frame, "total_orders", "Total Orders:", 0, 0, 10)
+        field(order_frame, "cancellation_rate", "Cancellation Rate:", 1, 0, 10)
+        field(order_frame, "return_rate", "Return Rate:", 2, 0, 10)
+        field(order_frame, "success_rate", "Success Rate:", 3, 0, 10)
 
         # Performance Insights Section
         insights_frame = ttk.LabelFrame(self.scrollable_summary_frame, text="💡 Performance Insights")
         insights_frame.grid(row=3, column=0, columnspan=4, padx=10, pady=10, sticky="ew")
 
-        insights_text = scrolledtext.ScrolledText(insights_frame, height=6, wrap=tk.WORD, font=("Arial", 9))
-        insights_text.pack(fill="both", expand=True, padx=10, pady=10)
+        self.summary_insights_text = scrolledtext.ScrolledText(insights_frame, height=6, wrap=tk.WORD,
+                                                               font=("Arial", 9), state=tk.DISABLED)
+        self.summary_insights_text.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Trends Section: drawn from precomputed daily series, so zooming never recomputes
+        trends_frame = ttk.LabelFrame(self.scrollable_summary_frame, text="📈 Trends")
+        trends_frame.grid(row=4, column=0, columnspan=4, padx=10, pady=10, sticky="ew")
+
+        trend_controls = ttk.Frame(trends_frame)
+        trend_controls.pack(fill="x", padx=10, pady=5)
+        ttk.Label(trend_controls, text="Series:").pack(side=tk.LEFT, padx=5)
+        self.trend_var = tk.StringVar(value=SERIES[0])
+        trend_cb = ttk.Combobox(trend_controls, textvariable=self.trend_var, values=SERIES, width=20,
+                                state="readonly")
+        trend_cb.pack(side=tk.LEFT, padx=5)
+        trend_cb.bind('<<ComboboxSelected>>', lambda e: self.refresh_trend_chart())
+        for text, days in (("1M", 30), ("3M", 91), ("1Y", 365), ("5Y", 1826)):
+            ttk.Button(trend_controls, text=text, width=4,
+                       command=lambda d=days: self.trend_chart.show_last(d)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(trend_controls, text="All", width=4,
+                   command=lambda: self.trend_chart.show_range()).pack(side=tk.LEFT, padx=2)
+        ttk.Label(trend_controls, text="Scroll to zoom, drag to pan", foreground="gray").pack(side=tk.LEFT, padx=10)
+
+        self.trend_chart = TrendChart(trends_frame)
+        self.trend_chart.pack(fill="both", expand=True, padx=10, pady=5)
+
+        # Configure grid weights for proper resizing
+        for i in range(4):
+            self.scrollable_summary_frame.columnconfigure(i, weight=1)
+            metrics_frame.columnconfigure(i, weight=1)
+            stock_frame.columnconfigure(i, weight=1)
+            order_frame.columnconfigure(i, weight=1)
+
+    def summary_filters(self):
+        """Current Summary filters as ``(date_range, product, length)``, or None if invalid"""
+        date_filter = self.summary_date_var.get()
+        product_filter = self.summary_product_var.get()
+        length_filter = self.summary_length_var.get()
+
+        date_range = period_range(date_filter)
+        if date_filter == "Custom Range" and hasattr(self, 'custom_start_date') and hasattr(self, 'custom_end_date'):
+            try:
+                start_date = datetime.strptime(self.custom_start_date, "%Y-%m-%d")
+                end_date = datetime.strptime(self.custom_end_date, "%Y-%m-%d") + timedelta(days=1)
+            except ValueError as e:
+                messagebox.showerror("Error", f"Date filter error: {str(e)}")
+                return None
+            date_range = (start_date, end_date)
+
+        length = int(length_filter) if length_filter and length_filter != "All" else None
+        return date_range, product_filter or None, length
+
+    def compute_summary(self, date_range, product_filter, length_filter):
+        """Summary values as ``({field: text or (text, color)}, insights)``; touches no widgets"""
+        # Load data with filters; only the order partitions in range are scanned
+        df_stock = self.store.stock_frame()
+        df_orders = self.store.orders_between(*date_range) if date_range else self.store.orders_frame()
+
+        # Apply product filter
+        if product_filter:
+            df_stock = df_stock[df_stock["product_name"] == product_filter]
+            if not df_orders.empty:
+                df_orders = df_orders[df_orders["item_name"] == product_filter]
+
+        # Apply length filter
+        if length_filter is not None:
+            df_stock = df_stock[df_stock["length_m"] == length_filter]
+            if not df_orders.empty:
+                df_orders = df_orders[df_orders["length_m"] == length_filter]
+
+        # Every figure of every view, in one pass over the filtered frames
+        metrics = compute_metrics(df_stock, df_orders)
+        values = format_metrics(metrics)
+        order_profit_percentage = metrics["order_profit_percentage"]
+        seller_value = metrics["seller_value"]
+        total_cost = metrics["total_cost"]
+        total_instock = metrics["total_instock"]
+        inventory_turnover = metrics["inventory_turnover"]
+        cancellation_rate = metrics["cancellation_rate"]
+        return_rate = metrics["return_rate"]
 
         # Generate insights
         insights = []
@@ -1838,8 +2219,19 @@ class StockApp(tk.Tk):
         else:
             insights.append("⚠️  Low inventory profitability. Consider reviewing your pricing strategy.")
 
-        if total_instock < 20:
-            insights.append("📦 Low inventory levels! Consider restocking to avoid stockouts.")
+        # Restock warnings per product and length, from each one's own rate of demand
+        reorder = self.demand_forecast.table()
+        if product_filter:
+            reorder = reorder[reorder["product_name"] == product_filter]
+        if length_filter is not None:
+            reorder = reorder[reorder["length_m"] == length_filter]
+        reorder = reorder[reorder["status"] == REORDER_NOW]
+        if not reorder.empty:
+            names = ", ".join(f"{name} {length}m" for name, length in
+                              zip(reorder["product_name"].head(3), reorder["length_m"].head(3)))
+            more = ", ..." if len(reorder) > 3 else ""
+            insights.append(f"📦 {len(reorder)} item(s) at or below their reorder point ({names}{more}). "
+                            f"See the Reorder List.")
         elif total_instock > 100:
             insights.append("📦 High inventory levels. Consider promotions to reduce stock.")
 
@@ -1864,18 +2256,214 @@ class StockApp(tk.Tk):
         if not insights:
             insights.append("📈 Business performance is stable. Continue monitoring key metrics.")
 
-        insights_text.insert(tk.END, "\n".join(insights))
-        insights_text.config(state=tk.DISABLED)
+        return values, insights
 
-        # Configure grid weights for proper resizing
-        for i in range(4):
-            self.scrollable_summary_frame.columnconfigure(i, weight=1)
-            metrics_frame.columnconfigure(i, weight=1)
-            stock_frame.columnconfigure(i, weight=1)
-            order_frame.columnconfigure(i, weight=1)
+    def show_summary(self, values, insights):
+        """Push computed summary values and colors into the existing widgets"""
+        # Values cover every view; the fields this view does not show are skipped
+        self.summary_last = (values, insights)
+        for key, value in values.items():
+            if key not in self.summary_vars:
+                continue
+            text, color = value if isinstance(value, tuple) else (value, None)
+            self.summary_vars[key].set(text)
+            if color:
+                self.summary_labels[key].configure(foreground=color)
+
+        self.summary_insights_text.config(state=tk.NORMAL)
+        self.summary_insights_text.delete(1.0, tk.END)
+        self.summary_insights_text.insert(tk.END, "\n".join(insights))
+        self.summary_insights_text.config(state=tk.DISABLED)
+
+        self.refresh_trend_chart()
+
+    def refresh_trend_chart(self):
+        """Show the selected daily series; unchanged data comes straight from the cached series"""
+        days, series = self.trend_series.series()
+        name = self.trend_var.get()
+        self.trend_chart.set_series(days, series[name], money=name in MONEY_SERIES)
+
+    def update_summary(self):
+        """Queue a summary refresh; the figures are computed on a worker thread"""
+        filters = self.summary_filters()
+        if filters is None:
+            return
+
+        if not hasattr(self, "summary_requests"):
+            self.summary_requests = queue.Queue()
+            self.summary_results = queue.Queue()
+            self.summary_generation = 0
+            threading.Thread(target=self.summary_worker, daemon=True).start()
+
+        # Results of older generations are dropped when they arrive
+        self.summary_generation += 1
+        found, result = self.result_cache.lookup(("summary",) + filters, self.store.version)
+        if found:
+            self.show_summary(*result)
+            self.summary_status_var.set("")
+            self.summary_shown = self.summary_generation
+            return
+
+        self.summary_requests.put((self.summary_generation, filters))
+        self.summary_status_var.set("⟳ Refreshing...")
+        if not getattr(self, "summary_polling", False):
+            self.summary_polling = True
+            self.poll_summary()
+
+    def summary_worker(self):
+        while True:
+            generation, filters = self.summary_requests.get()
+            # Skip requests a newer filter selection has already superseded
+            while True:
+                try:
+                    generation, filters = self.summary_requests.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                result = self.result_cache.get(("summary",) + filters, self.store.version,
+                                               lambda: self.compute_summary(*filters))
+            except Exception as e:
+                result = e
+            self.summary_results.put((generation, result))
+
+    def poll_summary(self):
+        try:
+            while True:
+                generation, result = self.summary_results.get_nowait()
+                if generation != self.summary_generation:
+                    continue
+
+                self.summary_status_var.set("")
+                self.summary_shown = generation
+                if isinstance(result, Exception):
+                    messagebox.showerror("Error", f"Summary error: {str(result)}")
+                else:
+                    self.show_summary(*result)
+        except queue.Empty:
+            pass
+
+        # Keep polling until the newest request has been shown
+        if getattr(self, "summary_shown", None) == self.summary_generation:
+            self.summary_polling = False
+        else:
+            self.after(50, self.poll_summary)
+
+    def create_pivot_tab(self):
+        main_frame = ttk.Frame(self.pivot_tab)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # Cross-tab controls: rows, optional second row dimension and column dimension, measure and date range
+        control_frame = ttk.LabelFrame(main_frame, text="Pivot")
+        control_frame.pack(fill="x", pady=5)
+
+        def combobox(label, column, width=15):
+            ttk.Label(control_frame, text=label).grid(row=0, column=column, padx=5, pady=5)
+            var = tk.StringVar()
+            cb = ttk.Combobox(control_frame, textvariable=var, width=width, state="readonly")
+            cb.grid(row=0, column=column + 1, padx=5, pady=5)
+            cb.bind('<<ComboboxSelected>>', lambda e: self.update_pivot())
+            return var, cb
+
+        self.pivot_source_var, source_cb = combobox("Source:", 0, 10)
+        source_cb['values'] = list(SOURCES)
+        source_cb.bind('<<ComboboxSelected>>', self.on_pivot_source_change)
+        self.pivot_rows_var, self.pivot_rows_cb = combobox("Rows:", 2)
+        self.pivot_rows2_var, self.pivot_rows2_cb = combobox("Then By:", 4)
+        self.pivot_columns_var, self.pivot_columns_cb = combobox("Columns:", 6)
+        self.pivot_measure_var, self.pivot_measure_cb = combobox("Measure:", 8)
+        self.pivot_date_var, date_cb = combobox("Date Range:", 10)
+        date_cb['values'] = ["All Time", "Today", "Last 7 Days", "This Month", "Last Month", "Last 3 Months",
+                             "Last 6 Months", "Last 12 Months"]
+        self.pivot_date_var.set("All Time")
+
+        ttk.Button(control_frame, text="Export...",
+                   command=lambda: self.export_frame(self.pivot_view, "pivot")).grid(row=0, column=12, padx=5, pady=5)
+
+        self.pivot_status_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=self.pivot_status_var, foreground="gray").grid(row=1, column=0,
+                                                                                             columnspan=12, padx=5,
+                                                                                             pady=5, sticky="w")
+
+        table_frame = ttk.Frame(main_frame)
+        table_frame.pack(fill="both", expand=True, pady=5)
+
+        yscrollbar = ttk.Scrollbar(table_frame)
+        yscrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        xscrollbar = ttk.Scrollbar(table_frame, orient="horizontal")
+        xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.pivot_table = ttk.Treeview(table_frame, show="headings", yscrollcommand=yscrollbar.set,
+                                        xscrollcommand=xscrollbar.set)
+        yscrollbar.config(command=self.pivot_table.yview)
+        xscrollbar.config(command=self.pivot_table.xview)
+        self.pivot_table.pack(fill="both", expand=True)
+
+        # The first pivot is computed when the tab is opened
+        self.pivot_view = None
+        self.pivot_source_var.set("Orders")
+        self.on_pivot_source_change()
+
+    def on_pivot_source_change(self, event=None):
+        """Offer the dimensions and measures of the selected source"""
+        spec = SOURCES[self.pivot_source_var.get()]
+        dimensions = list(spec["dimensions"])
+        self.pivot_rows_cb['values'] = dimensions
+        self.pivot_rows2_cb['values'] = ["(none)"] + dimensions
+        self.pivot_columns_cb['values'] = ["(none)"] + dimensions
+        self.pivot_measure_cb['values'] = list(spec["measures"])
+        self.pivot_rows_var.set(dimensions[0])
+        self.pivot_rows2_var.set("(none)")
+        self.pivot_columns_var.set("(none)")
+        self.pivot_measure_var.set(list(spec["measures"])[0])
+        if event is not None:
+            self.update_pivot()
+
+    def update_pivot(self):
+        source = self.pivot_source_var.get()
+        rows = [self.pivot_rows_var.get()]
+        if self.pivot_rows2_var.get() != "(none)":
+            rows.append(self.pivot_rows2_var.get())
+        columns = self.pivot_columns_var.get()
+        columns = None if columns == "(none)" else columns
+        measure = self.pivot_measure_var.get()
+        start, end = period_range(self.pivot_date_var.get()) or (None, None)
+
+        started = datetime.now()
+        try:
+            df = self.pivot_engine.pivot(source, rows, measure, columns, start, end)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        elapsed = (datetime.now() - started).total_seconds()
+        self.pivot_view = df
+
+        # Counts are shown as whole numbers, amounts in rupees
+        counted = SOURCES[source]["measures"][measure] in (None, "qty")
+        headings = [str(col) for col in df.columns]
+        self.pivot_table.delete(*self.pivot_table.get_children())
+        self.pivot_table['columns'] = [f"c{i}" for i in range(len(headings))]
+        for i, heading in enumerate(headings):
+            self.pivot_table.heading(f"c{i}", text=heading)
+            self.pivot_table.column(f"c{i}", width=150 if i < len(rows) else 100,
+                                    anchor="w" if i < len(rows) else "e", stretch=False)
+
+        # The totals line is always the last row
+        shown = pd.concat([df.iloc[:-1].head(1000), df.tail(1)]) if len(df) > 1001 else df
+        for row in shown.itertuples(index=False):
+            labels = ["" if pd.isna(value) else value for value in row[:len(rows)]]
+            values = [f"{value:,.0f}" if counted else f"{value:,.2f}" for value in row[len(rows):]]
+            self.pivot_table.insert("", "end", values=labels + values)
+
+        self.pivot_status_var.set(f"{len(df) - 1:,} rows" + (" (showing first 1,000)" if len(df) > 1001 else "") +
+                                  f" in {elapsed:.2f}s")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LED Strip Stock & Orders App")
+    parser.add_argument("--view", choices=list(VIEWS), default=DEFAULT_VIEW,
+                        help="show profit as margin (on sell price) or markup (on cost, with inventory turnover)")
+    args = parser.parse_args()
+
     init_files()
-    app = StockApp()
+    app = StockApp(view=args.view)
     app.mainloop()
\ No newline at end of file
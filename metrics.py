@@ -0,0 +1,132 @@
+"""Business metrics for the Summary tab, and the views that display them.
+
+``compute_metrics`` derives every figure from filtered stock and order
+frames: stock counts and values, order revenue/cost/profit by status,
+profit both as margin (share of the sell price) and as markup (share of the
+cost), inventory turnover and cancellation/return/success rates.  Which of
+them the Summary tab shows is a matter of the view: ``margin`` or
+``markup``.  Every view is formatted from the same computed figures, so
+switching views needs no recomputation.  VOIDED (undone) pieces and order
+lines are left out of every figure.
+"""
+from undo import VOIDED
+
+DEFAULT_VIEW = "margin"
+
+# Field -> (label, bold value, fixed color)
+FIELDS = {
+    "total_revenue": ("Total Revenue:", True, "green"),
+    "total_order_cost": ("Total Order Cost:", True, None),
+    "total_order_profit": ("Total Profit:", True, "darkgreen"),
+    "order_profit_margin": ("Profit Margin:", True, None),
+    "order_profit_percentage": ("Order Profit %:", True, None),
+    "inventory_turnover": ("Inventory Turnover:", False, None),
+    "active_orders": ("Active Orders:", False, None),
+    "profit_margin": ("Profit Margin:", False, None),
+    "profit_percentage": ("Profit %:", False, None),
+}
+
+# Key performance indicators are laid out three to a row, in order
+VIEWS = {
+    "margin": {
+        "kpis": ["total_revenue", "total_order_cost", "active_orders", "total_order_profit", "order_profit_margin"],
+        "stock_profit": "profit_margin",
+    },
+    "markup": {
+        "kpis": ["total_revenue", "total_order_cost", "order_profit_percentage", "total_order_profit",
+                 "inventory_turnover", "active_orders"],
+        "stock_profit": "profit_percentage",
+    },
+}
+
+_ORDER_SUMS = ["total_seller_price", "total_unit_cost", "profit_total"]
+
+
+def percentage(part, whole):
+    return part / whole * 100 if whole > 0 else 0
+
+
+def profit_percentage(profit, sell, cost, view=DEFAULT_VIEW):
+    """Profit as a percentage of the sell price (margin) or of the cost (markup)"""
+    return percentage(profit, sell) if view == "margin" else percentage(profit, cost)
+
+
+def compute_metrics(df_stock, df_orders):
+    """Every summary figure for the given (already filtered) stock and order frames"""
+    df_stock = df_stock[df_stock["status"] != VOIDED]
+    if not df_orders.empty:
+        df_orders = df_orders[df_orders["status"] != VOIDED]
+    stock_counts = df_stock["status"].value_counts()
+    total_cost = float(df_stock["unit_cost"].sum())
+    seller_value = float(df_stock["seller_price"].sum())
+
+    # One group-by gives the sums and line counts of every order status
+    if df_orders.empty:
+        by_status = {}
+        total_orders = 0
+    else:
+        grouped = df_orders[_ORDER_SUMS].groupby(df_orders["status"])
+        by_status = grouped.sum().assign(lines=grouped.size()).to_dict("index")
+        total_orders = len(df_orders)
+    active = by_status.get("ACTIVE", {})
+    total_revenue = float(active.get("total_seller_price", 0))
+    total_order_cost = float(active.get("total_unit_cost", 0))
+    total_order_profit = float(active.get("profit_total", 0))
+    total_cancelled = int(by_status.get("CANCELLED", {}).get("lines", 0))
+    total_returned = int(by_status.get("RETURNED", {}).get("lines", 0))
+
+    cancellation_rate = percentage(total_cancelled, total_orders)
+    return_rate = percentage(total_returned, total_orders)
+    return {
+        "total_instock": int(stock_counts.get("IN_STOCK", 0)),
+        "total_sold": int(stock_counts.get("SOLD", 0)),
+        "total_removed": int(stock_counts.get("REMOVED", 0)),
+        "total_cost": total_cost,
+        "seller_value": seller_value,
+        "total_profit": seller_value - total_cost,
+        "profit_margin": percentage(seller_value - total_cost, seller_value),
+        "profit_percentage": percentage(seller_value - total_cost, total_cost),
+        "total_revenue": total_revenue,
+        "total_order_cost": total_order_cost,
+        "total_order_profit": total_order_profit,
+        "order_profit_margin": percentage(total_order_profit, total_revenue),
+        "order_profit_percentage": percentage(total_order_profit, total_order_cost),
+        "inventory_turnover": total_revenue / seller_value if seller_value > 0 else 0,
+        "total_orders": total_orders,
+        "active_orders": total_orders - total_cancelled - total_returned,
+        "total_cancelled": total_cancelled,
+        "total_returned": total_returned,
+        "cancellation_rate": cancellation_rate,
+        "return_rate": return_rate,
+        "success_rate": 100 - cancellation_rate - return_rate,
+    }
+
+
+def _grade(value, good, fair, colors=("darkgreen", "orange", "red")):
+    return colors[0] if value >= good else colors[1] if value >= fair else colors[2]
+
+
+def format_metrics(m):
+    """Display text, or ``(text, color)``, for every field any view can show"""
+    return {
+        "total_revenue": f"Rs. {m['total_revenue']:,.2f}",
+        "total_order_cost": f"Rs. {m['total_order_cost']:,.2f}",
+        "total_order_profit": f"Rs. {m['total_order_profit']:,.2f}",
+        "order_profit_margin": (f"{m['order_profit_margin']:.2f}%", _grade(m["order_profit_margin"], 20, 10)),
+        "order_profit_percentage": (f"{m['order_profit_percentage']:.2f}%",
+                                    _grade(m["order_profit_percentage"], 20, 10)),
+        "inventory_turnover": (f"{m['inventory_turnover']:.2f}x", _grade(m["inventory_turnover"], 4, 2)),
+        "active_orders": f"{m['active_orders']}",
+        "total_instock": f"{m['total_instock']}",
+        "total_sold": f"{m['total_sold']}",
+        "total_removed": f"{m['total_removed']}",
+        "seller_value": f"Rs. {m['seller_value']:,.2f}",
+        "total_cost": f"Rs. {m['total_cost']:,.2f}",
+        "total_profit": (f"Rs. {m['total_profit']:,.2f}", "green" if m["total_profit"] > 0 else "red"),
+        "profit_margin": (f"{m['profit_margin']:.2f}%", "green" if m["profit_margin"] > 0 else "red"),
+        "profit_percentage": (f"{m['profit_percentage']:.2f}%", "green" if m["profit_percentage"] > 0 else "red"),
+        "total_orders": f"{m['total_orders']}",
+        "cancellation_rate": (f"{m['cancellation_rate']:.2f}%", _grade(-m["cancellation_rate"], -2, -5)),
+        "return_rate": (f"{m['return_rate']:.2f}%", _grade(-m["return_rate"], -2, -5)),
+        "success_rate": (f"{m['success_rate']:.2f}%", _grade(m["success_rate"], 90, 80)),
+    }
@@ -0,0 +1,84 @@
+"""Collision-free order ids: ``ORD_<YYYYMMDD>_<sequence>``.
+
+The last issued sequence is kept in a small counter file next to the orders
+workbook.  Every reservation locks that file and writes it through before
+returning, so an id is never issued twice, even across restarts.  Only one
+process has the data open at a time (the app, the API server or a bulk
+import; see ``store.lock_directory``).  Sequences restart at 1 each day and
+are zero-padded so ids sort in issue order.
+"""
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+ORDER_ID_PATTERN = re.compile(r"^ORD_(\d{8})_(\d+)$")
+
+
+@contextmanager
+def _locked(path):
+    """Open ``path`` for read/write while holding an exclusive OS lock on it"""
+    open(path, "ab").close()
+    with open(path, "r+b") as fh:
+        if msvcrt:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield fh
+        finally:
+            if msvcrt:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class OrderIdGenerator:
+    """Hands out order ids from a locked counter file.
+
+    ``existing_ids`` (e.g. the order_id column) seeds today's sequence so a
+    missing counter file never causes ids to be reused.
+    """
+
+    def __init__(self, path, existing_ids=()):
+        self.path = path
+        self._seed_day, self._seed_seq = self._latest(existing_ids)
+
+    def seed(self, ids):
+        """Also never reuse ``ids``, e.g. those of order lines imported later"""
+        day, seq = self._latest(ids)
+        self._seed_seq = max(seq, self._seed_seq if day == self._seed_day else 0)
+        self._seed_day = day
+
+    @staticmethod
+    def _latest(existing_ids):
+        today = datetime.now().strftime("%Y%m%d")
+        seqs = [int(m.group(2)) for m in map(ORDER_ID_PATTERN.match, map(str, existing_ids))
+                if m and m.group(1) == today]
+        return today, max(seqs, default=0)
+
+    def next_ids(self, count=1, now=None):
+        """Reserve ``count`` consecutive ids for ``now`` (default: current time)"""
+        day = (now or datetime.now()).strftime("%Y%m%d")
+        with _locked(self.path) as fh:
+            fh.seek(0)
+            saved_day, _, saved_seq = fh.read().decode("ascii", "ignore").strip().partition(" ")
+            last = int(saved_seq) if saved_day == day and saved_seq.isdigit() else 0
+            if day == self._seed_day:
+                last = max(last, self._seed_seq)
+
+            fh.seek(0)
+            fh.truncate()
+            fh.write(f"{day} {last + count}\n".encode("ascii"))
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        return [f"ORD_{day}_{seq:06d}" for seq in range(last + 1, last + count + 1)]
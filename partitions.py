@@ -0,0 +1,117 @@
+"""Month-partitioned storage for orders.
+
+Orders live in one workbook per calendar month of ``order_date`` under
+``ORDERS_DIR`` (``orders/2025-09.xlsx``, ...); lines without a valid date go
+to ``orders/undated.xlsx``.  Partitions are identified by integer keys
+``year * 100 + month`` (0 for undated), so a date range maps to a contiguous
+key range and everything outside it can be skipped without being opened.
+"""
+import os
+import re
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+ORDERS_DIR = "orders"
+UNDATED = 0
+
+_FILE_PATTERN = re.compile(r"^(\d{4})-(\d{2})\.xlsx$")
+
+
+def partition_keys(dates):
+    """Partition key per date (vectorized); missing dates map to UNDATED"""
+    dates = pd.to_datetime(pd.Series(dates), errors="coerce")
+    keys = dates.dt.year * 100 + dates.dt.month
+    return keys.fillna(UNDATED).astype(np.int64).to_numpy()
+
+
+def key_range(start=None, end=None):
+    """Inclusive ``(first_key, last_key)`` for the half-open range ``[start, end)``"""
+    first = UNDATED + 1 if start is None else pd.Timestamp(start).year * 100 + pd.Timestamp(start).month
+    if end is None:
+        last = np.iinfo(np.int64).max
+    else:
+        last_day = pd.Timestamp(end) - pd.Timedelta(microseconds=1)
+        last = last_day.year * 100 + last_day.month
+    return first, last
+
+
+def period_range(period, today=None):
+    """``(start, end)`` datetimes of a named UI date filter, ``end`` exclusive or None.
+
+    Returns None for "All" / "All Time" and unknown names.
+    """
+    today = datetime.combine(today or datetime.now().date(), datetime.min.time())
+    month_start = today.replace(day=1)
+    if period == "Today":
+        return today, today + timedelta(days=1)
+    if period == "Last 7 Days":
+        return today - timedelta(days=7), None
+    if period == "This Month":
+        return month_start, (month_start + timedelta(days=32)).replace(day=1)
+    if period == "Last Month":
+        return (month_start - timedelta(days=1)).replace(day=1), month_start
+    days = {"Last 3 Months": 90, "Last 6 Months": 180, "Last 12 Months": 365}.get(period)
+    if days:
+        return today - timedelta(days=days), None
+    return None
+
+
+class PartitionedOrders:
+    """Reads and writes the per-month order workbooks in ``directory``"""
+
+    def __init__(self, directory=ORDERS_DIR):
+        self.directory = directory
+
+    def path(self, key):
+        name = "undated.xlsx" if key == UNDATED else f"{key // 100:04d}-{key % 100:02d}.xlsx"
+        return os.path.join(self.directory, name)
+
+    def keys(self):
+        """Keys of the partitions on disk, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        keys = []
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match:
+                keys.append(int(match.group(1)) * 100 + int(match.group(2)))
+            elif name == "undated.xlsx":
+                keys.append(UNDATED)
+        return sorted(keys)
+
+    def read(self, keys=None, dtype=None):
+        """Raw frames of the given partitions (all partitions by default); ``dtype`` as for ``read_excel``"""
+        keys = self.keys() if keys is None else keys
+        return [pd.read_excel(self.path(key), dtype=dtype) for key in keys if os.path.exists(self.path(key))]
+
+    def write(self, key, df, writer):
+        """Replace one partition; ``writer(df, path)`` does the actual save"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(key)
+        if df.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        writer(df, path)
+
+    def migrate(self, legacy_file, writer):
+        """Split a single legacy orders workbook into partitions, once.
+
+        Does nothing when partitions already exist or there is no legacy
+        file.  Once its partitions are written, the legacy workbook is
+        renamed to ``<name>.migrated.xlsx`` so it is never imported again.
+        """
+        if self.keys() or not os.path.exists(legacy_file):
+            return False
+        df = pd.read_excel(legacy_file)
+        keys = partition_keys(pd.to_datetime(df["order_date"].astype(str), errors="coerce", format="mixed")
+                              if "order_date" in df.columns else pd.Series(pd.NaT, index=df.index))
+        for key in np.unique(keys):
+            self.write(int(key), df[keys == key], writer)
+        os.makedirs(self.directory, exist_ok=True)
+        base, ext = os.path.splitext(legacy_file)
+        os.replace(legacy_file, f"{base}.migrated{ext}")
+        return True
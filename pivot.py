@@ -0,0 +1,179 @@
+"""Ad-hoc pivot tables over order lines and stock pieces.
+
+Each source is first converted to a typed frame: the dimension columns
+become categoricals (months as ``year * 100 + month`` codes) and the
+measures become floats.  Grouping on categorical codes is several times
+faster than on raw strings, and the conversion is kept between pivots.
+Orders are append-only between edits, so only newly added order lines are
+converted; stock pieces change status on every sale, so the stock frame is
+converted again after each change.  Pivot results are memoized per query
+and data version.
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from result_cache import ResultCache
+from undo import VOIDED
+
+UNDATED_LABEL = "Undated"
+BLANK_LABEL = "(blank)"
+TOTAL = "Total"
+
+SOURCES = {
+    "Orders": {
+        "date": "order_date",
+        "dimensions": {"Product": "item_name", "Length": "length_m", "City": "city", "Customer": "customer_name",
+                       "Status": "status", "Month": "order_date", "Year": "order_date"},
+        # Measure -> summed column, or None to count lines
+        "measures": {"Sales": "total_seller_price", "Cost": "total_unit_cost", "Profit": "profit_total",
+                     "Qty": "qty", "Order Lines": None},
+    },
+    "Stock": {
+        "date": "date_added",
+        "dimensions": {"Product": "product_name", "Length": "length_m", "Status": "status",
+                       "Month Added": "date_added", "Month Sold": "sold_date"},
+        "measures": {"Pieces": None, "Cost Value": "unit_cost", "Sell Value": "seller_price", "Profit": "profit"},
+    },
+}
+
+
+def _month_keys(values):
+    """``year * 100 + month`` per date, 0 where the date is missing"""
+    dates = values.to_numpy(dtype="datetime64[ns]")
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    keys = (1970 + months // 12) * 100 + months % 12 + 1
+    return np.where(np.isnat(dates), 0, keys)
+
+
+def _text_categorical(values):
+    # Clean the distinct values only, then map every row through its code
+    codes, uniques = pd.factorize(values)
+    labels = pd.Index(uniques).astype(str).str.strip()
+    labels = labels.where(labels != "", BLANK_LABEL).append(pd.Index([BLANK_LABEL]))
+    label_codes, categories = pd.factorize(labels, sort=True)
+    return pd.Categorical.from_codes(label_codes[codes], categories=categories)
+
+
+def _categorical(values, dimension):
+    if dimension.startswith("Month"):
+        return pd.Categorical(_month_keys(values))
+    if dimension == "Year":
+        return pd.Categorical(_month_keys(values) // 100)
+    if dimension == "Length":
+        return pd.Categorical(values.round().astype("Int64"))
+    return _text_categorical(values)
+
+
+def typed_frame(source, df):
+    """Dimensions of ``df`` as categoricals and measures as floats, plus the filter date.
+
+    VOIDED rows (writes that were undone) are left out.
+    """
+    df = df[df["status"] != VOIDED]
+    spec = SOURCES[source]
+    typed = {dimension: _categorical(df[column], dimension) for dimension, column in spec["dimensions"].items()}
+    for measure, column in spec["measures"].items():
+        if column is not None:
+            typed[measure] = pd.to_numeric(df[column], errors="coerce").fillna(0).astype(float).to_numpy()
+    typed["date"] = df[spec["date"]].to_numpy()
+    return pd.DataFrame(typed)
+
+
+def _append(old, new):
+    """Concatenate two typed frames, merging the categories of each dimension"""
+    columns = {}
+    for col in old.columns:
+        if isinstance(old[col].dtype, pd.CategoricalDtype):
+            columns[col] = union_categoricals([old[col], new[col]], sort_categories=True)
+        else:
+            columns[col] = np.concatenate([old[col].to_numpy(), new[col].to_numpy()])
+    return pd.DataFrame(columns)
+
+
+def _label(key, dimension):
+    if dimension.startswith("Month"):
+        return UNDATED_LABEL if key == 0 else f"{key // 100:04d}-{key % 100:02d}"
+    if dimension == "Year":
+        return UNDATED_LABEL if key == 0 else str(key)
+    return key
+
+
+def pivot(typed, source, rows, measure, columns=None, start=None, end=None):
+    """Cross-tab of ``measure`` by the ``rows`` dimensions and, optionally, a ``columns`` dimension.
+
+    Returns a flat frame: one column per row dimension, then one per value of
+    the column dimension (or just the measure), then totals.  Only lines
+    dated in ``[start, end)`` are counted when a range is given.
+    """
+    if start is not None or end is not None:
+        dates = typed["date"]
+        mask = dates.notna()
+        if start is not None:
+            mask &= dates >= pd.Timestamp(start)
+        if end is not None:
+            mask &= dates < pd.Timestamp(end)
+        typed = typed[mask]
+
+    keys = list(rows) + ([columns] if columns else [])
+    if not rows or len(set(keys)) != len(keys):
+        raise ValueError("Pick at least one row dimension and no dimension twice")
+    grouped = typed.groupby(keys, observed=True)
+    column = SOURCES[source]["measures"][measure]
+    values = grouped.size().astype(float) if column is None else grouped[measure].sum()
+
+    if columns:
+        table = values.unstack(columns, fill_value=0)
+        table.columns = [_label(key, columns) for key in table.columns]
+        table[TOTAL] = table.sum(axis=1)
+    else:
+        table = values.to_frame(measure)
+    table = table.reset_index()
+    for dimension in rows:
+        table[dimension] = [_label(key, dimension) for key in table[dimension]]
+
+    measures = table.columns.drop(list(rows))
+    totals = pd.DataFrame([table[measures].sum()])
+    totals[rows[0]] = TOTAL
+    return pd.concat([table, totals], ignore_index=True)[table.columns]
+
+
+class PivotEngine:
+    """Pivots over a DataStore's orders and stock, with typed frames and results cached"""
+
+    def __init__(self, store):
+        self.store = store
+        self.results = ResultCache(maxsize=32)
+        self._typed = {}
+
+    def typed(self, source):
+        """Typed frame of the store's orders or stock, brought up to date"""
+        store = self.store
+        with store.lock:
+            frame = store.orders if source == "Orders" else store.stock
+            spec = SOURCES[source]
+            needed = list(dict.fromkeys(list(spec["dimensions"].values()) + [spec["date"]] +
+                                        [col for col in spec["measures"].values() if col]))
+            state = (store.version, store.order_edits)
+            cached = self._typed.get(source)
+            if cached is not None and cached[0] == state:
+                return cached[1]
+            # Orders only grow between edits, so convert just the new lines
+            append = (source == "Orders" and cached is not None and cached[0][1] == state[1]
+                      and cached[2] <= len(frame))
+            new_rows = frame.iloc[cached[2] if append else 0:][needed].copy()
+            converted = len(frame)
+
+        typed = typed_frame(source, new_rows)
+        if append:
+            typed = _append(cached[1], typed)
+        # Voided rows are dropped, so the typed frame can be shorter than the rows converted
+        self._typed[source] = (state, typed, converted)
+        return typed
+
+    def pivot(self, source, rows, measure, columns=None, start=None, end=None):
+        """Cached ``pivot`` of the store's current data"""
+        version = self.store.version
+        key = (source, tuple(rows), measure, columns, start, end)
+        return self.results.get(key, version, lambda: pivot(self.typed(source), source, rows, measure, columns,
+                                                            start, end))
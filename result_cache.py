@@ -0,0 +1,47 @@
+"""LRU memoization of computed views keyed by the store's data version.
+
+Summary figures and reports are cached under ``(key, version)`` where
+``version`` is ``DataStore.version``, which every write path bumps.  Entries
+of an older version can never be hit again, so they are dropped as soon as a
+newer version is stored.
+"""
+import threading
+from collections import OrderedDict
+
+
+class ResultCache:
+    """Thread-safe LRU cache of results keyed by ``(key, data_version)``"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key, version):
+        """``(True, value)`` on a hit, ``(False, None)`` otherwise"""
+        with self._lock:
+            if version != self.version or key not in self._entries:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, self._entries[key]
+
+    def put(self, key, version, value):
+        with self._lock:
+            if self.version is not None and version < self.version:
+                return  # Computed from data that has changed since
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get(self, key, version, compute):
+        """Cached value for ``key`` at ``version``, computing and storing it on a miss"""
+        found, value = self.lookup(key, version)
+        if not found:
+            value = compute()
+            self.put(key, version, value)
+        return value
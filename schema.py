@@ -0,0 +1,37 @@
+"""Version of the on-disk data layout.
+
+The version is kept in ``schema_version.txt`` next to the stock workbook.
+Data without that file predates versioning and may have any of the legacy
+quirks: one orders workbook instead of month partitions, missing ``status``
+columns, dates or numbers stored as text, customer details repeated on every
+order line.  ``DataStore.load`` upgrades such data once, rewriting every file
+in the current layout, so later loads and everything reading the store can
+take the current layout for granted.
+
+Versions:
+
+1. Legacy files (no version file).
+2. Month-partitioned orders with customer ids and a customer table; every
+   canonical column present, with real dates, numbers and statuses.  Order
+   lines were saved without their customer details.
+3. Order lines saved with the shipping details they were placed with.
+"""
+import os
+
+SCHEMA_FILE = "schema_version.txt"
+LEGACY_VERSION = 1
+SCHEMA_VERSION = 3
+
+
+def read_version(path):
+    """Stored schema version, or LEGACY_VERSION when there is none"""
+    if not os.path.exists(path):
+        return LEGACY_VERSION
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    return int(text) if text.isdigit() else LEGACY_VERSION
+
+
+def write_version(path, version=SCHEMA_VERSION):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{version}\n")
@@ -0,0 +1,113 @@
+"""Inverted index for full-text search over order lines.
+
+Order id, customer name, phones, address and city are split into lowercase
+word tokens, and each token maps to the sorted row positions of the order
+lines that contain it.  Phones are also indexed in normalized form.  A
+query matches a row when every query word is a prefix of one of the row's
+tokens.  Prefixes are looked up with bisect on the sorted vocabulary, so a
+search costs roughly the size of its result, not the size of the history.
+
+Orders are only ever appended, so the index catches up by tokenizing the
+rows added since it was last used.
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+
+import numpy as np
+import pandas as pd
+
+from customers import normalize_phone, normalize_phones
+
+SEARCH_FIELDS = ["order_id", "customer_name", "phone1", "phone2", "address", "city"]
+
+_TOKEN = re.compile(r"[^\W_]+")
+_TOKEN_OR_ROW = re.compile(r"[^\W_]+|\n")
+_PHONE_QUERY = re.compile(r"^[\d\s+()-]+$")
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+class OrderSearchIndex:
+    """Token -> row positions, for order lines appended in position order"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.postings = {}
+        self.vocab = []
+        self.rows = 0
+
+    def add(self, df, start):
+        """Index the order lines of ``df``, whose first row is at position ``start``"""
+        if df.empty:
+            return
+        text = df["order_id"].fillna("").astype(str)
+        for col in SEARCH_FIELDS[1:]:
+            text = text + " " + df[col].fillna("").astype(str)
+        for col in ("phone1", "phone2"):
+            text = text + " " + normalize_phones(df[col])
+        text = text.str.replace("\n", " ", regex=False)
+
+        # One regex pass over all rows; newlines mark where each row starts
+        found = np.array(_TOKEN_OR_ROW.findall("\n".join(text.tolist()).lower()), dtype=object)
+        separator = found == "\n"
+        positions = start + np.cumsum(separator)[~separator]
+        codes, vocab = pd.factorize(found[~separator])
+
+        # Sort by (token, row) and drop repeats of a token within a row
+        order = np.lexsort((positions, codes))
+        codes = codes[order]
+        positions = positions[order]
+        keep = np.ones(len(codes), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (positions[1:] != positions[:-1])
+        codes = codes[keep]
+        positions = positions[keep]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+        ends = np.append(starts[1:], len(codes))
+        grouped = ((token, positions[a:b]) for token, a, b in zip(vocab[codes[starts]], starts.tolist(), ends.tolist()))
+
+        with self.lock:
+            if start != self.rows:
+                return  # Another thread indexed these rows first
+            new_tokens = []
+            for token, rows in grouped:
+                old = self.postings.get(token)
+                if old is None:
+                    new_tokens.append(token)
+                    self.postings[token] = rows
+                else:
+                    self.postings[token] = np.concatenate([old, rows])
+            if len(new_tokens) > 1000:
+                self.vocab = sorted(self.postings)
+            else:
+                for token in new_tokens:
+                    insort(self.vocab, token)
+            self.rows = start + len(df)
+
+    def _prefix_rows(self, term):
+        lo = bisect_left(self.vocab, term)
+        hi = bisect_left(self.vocab, term + "\U0010ffff")
+        matches = [self.postings[token] for token in self.vocab[lo:hi]]
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        return matches[0] if len(matches) == 1 else np.unique(np.concatenate(matches))
+
+    def search(self, query):
+        """Sorted row positions of the order lines matching every word of ``query``"""
+        if _PHONE_QUERY.match(query) and len(re.sub(r"\D", "", query)) >= 9:
+            terms = [normalize_phone(query)]
+        else:
+            terms = tokenize(query)
+        if not terms:
+            return np.empty(0, dtype=np.int64)
+
+        with self.lock:
+            result = None
+            for term in terms:
+                rows = self._prefix_rows(term)
+                result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+                if not len(result):
+                    break
+        return np.sort(result)
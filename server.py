@@ -0,0 +1,210 @@
+"""Local HTTP/JSON API over the stock and orders store.
+
+Run headless with ``python server.py [--host 127.0.0.1] [--port 8765]``.
+
+Endpoints:
+    GET  /availability?product=...&length=...  IN_STOCK counts per product/length
+    GET  /summary                               headline stock and order metrics
+    GET  /orders/<order_id>                     order lines for one order
+    POST /orders                                {"customer": {...}, "items": [...]}
+    POST /orders/<order_id>/cancel
+    POST /orders/<order_id>/return
+
+Reads are served straight from the in-memory ``DataStore``.  Mutations go
+through an ``OrderIntake``, the single writer that batches everything arriving
+within its window and writes the workbooks once for the whole batch.
+
+On Ctrl-C the server stops accepting connections, commits and answers the
+mutations already queued, then closes the store (see ``DataStore.close``).
+"""
+import argparse
+import asyncio
+import json
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from allocation import DEFAULT_STRATEGY, STRATEGIES
+from backup import BACKUP_INTERVAL, BackupScheduler, BackupSet
+from intake import OrderIntake
+from integrity import PROBLEMS
+from store import DataLockedError, DataStore, OrderError, init_files
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class ApiServer:
+    def __init__(self, store, host="127.0.0.1", port=8765, intake=None):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.intake = intake or OrderIntake(store)
+        self._server = None
+        self._closing = False
+        self._clients = set()  # Handler tasks of open connections
+        self._idle = set()  # Writers of connections waiting for their next request
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        return self._server
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop accepting requests, answer the mutations already queued and stop the writer"""
+        self._closing = True
+        if self._server is not None:
+            self._server.close()
+        for writer in self._idle:
+            writer.close()
+        # Handlers waiting on the writer get their results while it commits what is queued
+        await asyncio.get_running_loop().run_in_executor(None, self.intake.close)
+        await asyncio.gather(*self._clients, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader, writer):
+        self._clients.add(asyncio.current_task())
+        try:
+            while not self._closing:
+                self._idle.add(writer)
+                try:
+                    request_line = await reader.readline()
+                finally:
+                    self._idle.discard(writer)
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"},
+                                        False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                keep_alive = (headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                              and not self._closing)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            self._clients.discard(asyncio.current_task())
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body):
+        """Route one request and return ``(HTTPStatus, json_payload)``"""
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        try:
+            if method == "GET" and parts == ["availability"]:
+                length = int(query["length"]) if query.get("length") else None
+                return HTTPStatus.OK, self.store.availability(query.get("product"), length)
+
+            if method == "GET" and parts == ["summary"]:
+                return HTTPStatus.OK, self.store.summary_metrics()
+
+            if method == "GET" and len(parts) == 2 and parts[0] == "orders":
+                order = self.store.get_order(parts[1])
+                if order.empty:
+                    return HTTPStatus.NOT_FOUND, {"error": f"Order {parts[1]} not found"}
+                return HTTPStatus.OK, order.astype(object).where(order.notna(), None).to_dict("records")
+
+            if method == "POST" and self._closing:
+                return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "The server is shutting down"}
+
+            if method == "POST" and parts == ["orders"]:
+                data = json.loads(body or b"{}")
+                if not isinstance(data, dict):
+                    return HTTPStatus.BAD_REQUEST, {"error": "Request body must be a JSON object"}
+                order_id = await asyncio.wrap_future(
+                    self.intake.submit_order(data.get("customer") or {}, data.get("items") or []))
+                return HTTPStatus.CREATED, {"order_id": order_id}
+
+            if method == "POST" and len(parts) == 3 and parts[0] == "orders" and parts[2] in ("cancel", "return"):
+                action = "CANCELLED" if parts[2] == "cancel" else "RETURNED"
+                await asyncio.wrap_future(self.intake.submit(self.store.process_order_action, parts[1], action))
+                return HTTPStatus.OK, {"order_id": parts[1], "status": action}
+        except (OrderError, ValueError, KeyError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {url.path}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stock availability and orders over HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default=DEFAULT_STRATEGY,
+                        help="order in which IN_STOCK pieces are allocated")
+    parser.add_argument("--backup-interval", type=float, default=BACKUP_INTERVAL,
+                        help="seconds between incremental backups of the data")
+    args = parser.parse_args()
+
+    init_files()
+    try:
+        store = DataStore(strategy=args.strategy)
+    except DataLockedError as e:
+        raise SystemExit(str(e))
+    problems = store.check_integrity()["problem"].value_counts()
+    for problem, count in problems.items():
+        print(f"Data check: {count:,} x {PROBLEMS[problem]}")
+    scheduler = BackupScheduler(BackupSet(store), args.backup_interval)
+    scheduler.start()
+    server = ApiServer(store, args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(_serve(server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.stop()
+        store.close()
+
+
+async def _serve(server):
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,824 @@
+"""Shared in-memory copy of the stock and orders data (see ``DataStore``).
+
+Stock is written in two places: ``stock.xlsx`` and ``stock_journal.csv``,
+which holds the stock rows changed by saves since the workbook was last
+written.  The journal is folded back into the workbook when the store is
+closed and once it holds ``JOURNAL_LIMIT`` rows, so while no store has the
+data open ``stock.xlsx`` is normally current and can be edited by hand.  A
+journal left behind by a program that did not close (a crash) is replayed
+on the next load unless the workbook was modified after the journal's last
+write; then the hand-edited workbook wins and the journal is moved aside to
+``stock_journal.stale.csv``, leaving ``stale_journal`` set on the store.
+"""
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from allocation import DEFAULT_STRATEGY, StockQueues, allocate_orders
+from customers import CUSTOMER_DETAILS, CUSTOMERS_FILE, CustomerBook
+from integrity import FIXABLE, check, fixes
+from order_ids import OrderIdGenerator
+from partitions import PartitionedOrders, key_range, partition_keys
+from schema import SCHEMA_FILE, SCHEMA_VERSION, read_version, write_version
+from search import SEARCH_FIELDS, OrderSearchIndex
+from undo import ORDER_FIELDS, STOCK_FIELDS, VOIDED, Change, UndoHistory
+from valuation import InventoryHistory
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+STOCK_FILE = "stock.xlsx"
+ORDERS_FILE = "orders.xlsx"  # Legacy single workbook; orders now live in month partitions (see partitions.py)
+
+STOCK_COLUMNS = ["piece_id", "product_name", "length_m", "date_added", "seller_price", "unit_cost", "profit",
+                 "status", "sold_date", "order_id"]
+ORDER_COLUMNS = ["order_id", "order_date", "customer_id", "customer_name", "address", "phone1", "phone2", "city", "item_name",
+                 "length_m", "qty", "total_unit_cost", "total_seller_price", "profit_total", "allocated_piece_ids",
+                 "status"]
+
+STOCK_STATUSES = ("IN_STOCK", "SOLD", "REMOVED", VOIDED)
+ORDER_STATUSES = ("ACTIVE", "CANCELLED", "RETURNED", VOIDED)
+ORDER_ACTIONS = ("CANCELLED", "RETURNED")
+
+LOCK_FILE = ".datastore.lock"
+JOURNAL_LIMIT = 1_000  # Journaled stock rows after which the stock workbook is rewritten
+
+
+class OrderError(ValueError):
+    """Raised when an order cannot be placed, cancelled or returned"""
+
+
+class DataLockedError(RuntimeError):
+    """Raised when another process already has the data directory open"""
+
+
+def write_frame(df, path):
+    """Save a frame to Excel with explicit datetime formatting"""
+    try:
+        with pd.ExcelWriter(path, engine='openpyxl', datetime_format='YYYY-MM-DD HH:MM:SS') as writer:
+            df.to_excel(writer, index=False)
+    except ImportError:
+        # Fallback if openpyxl not available
+        df.to_excel(path, index=False)
+
+
+def _dates(values, legacy):
+    if legacy:
+        # Text dates in whatever format older versions wrote
+        return pd.to_datetime(values.astype(str), errors='coerce', format='mixed')
+    return pd.to_datetime(values, errors='coerce')
+
+
+def normalize_stock(df, legacy=True):
+    """Coerce a raw stock frame to the canonical columns and dtypes.
+
+    Frames read from files in the current schema (``legacy=False``, see
+    ``schema.py``) already hold real dates and a status on every row.
+    """
+    df = df.reindex(columns=STOCK_COLUMNS)
+    for col in ("date_added", "sold_date"):
+        df[col] = _dates(df[col], legacy)
+    df["length_m"] = pd.to_numeric(df["length_m"], errors='coerce')
+    for col in ("seller_price", "unit_cost", "profit"):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+    # Text columns stay object even when every value read back is empty
+    for col in ("status", "order_id"):
+        df[col] = df[col].astype(object)
+    if legacy:
+        df["status"] = df["status"].fillna("IN_STOCK")
+    return df
+
+
+def normalize_orders(df, legacy=True):
+    """Coerce a raw orders frame to the canonical columns and dtypes (see ``normalize_stock``)"""
+    df = df.reindex(columns=ORDER_COLUMNS)
+    df["order_date"] = _dates(df["order_date"], legacy)
+    for col in ["customer_id"] + CUSTOMER_DETAILS:
+        df[col] = df[col].astype(object)
+    for col in ("length_m", "qty"):
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in ("total_unit_cost", "total_seller_price", "profit_total"):
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+    if legacy:
+        df["status"] = df["status"].fillna("ACTIVE")  # Default status for old orders
+    return df
+
+
+def lock_directory(directory):
+    """Hold an exclusive OS lock on ``directory`` for as long as the returned file stays open"""
+    fh = open(os.path.join(directory, LOCK_FILE), "a+b")
+    try:
+        if msvcrt:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        fh.close()
+        raise DataLockedError(f"The data in {directory} is already open in another program (the app, the "
+                              f"order server or an import). Close it and try again.") from None
+    return fh
+
+
+# Ensure Excel files exist with proper date formatting
+def init_files(stock_file=STOCK_FILE, orders_file=ORDERS_FILE):
+    if not os.path.exists(stock_file):
+        write_frame(pd.DataFrame(columns=STOCK_COLUMNS), stock_file)
+
+    # Month partitions of the orders go in a folder named after the orders workbook
+    os.makedirs(os.path.splitext(orders_file)[0], exist_ok=True)
+
+
+class DataStore:
+    """In-memory copy of the stock and orders workbooks.
+
+    The workbooks are read once; every mutation is applied to the frames held
+    here and written back with ``save()``.  Callers that batch several
+    mutations pass ``save=False`` and save once at the end.
+
+    IN_STOCK pieces are also indexed in per-(product, length) priority queues
+    ordered by ``strategy`` (see ``allocation.STRATEGIES``).
+
+    Orders are stored in month partitions next to ``orders_file`` and the row
+    positions of each partition are kept in memory, so date-range queries and
+    saves only touch the months involved.  An existing single orders workbook
+    is split into partitions the first time it is loaded.
+
+    Saves append the stock rows changed since the last save to a CSV journal
+    next to the stock workbook instead of rewriting the workbook; the journal
+    is replayed on load and folded back into the workbook on ``close()`` and
+    once it holds ``JOURNAL_LIMIT`` rows (see the module docstring).
+
+    Every stock write also updates the daily valuation snapshots (see
+    ``valuation.py``) behind ``inventory_as_of``.
+
+    ``version`` is bumped by every write, so results computed from the data
+    can be cached against it (see ``result_cache.py``).
+
+    Order lines keep the shipping details they were placed with and a
+    ``customer_id`` linking them to the customer table (see ``customers.py``),
+    which groups a customer's orders and remembers their latest details.
+
+    Files written before the current schema (see ``schema.py``) are upgraded
+    on their first load and rewritten once in the current layout.
+
+    Adding and removing stock, placing orders and cancelling or returning
+    them are recorded for ``undo()`` / ``redo()`` (see ``undo.py``), which
+    change the in-memory rows back and save like any other write.
+
+    Each process writes back its own copy of the data, so the data directory
+    is locked while a store has it open and a second store raises
+    ``DataLockedError`` (the app and the server cannot share the files).
+    ``close()`` saves, folds the journal into the stock workbook and releases
+    the lock.
+    """
+
+    def __init__(self, stock_file=STOCK_FILE, orders_file=ORDERS_FILE, strategy=DEFAULT_STRATEGY,
+                 customers_file=CUSTOMERS_FILE):
+        self.stock_file = stock_file
+        self.orders_file = orders_file
+        self.customers_file = customers_file
+        # Order id counter lives next to the orders workbook
+        self.seq_file = os.path.splitext(orders_file)[0] + "_seq.txt"
+        self.schema_file = os.path.join(os.path.dirname(stock_file), SCHEMA_FILE)
+        self.journal_file = os.path.splitext(stock_file)[0] + "_journal.csv"
+        self.partitions = PartitionedOrders(os.path.splitext(orders_file)[0])
+        self.history = InventoryHistory(os.path.splitext(stock_file)[0] + "_snapshots.csv")
+        self.strategy = strategy
+        self.lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self.version = 0
+        self.order_edits = 0  # Bumped when existing order lines change, not when orders are added
+        self.undo_history = UndoHistory()
+        self.stale_journal = None  # Set when a journal older than a hand-edited workbook was set aside
+        self._dir_lock = lock_directory(os.path.dirname(os.path.abspath(stock_file)))
+        try:
+            self.load()
+        except Exception:
+            self._dir_lock.close()
+            raise
+
+    def close(self):
+        """Save, write the stock workbook in full and release the data directory for other processes"""
+        try:
+            self.save(compact=True)
+        finally:
+            self._dir_lock.close()
+
+    def load(self):
+        """(Re)read the stock workbook and all order partitions into memory, upgrading old files once"""
+        legacy = read_version(self.schema_file) < SCHEMA_VERSION
+        stock = pd.read_excel(self.stock_file) if os.path.exists(self.stock_file) else pd.DataFrame()
+        if legacy:
+            self.partitions.migrate(self.orders_file, write_frame)
+        # Phone numbers and ids are text; read as numbers they would lose their leading zeros
+        frames = self.partitions.read(dtype=dict.fromkeys(["order_id", "customer_id"] + CUSTOMER_DETAILS, str))
+        orders = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+        self._install(self._replay_journal(normalize_stock(stock, legacy)), normalize_orders(orders, legacy))
+        if legacy:
+            self._upgrade()
+
+    def _replay_journal(self, stock):
+        """Apply the stock rows journaled since the workbook was last written"""
+        self._journal_rows = 0
+        if not os.path.exists(self.journal_file):
+            return stock
+        if os.path.exists(self.stock_file) and os.path.getmtime(self.stock_file) > os.path.getmtime(self.journal_file):
+            # The workbook was edited after the last journaled save; don't overwrite the edits
+            self.stale_journal = os.path.splitext(self.journal_file)[0] + ".stale.csv"
+            os.replace(self.journal_file, self.stale_journal)
+            return stock
+        journal = pd.read_csv(self.journal_file, dtype=object)
+        # A save cut short leaves a partial last line without its end marker
+        journal = journal[journal["end"].notna()]
+        self._journal_rows = len(journal)
+        journal = journal.drop_duplicates("row", keep="last")
+        changes = normalize_stock(journal, legacy=False).set_axis(journal["row"].astype(np.int64).to_numpy())
+        existing = changes.index < len(stock)
+        stock.loc[changes.index[existing]] = changes[existing]
+        return pd.concat([stock, changes[~existing].sort_index()], ignore_index=True)
+
+    def _remove_journal(self):
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self._journal_rows = 0
+
+    def _upgrade(self):
+        """Rewrite every file from the normalized frames and record the current schema version"""
+        with self.lock:
+            self._dirty_partitions = set(self._partition_rows) | set(self.partitions.keys())
+            self.customers.dirty = True
+            self._journal_rows = JOURNAL_LIMIT  # Write the stock workbook itself
+        self.save()
+        write_version(self.schema_file)
+
+    def _install(self, stock, orders):
+        """Make normalized ``stock`` and ``orders`` frames the store's data and rebuild every index"""
+        with self.lock:
+            self.stock = stock
+            self.orders = orders
+            self._partition_rows = {}
+            self._dirty_partitions = set()
+            self._changed_stock = set()  # Labels of saved stock rows changed since the last save
+            self._saved_stock = len(stock)  # Rows from here on were added since the last save
+            self._index_orders(0)
+            self._order_totals = (0.0, 0)
+            self._totalled_orders = 0  # Lines already in _order_totals; lines are only appended
+            self.customers = CustomerBook(self.customers_file)
+            self._attach_customers(0)
+            self.search_index = OrderSearchIndex()
+            self.queues = StockQueues(stock, self.strategy)
+            self.history.load(stock)
+            self.undo_history.clear()  # Recorded rows refer to the frames being replaced
+            self.version += 1
+            self.order_edits += 1
+            self.order_ids = OrderIdGenerator(self.seq_file, orders["order_id"].dropna())
+
+    def set_allocation_strategy(self, strategy):
+        """Switch the order in which pieces are allocated"""
+        with self.lock:
+            self.queues = StockQueues(self.stock, strategy)
+            self.strategy = strategy
+
+    def ingest(self, stock_chunks=(), order_chunks=(), save=True):
+        """Append already-normalized stock and/or order frames in one step"""
+        stock_chunks = [df for df in stock_chunks if not df.empty]
+        order_chunks = [df for df in order_chunks if not df.empty]
+        if not stock_chunks and not order_chunks:
+            return
+
+        with self.lock:
+            if stock_chunks:
+                start = len(self.stock)
+                self.stock = pd.concat([self.stock] + stock_chunks, ignore_index=True)
+                for chunk in stock_chunks:
+                    self.history.apply(None, chunk)
+                added = self.stock.iloc[start:]
+                self.queues.push(self.stock, added.index[(added["status"] == "IN_STOCK").to_numpy()])
+            if order_chunks:
+                start = len(self.orders)
+                self.orders = pd.concat([self.orders] + order_chunks, ignore_index=True)
+                self._dirty_partitions |= self._index_orders(start)
+                self._attach_customers(start)
+                self.order_ids.seed(self.orders["order_id"].iloc[start:].dropna())
+            self.version += 1
+
+        if save:
+            self.save()
+
+    def _index_orders(self, start):
+        """Add order rows from position ``start`` on to the partition index; returns their keys"""
+        keys = partition_keys(self.orders["order_date"].iloc[start:])
+        positions = np.arange(start, start + len(keys))
+        for key in np.unique(keys).tolist():
+            new = positions[keys == key]
+            old = self._partition_rows.get(key)
+            self._partition_rows[key] = new if old is None else np.concatenate([old, new])
+        return set(np.unique(keys).tolist())
+
+    def _attach_customers(self, start):
+        """Link order rows from position ``start`` on to customers.
+
+        Rows saved before the customer table existed (details but no
+        customer_id) are added to the table and their partitions are marked
+        for rewriting with the id.  Each line keeps the shipping details it
+        was placed with; only lines saved without any (schema version 2)
+        get their customer's current details.
+        """
+        orders = self.orders.iloc[start:]
+        missing = orders["customer_id"].isna() | (orders["customer_id"] == "")
+        if missing.any():
+            legacy = orders[missing]
+            self.orders.loc[legacy.index, "customer_id"] = self.customers.assign(legacy)
+            self._dirty_partitions.update(partition_keys(legacy["order_date"]).tolist())
+
+        orders = self.orders.iloc[start:]
+        details = orders[CUSTOMER_DETAILS]
+        blank = (details.isna() | (details == "")).all(axis=1) & orders["customer_id"].notna()
+        rows = orders.index[blank.to_numpy()]
+        if len(rows):
+            self.orders.loc[rows, CUSTOMER_DETAILS] = self.customers.details(orders.loc[rows, "customer_id"]).to_numpy()
+
+    def _partition_positions(self, start=None, end=None):
+        """Row positions of the partitions that can hold orders dated in ``[start, end)``"""
+        first, last = key_range(start, end)
+        parts = [rows for key, rows in sorted(self._partition_rows.items()) if first <= key <= last]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def save(self, compact=False):
+        """Write the stock rows and the order partitions changed since the last save.
+
+        ``compact`` writes the whole stock workbook instead of journaling the
+        changed rows, if the journal holds any.
+        """
+        with self._save_lock:
+            with self.lock:
+                changed, saved = self._changed_stock, self._saved_stock
+                rows = np.union1d(np.fromiter(changed, dtype=np.int64, count=len(changed)),
+                                  np.arange(saved, len(self.stock)))
+                rewrite = self._journal_rows + len(rows) >= (1 if compact else JOURNAL_LIMIT)
+                stock = self.stock.copy() if rewrite else self.stock.loc[rows].copy()
+                self._changed_stock = set()
+                self._saved_stock = len(self.stock)
+                self.history.flush()
+                customers = self.customers.frame() if self.customers.dirty else None
+                self.customers.dirty = False
+                dirty = self._dirty_partitions
+                self._dirty_partitions = set()
+                parts = {key: self.orders.iloc[self._partition_rows.get(key, [])].copy() for key in dirty}
+            try:
+                if rewrite:
+                    write_frame(stock, self.stock_file)
+                    self._remove_journal()
+                elif len(stock):
+                    self._append_journal(stock)
+                if customers is not None:
+                    write_frame(customers, self.customers_file)
+                for key, orders in parts.items():
+                    self.partitions.write(key, orders, write_frame)
+            except Exception:
+                with self.lock:
+                    self._changed_stock |= changed
+                    self._saved_stock = min(self._saved_stock, saved)
+                    self._dirty_partitions |= dirty
+                    self.customers.dirty = self.customers.dirty or customers is not None
+                raise
+
+    def _append_journal(self, stock):
+        """Append changed stock rows, keyed by row label, in one write"""
+        journal = stock[STOCK_COLUMNS].rename_axis("row").reset_index().assign(end=1)
+        data = journal.to_csv(index=False, header=not os.path.exists(self.journal_file)).encode("utf-8")
+        with open(self.journal_file, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_rows += len(journal)
+
+    def replace(self, stock, orders, customers):
+        """Make these normalized frames the store's data and overwrite every workbook with them"""
+        keys = partition_keys(orders["order_date"])
+        with self._save_lock:
+            write_frame(customers, self.customers_file)
+            with self.lock:
+                self._install(stock.reset_index(drop=True), orders.reset_index(drop=True))
+            write_frame(stock, self.stock_file)
+            self._remove_journal()
+            for key in set(self.partitions.keys()) - set(keys.tolist()):
+                self.partitions.write(key, orders.iloc[:0], write_frame)
+            for key in np.unique(keys).tolist():
+                self.partitions.write(key, orders[keys == key], write_frame)
+
+    def _record(self, label, stock_before=None, order_before=None):
+        """Record a write for undo; ``*_before`` hold the touched rows' fields as they were before it"""
+        if stock_before is None:
+            stock_before = self.stock.loc[[], STOCK_FIELDS]
+        if order_before is None:
+            order_before = self.orders.loc[[], ORDER_FIELDS]
+        stock_after = self.stock.loc[stock_before.index, STOCK_FIELDS].copy()
+        order_after = self.orders.loc[order_before.index, ORDER_FIELDS].copy()
+        self.undo_history.record(Change(label, stock_before, stock_after, order_before, order_after))
+
+    def _set_fields(self, stock_values, order_values):
+        """Overwrite the undoable fields of the rows ``stock_values`` / ``order_values`` are indexed by"""
+        rows = stock_values.index
+        if len(rows):
+            before = self.stock.loc[rows].copy()
+            self._changed_stock.update(rows.tolist())
+            for col in STOCK_FIELDS:
+                self.stock.loc[rows, col] = stock_values[col].to_numpy()
+            after = self.stock.loc[rows]
+            self.queues.push(self.stock, rows[(after["status"] == "IN_STOCK").to_numpy()])
+            self.history.apply(before, after)
+
+        rows = order_values.index
+        if len(rows):
+            for col in ORDER_FIELDS:
+                self.orders.loc[rows, col] = order_values[col].to_numpy()
+            self._dirty_partitions.update(partition_keys(self.orders.loc[rows, "order_date"]).tolist())
+            self.order_edits += 1
+        self.version += 1
+
+    def _restore(self, change, side):
+        """Put the rows of ``change`` back to their "before" or "after" values"""
+        self._set_fields(change.stock[side], change.orders[side])
+
+    def check_integrity(self, repair=False, save=True):
+        """Problems between stock and orders (see ``integrity.py``); ``repair`` fixes the fixable ones.
+
+        Returns the report as it was before any repair.  A repair is recorded
+        for undo like any other write.
+        """
+        with self.lock:
+            report = check(self.stock, self.orders)
+            repair = repair and report["problem"].isin(FIXABLE).any()
+            if repair:
+                stock_values, order_values = fixes(report, self.stock, self.orders)
+                stock_before = self.stock.loc[stock_values.index, STOCK_FIELDS].copy()
+                order_before = self.orders.loc[order_values.index, ORDER_FIELDS].copy()
+                self._set_fields(stock_values, order_values)
+                self._record(f"Repair {int(report['problem'].isin(FIXABLE).sum()):,} data problem(s)",
+                             stock_before, order_before)
+
+        if save and repair:
+            self.save()
+        return report
+
+    def undo(self, save=True):
+        """Revert the latest recorded write; returns its label, or None if there is nothing to undo"""
+        with self.lock:
+            if not self.undo_history.done:
+                return None
+            change = self.undo_history.done.pop()
+            self._restore(change, "before")
+            self.undo_history.undone.append(change)
+
+        if save:
+            self.save()
+        return change.label
+
+    def redo(self, save=True):
+        """Apply the latest undone write again; returns its label, or None if there is nothing to redo"""
+        with self.lock:
+            if not self.undo_history.undone:
+                return None
+            change = self.undo_history.undone.pop()
+            self._restore(change, "after")
+            self.undo_history.done.append(change)
+
+        if save:
+            self.save()
+        return change.label
+
+    def stock_frame(self):
+        with self.lock:
+            return self.stock.copy()
+
+    def orders_frame(self, rows=None):
+        """Copy of the order lines, or of only those at row positions ``rows``"""
+        with self.lock:
+            return self.orders.copy() if rows is None else self.orders.iloc[rows].copy()
+
+    def orders_between(self, start=None, end=None):
+        """Order lines dated in ``[start, end)``; only the partitions in range are scanned"""
+        with self.lock:
+            df = self.orders.iloc[self._partition_positions(start, end)]
+            mask = df["order_date"].notna()
+            if start is not None:
+                mask &= df["order_date"] >= pd.Timestamp(start)
+            if end is not None:
+                mask &= df["order_date"] < pd.Timestamp(end)
+            return df[mask].copy()
+
+    def filter_orders(self, start=None, end=None, customer=None, product=None, status=None):
+        """Order lines matching the Orders tab filters; only matching lines are copied.
+
+        A date range scans only its partitions (as ``orders_between``);
+        without one every line is considered, undated ones included.
+        ``customer`` matches part of the name, case-insensitively.
+        """
+        with self.lock:
+            if start is None and end is None:
+                df = self.orders
+                mask = pd.Series(True, index=df.index)
+            else:
+                df = self.orders.iloc[self._partition_positions(start, end)]
+                mask = df["order_date"].notna()
+                if start is not None:
+                    mask &= df["order_date"] >= pd.Timestamp(start)
+                if end is not None:
+                    mask &= df["order_date"] < pd.Timestamp(end)
+            if product:
+                mask &= df["item_name"] == product
+            if status:
+                mask &= df["status"] == status
+            if customer:
+                mask &= df["customer_name"].str.lower().str.contains(customer.lower(), regex=False, na=False)
+            return df[mask].copy()
+
+    def order_totals(self):
+        """``(sales, pieces)`` summed over every order line, kept as running sums of the lines added"""
+        with self.lock:
+            added = self.orders.iloc[self._totalled_orders:]
+            sales, pieces = self._order_totals
+            self._order_totals = (sales + float(added["total_seller_price"].sum()), pieces + int(added["qty"].sum()))
+            self._totalled_orders = len(self.orders)
+            return self._order_totals
+
+    def refresh_search_index(self):
+        """Index order lines added since the last search; returns the index"""
+        with self.lock:
+            index = self.search_index
+            start = index.rows
+            new_rows = self.orders.iloc[start:][SEARCH_FIELDS].copy()
+
+        # Orders are append-only, so only the new lines need tokenizing (outside the store lock)
+        index.add(new_rows, start)
+        return index
+
+    def search_orders(self, query):
+        """Order lines matching every word of ``query`` (order id, customer, phones, address, city)"""
+        rows = self.refresh_search_index().search(query)
+        with self.lock:
+            return self.orders.iloc[rows].copy()
+
+    def latest_orders(self, count):
+        """The ``count`` most recent order lines, newest first, taken from the newest partitions"""
+        with self.lock:
+            parts = []
+            rows = 0
+            # Undated lines (key 0) sort last, as they would in a full sort
+            for key in sorted(self._partition_rows, reverse=True):
+                parts.append(self._partition_rows[key])
+                rows += len(parts[-1])
+                if rows >= count:
+                    break
+            df = self.orders.iloc[np.concatenate(parts) if parts else []]
+            return df.sort_values("order_date", ascending=False, kind="stable").head(count).copy()
+
+    def inventory_as_of(self, date, product=None, length=None):
+        """Pieces and cost/sell value per (product, length, status) at the end of ``date``"""
+        with self.lock:
+            df = self.history.as_of(date)
+        df = df[df["status"] != VOIDED]
+        if product:
+            df = df[df["product_name"] == product]
+        if length is not None:
+            df = df[df["length_m"] == int(length)]
+        return df.reset_index(drop=True)
+
+    def find_customer(self, phone=None, name=None):
+        """Customer record by phone, else by a name only one customer has; None if unknown"""
+        with self.lock:
+            if phone:
+                return self.customers.find_by_phone(phone)
+            if name:
+                matches = self.customers.find_by_name(name)
+                return matches[0] if len(matches) == 1 else None
+            return None
+
+    def product_names(self):
+        with self.lock:
+            return sorted(self.stock["product_name"].dropna().unique().tolist())
+
+    def available_count(self, product, length):
+        with self.lock:
+            df = self.stock
+            return int(((df["product_name"] == product) & (df["length_m"] == length) &
+                        (df["status"] == "IN_STOCK")).sum())
+
+    def availability(self, product=None, length=None):
+        """IN_STOCK piece counts and current sell price per (product, length)"""
+        with self.lock:
+            df = self.stock[self.stock["status"] == "IN_STOCK"]
+            if product:
+                df = df[df["product_name"] == product]
+            if length is not None:
+                df = df[df["length_m"] == int(length)]
+            grouped = df.groupby(["product_name", "length_m"]).agg(
+                available=("piece_id", "size"), seller_price=("seller_price", "first"))
+
+        return [{"product_name": name, "length_m": int(length_m), "available": int(row["available"]),
+                 "seller_price": float(row["seller_price"])}
+                for (name, length_m), row in grouped.iterrows()]
+
+    def next_price(self, product, length):
+        """Sell price of the piece the current strategy would allocate next"""
+        with self.lock:
+            row = self.queues.peek(self.stock, product, int(length))
+            return None if row is None else float(self.stock.at[row, "seller_price"])
+
+    def get_order(self, order_id):
+        with self.lock:
+            return self.orders[self.orders["order_id"] == order_id].copy()
+
+    def add_stock(self, product, length, pcs, unit_cost, seller_price, save=True):
+        """Add ``pcs`` new IN_STOCK pieces and return their piece ids"""
+        length = int(length)
+        pcs = int(pcs)
+        if pcs <= 0:
+            raise ValueError("PCS must be a positive number")
+
+        with self.lock:
+            date_added = pd.Timestamp(datetime.now().replace(microsecond=0))
+            start = len(self.stock)
+            rows = []
+            for i in range(pcs):
+                piece_id = f"{product}_{length}m_{start + i + 1}"
+                rows.append([piece_id, product, length, date_added, seller_price, unit_cost,
+                             seller_price - unit_cost, "IN_STOCK", pd.NaT, None])
+
+            new_df = pd.DataFrame(rows, columns=STOCK_COLUMNS)
+            self.stock = pd.concat([self.stock, new_df], ignore_index=True)
+            self.queues.push(self.stock, self.stock.index[start:])
+            self.history.apply(None, new_df)
+            # Undoing the addition voids the new pieces
+            self._record(f"Add {pcs} pcs of {product} ({length}m)",
+                         new_df[STOCK_FIELDS].assign(status=VOIDED).set_axis(self.stock.index[start:]))
+            self.version += 1
+
+        if save:
+            self.save()
+        return new_df["piece_id"].tolist()
+
+    def remove_pieces(self, piece_ids, save=True):
+        """Mark pieces as REMOVED instead of actually deleting them"""
+        with self.lock:
+            mask = self.stock["piece_id"].isin(piece_ids)
+            before = self.stock[mask].copy()
+            self.stock.loc[mask, "status"] = "REMOVED"
+            self._changed_stock.update(before.index.tolist())
+            self.history.apply(before, self.stock[mask])
+            removed = int(mask.sum())
+            if removed:
+                self._record(f"Remove {removed} piece(s)", before[STOCK_FIELDS])
+            self.version += 1
+
+        if save:
+            self.save()
+        return removed
+
+    def place_order(self, customer, items, save=True):
+        """Allocate IN_STOCK pieces for every cart line and record the order.
+
+        ``customer`` holds name/address/phone1/phone2/city and ``items`` is a
+        list of ``{"product", "length", "qty", "price"}`` dicts; ``price`` is
+        optional and defaults to the sell price of the first available piece.
+        Nothing is changed if any line cannot be filled.
+        """
+        order_id, error = self.place_orders([(customer, items)], save=save)[0]
+        if error is not None:
+            raise error
+        return order_id
+
+    def place_orders(self, orders, save=True):
+        """Allocate a batch of ``(customer, items)`` orders in one pass.
+
+        Returns one ``(order_id, error)`` pair per order, in order; a failed
+        order leaves the stock untouched and does not affect the others.
+        Pieces for the whole batch are picked from the queues first, then
+        marked SOLD with one update of the stock frame, and the batch is
+        written with a single ``save()``.
+        """
+        with self.lock:
+            now = datetime.now()
+            order_date = pd.Timestamp(now.replace(microsecond=0))
+            order_ids = np.array(self.order_ids.next_ids(len(orders), now), dtype=object)
+            details = [self._customer_details(customer) for customer, _ in orders]
+            errors = {position: OrderError("Customer details are required")
+                      for position, found in enumerate(details) if found is None}
+            valid = np.array([position for position in range(len(orders)) if position not in errors], dtype=int)
+            try:
+                lines, picks, rejected = allocate_orders(self.stock, [orders[position][1] for position in valid],
+                                                         self.queues)
+            except Exception:
+                # Nothing is marked SOLD yet; put the pieces popped so far back in the queues
+                self.queues.rebuild(self.stock)
+                raise
+            errors.update((int(valid[position]), OrderError(message)) for position, message in rejected.items())
+            results = [(None, errors[position]) if position in errors else (order_ids[position], None)
+                       for position in range(len(orders))]
+
+            placed = [order_id for order_id, error in results if error is None]
+            if placed:
+                customer_ids = {position: self.customers.resolve(details[position])
+                                for position in valid.tolist() if position not in errors}
+                line_order = valid[lines["order"].to_numpy()]
+                sold = pd.DataFrame({"status": "SOLD", "sold_date": order_date,
+                                     "order_id": order_ids[valid[picks["order"].to_numpy()]],
+                                     "seller_price": picks["price"].to_numpy(),
+                                     "profit": picks["profit"].to_numpy()}, index=picks["row"].to_numpy())
+                stock_before = self.stock.loc[sold.index, STOCK_FIELDS].copy()
+                self._set_fields(sold, self.orders.loc[[], ORDER_FIELDS])
+
+                order_rows = lines.rename(columns={"product_name": "item_name"}).assign(
+                    order_id=order_ids[line_order], order_date=order_date,
+                    customer_id=[customer_ids[position] for position in line_order.tolist()], status="ACTIVE",
+                    **{col: [details[position][col] for position in line_order.tolist()] for col in CUSTOMER_DETAILS})
+                start = len(self.orders)
+                self.orders = pd.concat([self.orders, order_rows[ORDER_COLUMNS]], ignore_index=True)
+                self._dirty_partitions |= self._index_orders(start)
+                # Undoing the orders voids their lines and puts the pieces back as they were
+                label = f"Place order {placed[0]}" if len(placed) == 1 else f"Place {len(placed)} orders"
+                self._record(label, stock_before, self.orders.iloc[start:][ORDER_FIELDS].assign(status=VOIDED))
+
+        if save and placed:
+            self.save()
+        return results
+
+    @staticmethod
+    def _customer_details(customer):
+        """An order's customer as stripped CUSTOMER_DETAILS, or None if a required detail is missing"""
+        details = {col: str(customer.get(key) or "").strip()
+                   for col, key in zip(CUSTOMER_DETAILS, ("name", "address", "phone1", "phone2", "city"))}
+        required = ("customer_name", "address", "phone1", "city")
+        return details if all(details[col] for col in required) else None
+
+    def process_order_action(self, order_id, action, save=True):
+        """Cancel or return an order and put all of its pieces back in stock"""
+        if action not in ORDER_ACTIONS:
+            raise OrderError(f"Unknown order action: {action}")
+
+        with self.lock:
+            order_mask = self.orders["order_id"] == order_id
+            if not order_mask.any():
+                raise OrderError(f"Order {order_id} not found")
+
+            current = self.orders.loc[order_mask, "status"]
+            if current.isin(ORDER_ACTIONS + (VOIDED,)).all():
+                raise OrderError(f"This order has already been {current.iloc[0].lower()}")
+
+            order_before = self.orders.loc[order_mask, ORDER_FIELDS].copy()
+            self.orders.loc[order_mask, "status"] = action
+            self._dirty_partitions.update(partition_keys(self.orders.loc[order_mask, "order_date"]).tolist())
+            self.order_edits += 1
+
+            # Update stock status back to IN_STOCK for ALL pieces in this order
+            piece_ids = []
+            for piece_ids_str in self.orders.loc[order_mask, "allocated_piece_ids"].dropna():
+                piece_ids.extend(str(piece_ids_str).split(','))
+
+            piece_mask = self.stock["piece_id"].isin(piece_ids)
+            before = self.stock[piece_mask].copy()
+            self._changed_stock.update(before.index.tolist())
+            self.stock.loc[piece_mask, "status"] = "IN_STOCK"
+            self.stock.loc[piece_mask, "sold_date"] = pd.NaT
+            self.stock.loc[piece_mask, "order_id"] = None
+            self.queues.push(self.stock, self.stock.index[piece_mask])
+            self.history.apply(before, self.stock[piece_mask])
+            self._record(f"{'Cancel' if action == 'CANCELLED' else 'Return'} order {order_id}", before[STOCK_FIELDS],
+                         order_before)
+            self.version += 1
+
+        if save:
+            self.save()
+
+    def summary_metrics(self):
+        """Headline stock and order figures over the whole store"""
+        with self.lock:
+            stock = self.stock
+            orders = self.orders
+            status_counts = stock["status"].value_counts()
+            active = orders[orders["status"] == "ACTIVE"]
+            order_counts = orders.drop_duplicates("order_id")["status"].value_counts()
+
+            return {
+                "in_stock": int(status_counts.get("IN_STOCK", 0)),
+                "sold": int(status_counts.get("SOLD", 0)),
+                "removed": int(status_counts.get("REMOVED", 0)),
+                "inventory_value": float(stock.loc[stock["status"] == "IN_STOCK", "seller_price"].sum()),
+                "inventory_cost": float(stock.loc[stock["status"] == "IN_STOCK", "unit_cost"].sum()),
+                "orders": int(order_counts.drop(VOIDED, errors="ignore").sum()),
+                "active_orders": int(order_counts.get("ACTIVE", 0)),
+                "cancelled_orders": int(order_counts.get("CANCELLED", 0)),
+                "returned_orders": int(order_counts.get("RETURNED", 0)),
+                "revenue": float(active["total_seller_price"].sum()),
+                "order_cost": float(active["total_unit_cost"].sum()),
+                "profit": float(active["profit_total"].sum()),
+            }
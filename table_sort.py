@@ -0,0 +1,45 @@
+"""Column sorting for the stock and orders tables.
+
+Each column of the full in-memory stock/orders frame is argsorted once per
+data version and the permutation is cached.  A filtered view is put in
+column order without sorting it again: the cached permutation is walked and
+only the rows present in the view are kept, which is a linear pass.  Frames
+from the store keep the store's row positions as their index, so a view's
+index says which rows it holds.
+"""
+import numpy as np
+import pandas as pd
+
+
+def column_order(values):
+    """``(positions, valid)``: stable ascending argsort of ``values`` with missing values last.
+
+    Text is compared case-insensitively.  ``valid`` is the number of
+    non-missing values, which lead the permutation.
+    """
+    values = pd.Series(values).reset_index(drop=True)
+    if values.dtype == object:
+        values = values.where(values.isna(), values.astype(str).str.casefold())
+    positions = values.sort_values(kind="stable", na_position="last").index.to_numpy()
+    return positions, int(values.notna().sum())
+
+
+def sorted_positions(order, descending=False):
+    """Row positions in ascending or descending order, missing values last either way"""
+    positions, valid = order
+    if not descending:
+        return positions
+    return np.concatenate([positions[:valid][::-1], positions[valid:]])
+
+
+def sort_view(view, order, descending=False, limit=None):
+    """Rows of ``view`` in the order of a cached ``column_order``, optionally only the first ``limit``"""
+    positions = sorted_positions(order, descending)
+    if len(view) < len(positions):
+        present = np.zeros(len(positions), dtype=bool)
+        rows = view.index.to_numpy()
+        present[rows[rows < len(present)]] = True
+        positions = positions[present[positions]]
+    if limit is not None:
+        positions = positions[:limit]
+    return view.loc[positions]
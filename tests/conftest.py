@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the top level of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store import DataStore, init_files  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """An empty data directory, made the working directory like the app's own"""
+    monkeypatch.chdir(tmp_path)
+    init_files()
+    return tmp_path
+
+
+@pytest.fixture
+def store(data_dir):
+    store = DataStore()
+    yield store
+    store.close()
+
+
+
+@pytest.fixture
+def customer():
+    """Shipping details of a typical customer"""
+    return {"name": "Nimal Perera", "address": "12 Lake Rd", "phone1": "0771234567", "phone2": "", "city": "Kandy"}
+
+
+@pytest.fixture
+def sell(customer):
+    """``sell(store, qty, product, length, price=None, **details)`` places a one-line order; returns its id.
+
+    ``details`` override the customer's shipping details.
+    """
+    def sell(store, qty=1, product="Strip", length=5, price=None, **details):
+        item = {"product": product, "length": length, "qty": qty}
+        if price is not None:
+            item["price"] = price
+        return store.place_order(dict(customer, **details), [item])
+    return sell
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from aging import AGE_LABELS, TOTAL, aging_report, bucket
+
+NOW = pd.Timestamp("2026-06-30 12:00")
+
+
+def _piece(product, length, added_days_ago, status="IN_STOCK", sold_days_ago=None, unit_cost=100.0):
+    return {"product_name": product, "length_m": float(length), "unit_cost": unit_cost, "status": status,
+            "date_added": NOW - pd.Timedelta(days=added_days_ago),
+            "sold_date": pd.NaT if sold_days_ago is None else NOW - pd.Timedelta(days=sold_days_ago)}
+
+
+def test_bucket_edges_are_the_first_day_of_each_bucket():
+    assert bucket(np.array([-3, 0, 30, 31, 90, 91, 365, 366])).tolist() == [0, 0, 0, 1, 2, 3, 4, 5]
+
+
+def test_reports_bucket_pieces_per_sku_with_a_totals_line():
+    stock = pd.DataFrame([_piece("Strip", 5, 10), _piece("Strip", 5, 45, unit_cost=80.0),
+                          _piece("Strip", 5, 400), _piece("Driver", 1, 20, unit_cost=500.0),
+                          _piece("Strip", 5, 50, "SOLD", sold_days_ago=40),
+                          _piece("Driver", 1, 100, "REMOVED")])
+    report = aging_report(stock, NOW)
+
+    pieces = report["Pieces in Stock"].set_index("product_name")
+    assert pieces.loc["Strip", [AGE_LABELS[0], AGE_LABELS[1], AGE_LABELS[-1], TOTAL]].tolist() == [1, 1, 1, 3]
+    assert (pieces.loc["Strip", "Avg Days"], pieces.loc["Strip", "Max Days"]) == (455 / 3, 400)
+    assert pieces.loc["Driver", TOTAL] == 1  # REMOVED pieces are not on the shelf
+    assert pieces.loc[TOTAL, [TOTAL, "Avg Days"]].tolist() == [4, 475 / 4]
+
+    capital = report["Capital Tied Up"].set_index("product_name")
+    assert capital.loc["Strip", [AGE_LABELS[0], AGE_LABELS[1], TOTAL]].tolist() == [100, 80, 280]
+    assert capital.loc[TOTAL, TOTAL] == 780
+
+    to_sell = report["Time to Sell"]
+    assert to_sell["product_name"].tolist() == ["Strip", TOTAL]
+    assert to_sell.loc[0, [AGE_LABELS[0], "Avg Days"]].tolist() == [1, 10]
+
+
+def test_empty_stock_gives_zero_totals():
+    stock = pd.DataFrame([_piece("Strip", 5, 10)]).iloc[:0]
+    for table in aging_report(stock, NOW).values():
+        assert table["product_name"].tolist() == [TOTAL] and table.loc[0, TOTAL] == 0
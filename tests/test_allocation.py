@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from allocation import StockQueues, allocate_orders
+
+
+def _stock():
+    # Rows 0-3: same SKU, added on different days at different costs; row 4 has no cost
+    return pd.DataFrame({
+        "piece_id": ["P0", "P1", "P2", "P3", "P4"],
+        "product_name": "Strip",
+        "length_m": 5,
+        "date_added": pd.to_datetime(["2026-03-01", "2026-01-01", "2026-02-01", "2026-04-01", "2026-05-01"]),
+        "seller_price": 150.0,
+        "unit_cost": [120.0, 100.0, 140.0, 90.0, np.nan],
+        "status": ["IN_STOCK", "IN_STOCK", "IN_STOCK", "SOLD", "IN_STOCK"],
+    })
+
+
+def _picked(strategy, qty):
+    stock = _stock()
+    lines, picks, errors = allocate_orders(stock, [[{"product": "Strip", "length": 5, "qty": qty}]],
+                                           StockQueues(stock, strategy))
+    assert errors == {}
+    return picks["piece_id"].tolist()
+
+
+@pytest.mark.parametrize("strategy, expected", [
+    ("FIFO", ["P1", "P2", "P0", "P4"]),
+    ("LOWEST_COST", ["P1", "P0", "P2", "P4"]),
+    ("HIGHEST_COST", ["P2", "P0", "P1", "P4"]),
+])
+def test_pieces_are_taken_in_strategy_order(strategy, expected):
+    assert _picked(strategy, 4) == expected
+
+
+def test_earlier_cart_wins_and_short_cart_takes_nothing():
+    stock = _stock()
+    queues = StockQueues(stock, "FIFO")
+    carts = [[{"product": "Strip", "length": 5, "qty": 3}],
+             [{"product": "Strip", "length": 5, "qty": 2}],
+             [{"product": "Strip", "length": 5, "qty": 1}]]
+    lines, picks, errors = allocate_orders(stock, carts, queues)
+    assert list(errors) == [1]
+    assert picks.groupby("order")["piece_id"].agg(list).to_dict() == {0: ["P1", "P2", "P0"], 2: ["P4"]}
+    assert lines["allocated_piece_ids"].tolist() == ["P1,P2,P0", "P4"]
+
+
+def test_line_totals_use_the_picked_cost_layers():
+    stock = _stock()
+    lines, picks, errors = allocate_orders(stock, [[{"product": "Strip", "length": 5, "qty": 2, "price": 200}]],
+                                           StockQueues(stock, "LOWEST_COST"))
+    line = lines.iloc[0]
+    assert (line["total_unit_cost"], line["total_seller_price"], line["profit_total"]) == (220.0, 400.0, 180.0)
+    assert picks["profit"].tolist() == [100.0, 80.0]
+
+
+def test_cancelled_pieces_are_allocated_again_in_order(store, sell):
+    first = store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    order_id = sell(store, 2)
+    assert store.get_order(order_id)["allocated_piece_ids"].iloc[0] == ",".join(first[:2])
+
+    store.process_order_action(order_id, "CANCELLED")
+    order_id = sell(store, 1)
+    assert store.get_order(order_id)["allocated_piece_ids"].iloc[0] == first[0]
+
+
+@pytest.mark.parametrize("length", ["5.7", 5.5, "abc", None])
+def test_cart_with_a_non_integral_length_is_rejected(length):
+    stock = _stock()
+    lines, picks, errors = allocate_orders(stock, [[{"product": "Strip", "length": length, "qty": 1}]],
+                                           StockQueues(stock, "FIFO"))
+    assert list(errors) == [0] and "Invalid length" in errors[0]
+    assert lines.empty and picks.empty
+
+
+def test_store_rejects_a_fractional_length_without_selling(store, sell):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    with pytest.raises(ValueError, match="Invalid length"):
+        sell(store, 1, length="5.7")
+    assert store.available_count("Strip", 5) == 2
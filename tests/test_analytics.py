@@ -0,0 +1,56 @@
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from analytics import CustomerAnalytics, aggregate, merge, score
+
+
+def _orders():
+    return pd.DataFrame({
+        "order_id": ["O1", "O1", "O2", "O3", "O4", "O5"],
+        "order_date": pd.to_datetime(["2026-01-05", "2026-01-05", "2026-03-01", "2026-03-02", "2025-06-01",
+                                      "2026-03-03"]),
+        "customer_id": ["C1", "C1", "C1", "C2", "C3", "C2"],
+        "total_seller_price": [100.0, 50.0, 200.0, 80.0, 500.0, 40.0],
+        "profit_total": [20.0, 10.0, 40.0, 16.0, 100.0, 8.0],
+        "qty": [1, 1, 2, 1, 5, 1],
+        "status": ["ACTIVE", "ACTIVE", "ACTIVE", "ACTIVE", "ACTIVE", "CANCELLED"],
+    })
+
+
+def test_aggregates_count_only_active_lines():
+    totals = aggregate(_orders())
+    assert totals.loc["C1", ["orders", "revenue", "pieces"]].tolist() == [2, 350.0, 4]
+    assert totals.loc["C2", ["orders", "revenue"]].tolist() == [1, 80.0]
+
+
+def test_merging_partial_aggregates_matches_one_pass():
+    orders = _orders()
+    merged = merge(aggregate(orders.iloc[:3]), aggregate(orders.iloc[3:]))
+    assert_frame_equal(merged.sort_index(), aggregate(orders), check_dtype=False)
+
+
+def test_scores_and_segments():
+    table = score(aggregate(_orders()), now="2026-03-10")
+    assert table.loc["C1", "recency_days"] == 9
+    assert table.loc["C1", "avg_order_value"] == 175.0
+    # C3 bought most but longest ago
+    assert table["r_score"].idxmin() == "C3" and table["m_score"].idxmax() == "C3"
+    assert table.loc["C3", "segment"] == "At Risk"
+    assert table[["r_score", "f_score", "m_score"]].isin(range(1, 6)).all().all()
+
+
+def test_table_follows_new_and_cancelled_orders(store, sell):
+    store.add_stock("Strip", 5, 4, 100.0, 150.0)
+    analytics = CustomerAnalytics(store)
+    sell(store)
+    first = analytics.table()
+    assert analytics.table() is first  # Unchanged data comes from the cache
+
+    order_id = sell(store, 2)
+    sell(store, name="Kamal Silva", phone1="0719876543")
+    table = analytics.table().set_index("customer_name")
+    assert table.loc["Nimal Perera", ["orders", "revenue"]].tolist() == [2, 450.0]
+    assert table.loc["Kamal Silva", "orders"] == 1
+
+    store.process_order_action(order_id, "CANCELLED")
+    assert analytics.table().set_index("customer_name").loc["Nimal Perera", "revenue"] == 150.0
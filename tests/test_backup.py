@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+from pandas.testing import assert_frame_equal
+
+from backup import BackupSet
+from store import DataStore
+
+@pytest.fixture
+def filled(store, sell):
+    store.add_stock("Strip", 5, 4, 100.0, 150.0)
+    store.add_stock("Driver", 1, 2, 400.0, 650.0)
+    sell(store, 2)
+    sell(store, 1, "Driver", 1, address="3 Hill St")
+    return store
+
+
+def _canonical(df):
+    # Read back from files, dates can have another resolution and blank text (None, "") comes back as NaN
+    dates = [col for col in df.columns if is_datetime64_any_dtype(df[col])]
+    text = [col for col in df.columns if col not in dates and not is_numeric_dtype(df[col])]
+    df = df.astype(dict.fromkeys(dates, "datetime64[ns]")).astype(dict.fromkeys(text, object))
+    df[text] = df[text].where(df[text].notna() & (df[text] != ""), np.nan)
+    return df
+
+
+def _same(left, right):
+    assert_frame_equal(_canonical(left), _canonical(right), check_dtype=False)
+
+
+def _assert_data(store, stock, orders, customers):
+    _same(store.stock_frame(), stock)
+    _same(store.orders_frame(), orders)
+    _same(store.customers.frame(), customers)
+
+
+def test_restore_round_trip(filled):
+    store = filled
+    backups = BackupSet(store)
+    name = backups.snapshot()
+    saved = store.stock_frame(), store.orders_frame(), store.customers.frame()
+
+    store.add_stock("Strip", 5, 10, 90.0, 140.0)
+    store.process_order_action(saved[1]["order_id"].iloc[0], "CANCELLED")
+    backups.restore(name)
+    _assert_data(store, *saved)
+
+    store.close()
+    reopened = DataStore()
+    try:
+        _assert_data(reopened, *saved)
+    finally:
+        reopened.close()
+
+
+def test_unchanged_data_adds_no_snapshot(filled):
+    store = filled
+    backups = BackupSet(store)
+    first = backups.snapshot()
+    assert backups.snapshot() is None
+    store.add_stock("Strip", 5, 1, 100.0, 150.0)
+    second = backups.snapshot()
+    assert backups.snapshots() == [second, first]
+    assert backups.manifest(second)["tables"]["orders"] == backups.manifest(first)["tables"]["orders"]
+
+
+def test_prune_keeps_the_latest_snapshot(filled):
+    backups = BackupSet(filled)
+    backups.snapshot()
+    assert backups.prune(now=datetime.now() + timedelta(days=400)) == 0
+    assert len(backups.snapshots()) == 1
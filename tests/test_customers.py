@@ -0,0 +1,64 @@
+import pytest
+
+from customers import CustomerBook, normalize_phone
+from store import DataStore
+
+
+@pytest.mark.parametrize("raw", ["0771234567", "077 123 4567", "+94 77 123 4567", 771234567, 771234567.0])
+def test_phone_numbers_are_normalized(raw):
+    assert normalize_phone(raw) == "0771234567"
+
+
+def _details(**changes):
+    details = {"customer_name": "Nimal Perera", "address": "12 Lake Rd", "phone1": "0771234567", "phone2": "",
+               "city": "Kandy"}
+    details.update(changes)
+    return details
+
+
+def test_same_phone_resolves_to_the_same_customer(tmp_path):
+    book = CustomerBook(tmp_path / "customers.xlsx")
+    first = book.resolve(_details())
+    assert book.resolve(_details(phone1="+94 77 123 4567", address="3 Hill St", city="")) == first
+    # New details are kept and blank ones leave the old value
+    assert book.get(first)["address"] == "3 Hill St" and book.get(first)["city"] == "Kandy"
+    assert book.resolve(_details(phone1="0719876543", phone2="0771234567")) == first
+    assert book.find_by_phone("0719876543")["customer_id"] == first
+
+
+def test_name_matches_only_without_phones_and_when_unique(tmp_path):
+    book = CustomerBook(tmp_path / "customers.xlsx")
+    nimal = book.resolve(_details())
+    assert book.resolve(_details(customer_name="  nimal  PERERA ", phone1="")) == nimal
+    other = book.resolve(_details(phone1="0719876543"))
+    assert other != nimal
+    # Two customers now share the name, so a name alone no longer picks one
+    assert book.resolve(_details(phone1="")) not in (nimal, other)
+    assert book.resolve(dict.fromkeys(_details(), "")) is None
+
+
+def test_customers_are_saved_with_their_leading_zeros(tmp_path):
+    path = tmp_path / "customers.xlsx"
+    book = CustomerBook(path)
+    customer_id = book.resolve(_details())
+    book.frame().to_excel(path, index=False)
+    reloaded = CustomerBook(path)
+    assert reloaded.find_by_phone("771234567") == dict(_details(), customer_id=customer_id)
+
+
+def test_autofill_finds_the_latest_details_and_keeps_old_orders(store, sell):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    first = sell(store)
+    second = sell(store, address="3 Hill St")
+    assert store.get_order(first)["customer_id"].iloc[0] == store.get_order(second)["customer_id"].iloc[0]
+    store.close()
+
+    reopened = DataStore()
+    try:
+        assert reopened.find_customer(phone="077-123-4567")["address"] == "3 Hill St"
+        assert reopened.find_customer(name="nimal perera")["phone1"] == "0771234567"
+        assert reopened.find_customer(phone="0700000000") is None
+        assert reopened.get_order(first)["address"].iloc[0] == "12 Lake Rd"
+        assert reopened.get_order(first)["phone1"].iloc[0] == "0771234567"
+    finally:
+        reopened.close()
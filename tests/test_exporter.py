@@ -0,0 +1,48 @@
+import queue
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exporter import export_frame, export_in_background
+
+
+def _frame():
+    return pd.DataFrame({
+        "piece_id": [f"P{i}" for i in range(5)],
+        "date_added": pd.to_datetime(["2026-01-01 09:30:00"] * 5),
+        "seller_price": [150.0, np.nan, 150.0, 175.5, 150.0],
+        "order_id": [None, "ORD_20260101_000001", None, None, None],
+    })
+
+
+@pytest.mark.parametrize("ext", [".csv", ".xlsx"])
+def test_chunked_export_writes_every_row_once(tmp_path, ext):
+    path = tmp_path / f"view{ext}"
+    export_frame(_frame(), str(path), chunk_rows=2)
+    back = pd.read_csv(path) if ext == ".csv" else pd.read_excel(path)
+    assert back["piece_id"].tolist() == [f"P{i}" for i in range(5)]
+    assert back["seller_price"].isna().tolist() == [False, True, False, False, False]
+    assert back["order_id"].notna().sum() == 1
+    assert pd.to_datetime(back["date_added"]).eq(pd.Timestamp("2026-01-01 09:30:00")).all()
+
+
+def test_parquet_export_keeps_column_types(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "view.parquet"
+    df = _frame()
+    export_frame(df, str(path), chunk_rows=2)
+    pd.testing.assert_frame_equal(pd.read_parquet(path), df, check_dtype=False)
+
+
+def test_unknown_format_is_refused(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        export_frame(_frame(), str(tmp_path / "view.txt"))
+
+
+def test_background_export_reports_the_outcome(tmp_path):
+    done = queue.Queue()
+    export_in_background(_frame(), str(tmp_path / "view.csv"), done.put).join()
+    assert done.get_nowait() is None
+    export_in_background(_frame(), str(tmp_path / "view.doc"), done.put).join()
+    assert isinstance(done.get_nowait(), ValueError)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from forecast import OK, REORDER_NOW, WINDOW_DAYS, DemandForecast, daily_demand, forecast
+
+NOW = pd.Timestamp("2026-06-30 12:00")
+
+
+def _daily(product, length, per_day, days):
+    index = pd.MultiIndex.from_tuples([(product, length, NOW.normalize() - pd.Timedelta(days=age))
+                                       for age in range(days)], names=["product_name", "length_m", "day"])
+    return pd.Series(float(per_day), index=index)
+
+
+def _on_hand(counts):
+    return pd.Series(counts, index=pd.MultiIndex.from_tuples(counts, names=["product_name", "length_m"]))
+
+
+def test_steady_demand_sets_rate_reorder_point_and_quantity():
+    table = forecast(_daily("Strip", 5, 1.5, WINDOW_DAYS), _on_hand({("Strip", 5): 10}), NOW).iloc[0]
+    assert table["smoothed_daily"] == pytest.approx(1.5) and table["avg_daily"] == pytest.approx(1.5)
+    assert table["days_of_cover"] == pytest.approx(10 / 1.5)
+    assert table["reorder_point"] == 11  # 7 days of lead time, no spread so no safety stock
+    assert table["order_qty"] == 22  # Lead time plus review period, less what is on hand
+    assert table["status"] == REORDER_NOW
+
+
+def test_skus_without_demand_are_ok_and_listed_last():
+    daily = pd.concat([_daily("Strip", 5, 1.5, 30), _daily("Old", 1, 9, 1).rename(
+        lambda day: day - pd.Timedelta(days=WINDOW_DAYS), level="day")])
+    table = forecast(daily, _on_hand({("Strip", 5): 10, ("Driver", 1): 4, ("Old", 1): 3}), NOW)
+    assert table["product_name"].tolist()[0] == "Strip"
+    idle = table.set_index("product_name").loc[["Driver", "Old"]]
+    assert (idle["status"] == OK).all() and (idle["order_qty"] == 0).all()
+    assert np.isinf(idle.loc["Driver", "days_of_cover"])
+    assert idle.loc["Old", "sold_window"] == 0  # Sold before the window
+
+
+def test_daily_demand_counts_active_lines_per_day():
+    orders = pd.DataFrame({"item_name": ["Strip"] * 3, "length_m": [5.0] * 3, "qty": [2, 1, 4],
+                           "order_date": pd.to_datetime(["2026-06-01 09:00", "2026-06-01 17:00", "2026-06-02 10:00"]),
+                           "status": ["ACTIVE", "ACTIVE", "CANCELLED"]})
+    assert daily_demand(orders).tolist() == [3.0]
+
+
+def test_table_matches_a_fresh_forecast_after_every_change(store, sell):
+    store.add_stock("Strip", 5, 6, 100.0, 150.0)
+    cached = DemandForecast(store)
+    cached.table()
+    sell(store, 2)
+    order_id = sell(store, 1)
+    assert_frame_equal(cached.table(), DemandForecast(store).table())
+    store.process_order_action(order_id, "CANCELLED")
+    table = cached.table()
+    assert_frame_equal(table, DemandForecast(store).table())
+    assert table.loc[0, ["in_stock", "sold_window"]].tolist() == [4, 2.0]
@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from importer import import_workbook
+from store import DataStore, write_frame
+
+
+def _legacy_stock(path, count=12):
+    rows = [{"piece_id": f"Strip_5m_{i}", "product_name": "Strip", "length_m": 5, "date_added": "2024-01-02 10:00:00",
+             "seller_price": 150, "unit_cost": 100, "status": "in_stock"} for i in range(count)]
+    rows.append(dict(rows[0]))  # Duplicate piece id
+    rows.append(dict(rows[1], piece_id="Bad_1", status="LOST"))  # Unknown status
+    rows.append(dict(rows[1], piece_id=None))  # No piece id
+    write_frame(pd.DataFrame(rows), path)
+
+
+def test_stock_is_imported_in_chunks_and_bad_rows_rejected(store, tmp_path):
+    path = tmp_path / "legacy_stock.xlsx"
+    _legacy_stock(path)
+    progress = []
+    counts = import_workbook(store, path, "stock", chunk_size=5, progress=lambda done, total: progress.append(done))
+
+    assert counts == {"read": 15, "imported": 12, "rejected": 2, "duplicates": 1}
+    assert progress == [5, 10, 15]
+    assert store.available_count("Strip", 5) == 12
+    # Profit missing from the legacy file is rebuilt
+    assert store.stock["profit"].tolist() == [50.0] * 12
+
+
+def test_importing_the_same_file_twice_adds_nothing(store, tmp_path):
+    path = tmp_path / "legacy_stock.xlsx"
+    _legacy_stock(path)
+    import_workbook(store, path, "stock", chunk_size=4)
+    again = import_workbook(store, path, "stock", chunk_size=4)
+    assert again["imported"] == 0 and again["duplicates"] == 13
+    assert len(store.stock) == 12
+
+
+def test_imported_orders_are_saved_and_their_ids_never_reissued(store, tmp_path, sell):
+    today = datetime.now()
+    order_id = f"ORD_{today:%Y%m%d}_000050"
+    path = tmp_path / "legacy_orders.xlsx"
+    write_frame(pd.DataFrame([{"order_id": order_id, "order_date": today, "customer_name": "Nimal Perera",
+                               "phone1": "0771234567", "item_name": "Strip", "length_m": 5, "qty": 1,
+                               "total_unit_cost": 100, "total_seller_price": 150, "status": "ACTIVE"}]), path)
+    assert import_workbook(store, path, "orders")["imported"] == 1
+
+    store.add_stock("Strip", 5, 1, 100.0, 150.0)
+    assert sell(store) == f"ORD_{today:%Y%m%d}_000051"
+    store.close()
+    reopened = DataStore()
+    try:
+        assert order_id in reopened.orders["order_id"].tolist()
+    finally:
+        reopened.close()
+
+
+def test_workbook_of_the_wrong_kind_is_refused(store, tmp_path):
+    path = tmp_path / "legacy_stock.xlsx"
+    _legacy_stock(path)
+    with pytest.raises(ValueError, match="not a orders workbook"):
+        import_workbook(store, path, "orders")
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from intake import OrderIntake
+from store import DataStore
+
+@pytest.fixture
+def order(customer):
+    """Cart ``i``: one Strip piece for a customer of its own"""
+    return lambda i: (dict(customer, phone1=f"07700{i:05d}"), [{"product": "Strip", "length": 5, "qty": 1}])
+
+
+def test_concurrent_orders_are_saved_once_each(store, order):
+    store.add_stock("Strip", 5, 40, 100.0, 150.0)
+    intake = OrderIntake(store, window=0.01, max_batch=7)
+    results = []
+
+    def client(first):
+        results.extend(intake.place_orders([order(i) for i in range(first, first + 10)]))
+
+    clients = [threading.Thread(target=client, args=(first,)) for first in range(0, 50, 10)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    intake.close()
+    store.close()
+
+    placed = [order_id for order_id, error in results if error is None]
+    assert len(placed) == 40 and len(set(placed)) == 40
+    assert sum(error is not None for _, error in results) == 10
+
+    reopened = DataStore()
+    try:
+        assert sorted(reopened.orders["order_id"]) == sorted(placed)
+        sold = reopened.stock[reopened.stock["status"] == "SOLD"]
+        assert sorted(sold["order_id"]) == sorted(placed)
+    finally:
+        reopened.close()
+
+
+def test_failed_save_keeps_the_order_and_retries(store, order, monkeypatch):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    save = store.save
+    failures = []
+
+    def flaky_save(**kwargs):
+        if not failures:
+            failures.append(1)
+            raise OSError("disk full")
+        save(**kwargs)
+
+    monkeypatch.setattr(store, "save", flaky_save)
+    intake = OrderIntake(store, retry_interval=0.01)
+    order_id = intake.submit_order(*order(1)).result(5)
+    intake.close()
+    assert intake.save_error is None
+    store.close()
+
+    reopened = DataStore()
+    try:
+        assert reopened.orders["order_id"].tolist() == [order_id]
+        assert reopened.available_count("Strip", 5) == 1
+    finally:
+        reopened.close()
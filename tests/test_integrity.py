@@ -0,0 +1,77 @@
+import pandas as pd
+
+from integrity import PROBLEMS, check
+
+
+def _piece(store, piece_id):
+    return store.stock.index[store.stock["piece_id"] == piece_id][0]
+
+
+def _sold(store, piece_id, order_id):
+    row = _piece(store, piece_id)
+    store.stock.loc[row, ["status", "sold_date", "order_id"]] = ["SOLD", pd.Timestamp.now().floor("s"), order_id]
+
+
+def _found(report):
+    return {(problem, piece_id) for problem, piece_id in zip(report["problem"], report["piece_id"])}
+
+
+def test_check_reports_every_problem_class(store, sell):
+    store.add_stock("Strip", 5, 10, 100.0, 150.0)
+    order_ids = [sell(store) for _ in range(5)]
+    stock, orders = store.stock, store.orders
+
+    store.stock = stock = pd.concat([stock, stock.iloc[[9]]], ignore_index=True)
+    orders.loc[0, "allocated_piece_ids"] = "Strip_5m_1, Ghost_1"
+    orders.loc[2, "allocated_piece_ids"] = "Strip_5m_2"  # Strip_5m_3 still names this order
+    stock.loc[_piece(store, "Strip_5m_4"), "status"] = "IN_STOCK"
+    stock.loc[_piece(store, "Strip_5m_5"), "order_id"] = order_ids[0]
+    _sold(store, "Strip_5m_6", None)
+    _sold(store, "Strip_5m_7", "ORD_GONE")
+    stock.loc[_piece(store, "Strip_5m_8"), "profit"] = 999.0
+    orders.loc[1, "profit_total"] += 5
+
+    report = check(stock, orders)
+    assert set(report["problem"]) == set(PROBLEMS)
+    assert _found(report) == {
+        ("duplicate_piece", "Strip_5m_10"),
+        ("unknown_piece", "Ghost_1"),
+        ("several_orders", "Strip_5m_2"),
+        ("sold_to_inactive_order", "Strip_5m_3"),
+        ("not_sold", "Strip_5m_4"),
+        ("wrong_order", "Strip_5m_5"),
+        ("sold_without_order", "Strip_5m_6"),
+        ("sold_to_missing_order", "Strip_5m_7"),
+        ("piece_profit", "Strip_5m_8"),
+        ("line_profit", None),
+    }
+    assert (report["problem"] == "duplicate_piece").sum() == 2
+    assert report.loc[report["problem"] == "line_profit", "order_id"].tolist() == [order_ids[1]]
+    assert report.loc[report["problem"] == "several_orders", "order_id"].tolist() == order_ids[1:3]
+
+
+def test_clean_data_has_no_problems(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    sell(store, 2)
+    store.process_order_action(sell(store), "RETURNED")
+    assert check(store.stock, store.orders).empty
+
+
+def test_repair_only_puts_stray_pieces_naming_no_order_back(store, sell):
+    store.add_stock("Strip", 5, 4, 100.0, 150.0)
+    cancelled = sell(store)
+    store.process_order_action(cancelled, "CANCELLED")
+    _sold(store, "Strip_5m_1", cancelled)
+    _sold(store, "Strip_5m_2", None)
+    _sold(store, "Strip_5m_3", "ORD_GONE")
+    before = store.stock.copy()
+
+    report = store.check_integrity(repair=True)
+    assert set(report["problem"]) == {"sold_to_inactive_order", "sold_without_order", "sold_to_missing_order"}
+    changed = (store.stock != before) & ~(store.stock.isna() & before.isna())
+    assert store.stock.loc[changed.any(axis=1), "piece_id"].tolist() == ["Strip_5m_2"]
+    assert store.stock.loc[_piece(store, "Strip_5m_2"), "status"] == "IN_STOCK"
+    assert set(store.check_integrity()["problem"]) == {"sold_to_inactive_order", "sold_to_missing_order"}
+
+    store.undo()
+    assert store.stock.loc[_piece(store, "Strip_5m_2"), "status"] == "SOLD"
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+
+from store import DataStore, write_frame
+
+def _crash(store):
+    """Drop the store without closing it, as a killed process would"""
+    store._dir_lock.close()
+
+
+def _sell_one(store, sell):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    return sell(store)
+
+
+def test_close_folds_the_journal_into_the_workbook(data_dir, sell):
+    store = DataStore()
+    order_id = _sell_one(store, sell)
+    assert os.path.exists(store.journal_file)
+    store.close()
+
+    assert not os.path.exists(store.journal_file)
+    stock = pd.read_excel(store.stock_file)
+    assert stock["status"].tolist() == ["SOLD", "IN_STOCK"]
+    assert stock["order_id"].iloc[0] == order_id
+
+
+def test_journal_left_by_a_crash_is_replayed(data_dir, sell):
+    store = DataStore()
+    order_id = _sell_one(store, sell)
+    _crash(store)
+
+    reopened = DataStore()
+    try:
+        assert reopened.stale_journal is None
+        assert reopened.stock["order_id"].iloc[0] == order_id
+        assert reopened.available_count("Strip", 5) == 1
+    finally:
+        reopened.close()
+
+
+def test_workbook_edited_after_a_crash_is_not_overwritten(data_dir, sell):
+    store = DataStore()
+    _sell_one(store, sell)
+    _crash(store)
+
+    edited = pd.read_excel(store.stock_file).assign(seller_price=175.0)
+    write_frame(edited, store.stock_file)
+    journal_time = os.path.getmtime(store.journal_file)
+    os.utime(store.stock_file, (journal_time + 10, journal_time + 10))
+
+    reopened = DataStore()
+    try:
+        assert os.path.exists(reopened.stale_journal) and not os.path.exists(reopened.journal_file)
+        assert reopened.stock["seller_price"].tolist() == [175.0] * len(edited)
+        assert (reopened.stock["status"] == "SOLD").sum() == 0
+    finally:
+        reopened.close()
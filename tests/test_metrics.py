@@ -0,0 +1,37 @@
+import pytest
+
+from metrics import FIELDS, VIEWS, compute_metrics, format_metrics, profit_percentage
+
+
+def test_margin_and_markup_share_one_profit():
+    assert profit_percentage(50, 200, 150, "margin") == 25
+    assert profit_percentage(50, 200, 150, "markup") == pytest.approx(100 / 3)
+    assert profit_percentage(50, 0, 0) == 0
+
+
+def test_metrics_count_active_orders_and_skip_voided_rows(store, sell):
+    store.add_stock("Strip", 5, 4, 100.0, 150.0)
+    sell(store, 2, price=160.0)
+    store.process_order_action(sell(store, 1), "CANCELLED")
+    store.add_stock("Driver", 1, 3, 500.0, 800.0)
+    store.undo()  # The Driver pieces are voided
+
+    m = compute_metrics(store.stock, store.orders)
+    # Sold pieces are valued at their order price
+    assert (m["total_instock"], m["total_sold"], m["total_cost"], m["seller_value"]) == (2, 2, 400, 620)
+    assert m["profit_margin"] == pytest.approx(2200 / 62) and m["profit_percentage"] == pytest.approx(55)
+    assert (m["total_revenue"], m["total_order_cost"], m["total_order_profit"]) == (320, 200, 120)
+    assert m["order_profit_margin"] == pytest.approx(37.5) and m["order_profit_percentage"] == pytest.approx(60)
+    assert m["inventory_turnover"] == pytest.approx(320 / 620)
+    assert (m["total_orders"], m["active_orders"], m["total_cancelled"]) == (2, 1, 1)
+    assert (m["cancellation_rate"], m["return_rate"], m["success_rate"]) == (50, 0, 50)
+
+
+def test_every_view_field_is_formatted(store):
+    m = compute_metrics(store.stock, store.orders)
+    assert m["total_orders"] == 0 and m["order_profit_margin"] == 0 and m["inventory_turnover"] == 0
+    text = format_metrics(m)
+    for view in VIEWS.values():
+        for field in view["kpis"] + [view["stock_profit"]]:
+            assert field in FIELDS and field in text
+    assert text["success_rate"] == ("100.00%", "darkgreen")
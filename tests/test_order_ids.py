@@ -0,0 +1,69 @@
+import os
+import threading
+from datetime import datetime
+
+from order_ids import OrderIdGenerator
+from store import DataStore
+
+
+def _today(seq):
+    return f"ORD_{datetime.now():%Y%m%d}_{seq:06d}"
+
+
+def test_ids_continue_across_restarts(tmp_path):
+    path = tmp_path / "orders_seq.txt"
+    assert OrderIdGenerator(path).next_ids(2) == [_today(1), _today(2)]
+    assert OrderIdGenerator(path).next_ids() == [_today(3)]
+
+
+def test_sequence_restarts_each_day(tmp_path):
+    generator = OrderIdGenerator(tmp_path / "orders_seq.txt")
+    assert generator.next_ids(2, now=datetime(2026, 3, 1, 23, 59)) == ["ORD_20260301_000001", "ORD_20260301_000002"]
+    assert generator.next_ids(now=datetime(2026, 3, 2)) == ["ORD_20260302_000001"]
+
+
+def test_existing_ids_seed_a_missing_counter_file(tmp_path):
+    existing = [_today(7), _today(41), "ORD_20200101_000900", "legacy-17", None]
+    generator = OrderIdGenerator(tmp_path / "orders_seq.txt", existing)
+    assert generator.next_ids() == [_today(42)]
+
+
+def test_seeded_ids_are_skipped_even_if_the_counter_is_behind(tmp_path):
+    path = tmp_path / "orders_seq.txt"
+    generator = OrderIdGenerator(path)
+    generator.next_ids()
+    generator.seed([_today(10)])
+    assert generator.next_ids() == [_today(11)]
+    # A lower seed never moves the sequence back
+    generator.seed([_today(3)])
+    assert generator.next_ids() == [_today(12)]
+
+
+def test_concurrent_reservations_are_unique(tmp_path):
+    path = tmp_path / "orders_seq.txt"
+    issued = []
+
+    def reserve():
+        generator = OrderIdGenerator(path)
+        for _ in range(50):
+            issued.extend(generator.next_ids(2))
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(issued) == [_today(seq) for seq in range(1, 401)]
+
+
+def test_store_keeps_ids_unique_after_reopening(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    first = sell(store)
+    store.close()
+    # Losing the counter file must not make the reopened store reuse an id
+    os.remove(store.seq_file)
+    reopened = DataStore()
+    try:
+        assert sell(reopened) != first
+    finally:
+        reopened.close()
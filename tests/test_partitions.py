@@ -0,0 +1,109 @@
+import os
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from partitions import period_range
+from store import DataStore, write_frame
+
+def test_order_totals_follow_added_orders(store, sell):
+    store.add_stock("Strip", 5, 5, 100.0, 150.0)
+    assert store.order_totals() == (0.0, 0)
+    first = sell(store, 2)
+    sell(store, 1, price=200)
+    assert store.order_totals() == (500.0, 3)
+
+    # Totals cover every line whatever its status, like the unfiltered table
+    store.process_order_action(first, "CANCELLED")
+    assert store.order_totals() == (500.0, 3)
+
+
+def test_filter_orders_copies_only_matching_lines(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    store.add_stock("Driver", 10, 1, 300.0, 450.0)
+    kept = sell(store)
+    sell(store, 1, "Driver", 10, name="Kamal Silva", phone1="0719876543")
+    cancelled = sell(store)
+    store.process_order_action(cancelled, "CANCELLED")
+
+    assert store.filter_orders(customer="nimal", status="ACTIVE")["order_id"].tolist() == [kept]
+    assert store.filter_orders(product="Driver")["customer_name"].tolist() == ["Kamal Silva"]
+    assert store.filter_orders(datetime(2000, 1, 1), datetime(2000, 2, 1)).empty
+    assert len(store.filter_orders(datetime(2000, 1, 1))) == 3
+
+
+def test_orders_frame_copies_only_the_rows_asked_for(store, sell):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    for _ in range(2):
+        sell(store)
+    rows = store.orders_frame([1])
+    assert rows.index.tolist() == [1]
+    assert rows["order_id"].iloc[0] == store.orders["order_id"].iloc[1]
+
+
+def test_month_periods_are_bounded_by_year():
+    assert period_range("This Month", date(2026, 1, 15)) == (datetime(2026, 1, 1), datetime(2026, 2, 1))
+    assert period_range("Last Month", date(2026, 1, 15)) == (datetime(2025, 12, 1), datetime(2026, 1, 1))
+    assert period_range("All", date(2026, 1, 15)) is None
+
+
+def _legacy_orders(path):
+    """A single legacy orders workbook spanning three months, with text dates and one undated line"""
+    rows = [("ORD_1", "2025-11-30 18:00:00"), ("ORD_2", "12/01/2025 09:00"), ("ORD_3", "2025-12-31 23:59:59"),
+            ("ORD_4", "2026-01-01 00:00:00"), ("ORD_5", "not a date")]
+    write_frame(pd.DataFrame({
+        "order_id": [order_id for order_id, _ in rows], "order_date": [date for _, date in rows],
+        "customer_name": "Nimal Perera", "address": "12 Lake Rd", "phone1": "0771234567", "city": "Kandy",
+        "item_name": "Strip", "length_m": 5, "qty": 1, "total_unit_cost": 100, "total_seller_price": 150,
+    }), path)
+
+
+@pytest.fixture
+def migrated(data_dir):
+    _legacy_orders(data_dir / "orders.xlsx")
+    store = DataStore()
+    yield store
+    store.close()
+
+
+def test_legacy_orders_are_split_into_month_partitions_once(migrated, data_dir):
+    assert sorted(os.listdir(data_dir / "orders")) == ["2025-11.xlsx", "2025-12.xlsx", "2026-01.xlsx", "undated.xlsx"]
+    assert not (data_dir / "orders.xlsx").exists() and (data_dir / "orders.migrated.xlsx").exists()
+    migrated.close()
+
+    # A legacy workbook that turns up again is not imported a second time
+    _legacy_orders(data_dir / "orders.xlsx")
+    reopened = DataStore()
+    try:
+        assert sorted(reopened.orders["order_id"]) == ["ORD_1", "ORD_2", "ORD_3", "ORD_4", "ORD_5"]
+    finally:
+        reopened.close()
+
+
+def test_orders_between_reads_only_the_range(migrated):
+    december = migrated.orders_between(datetime(2025, 12, 1), datetime(2026, 1, 1))
+    assert december["order_id"].tolist() == ["ORD_2", "ORD_3"]
+    assert migrated.orders_between(datetime(2025, 12, 31, 23, 59, 59))["order_id"].tolist() == ["ORD_3", "ORD_4"]
+    assert migrated.orders_between(end=datetime(2025, 12, 1))["order_id"].tolist() == ["ORD_1"]
+    # Undated lines are in no date range
+    assert "ORD_5" not in migrated.orders_between()["order_id"].tolist()
+
+
+def test_latest_orders_come_newest_first(migrated):
+    assert migrated.latest_orders(3)["order_id"].tolist() == ["ORD_4", "ORD_3", "ORD_2"]
+    assert migrated.latest_orders(10)["order_id"].tolist() == ["ORD_4", "ORD_3", "ORD_2", "ORD_1", "ORD_5"]
+
+
+def test_saving_a_new_order_rewrites_only_its_month(migrated, sell, monkeypatch):
+    written = []
+    write = migrated.partitions.write
+
+    def recording_write(key, df, writer):
+        written.append(key)
+        write(key, df, writer)
+
+    monkeypatch.setattr(migrated.partitions, "write", recording_write)
+    migrated.add_stock("Strip", 5, 1, 100.0, 150.0)
+    sell(migrated)
+    assert written == [int(datetime.now().strftime("%Y%m"))]
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from pivot import BLANK_LABEL, TOTAL, UNDATED_LABEL, PivotEngine, pivot, typed_frame
+
+
+def _orders():
+    return pd.DataFrame({
+        "order_date": pd.to_datetime(["2026-01-05", "2026-01-20", "2026-02-01", None]),
+        "item_name": ["Strip", "Strip", "Driver", "Strip"],
+        "length_m": [5, 10, 1, 5],
+        "city": ["Kandy", " ", "Galle", "Kandy"],
+        "customer_name": ["Nimal", "Kamal", "Nimal", "Sunil"],
+        "status": ["ACTIVE", "ACTIVE", "CANCELLED", "ACTIVE"],
+        "total_seller_price": [150.0, 300.0, 650.0, 150.0],
+        "total_unit_cost": [100.0, 200.0, 400.0, 100.0],
+        "profit_total": [50.0, 100.0, 250.0, 50.0],
+        "qty": [1, 1, 1, 1],
+    })
+
+
+def test_cross_tab_with_totals():
+    table = pivot(typed_frame("Orders", _orders()), "Orders", ["Product"], "Sales", columns="Status")
+    assert table.columns.tolist() == ["Product", "ACTIVE", "CANCELLED", TOTAL]
+    assert table.set_index("Product").loc["Strip"].tolist() == [600.0, 0.0, 600.0]
+    assert table.iloc[-1].tolist() == [TOTAL, 600.0, 650.0, 1250.0]
+
+
+def test_months_blanks_and_counts_are_labelled():
+    typed = typed_frame("Orders", _orders())
+    months = pivot(typed, "Orders", ["Month"], "Order Lines")
+    assert months["Month"].tolist() == [UNDATED_LABEL, "2026-01", "2026-02", TOTAL]
+    assert months["Order Lines"].tolist() == [1.0, 2.0, 1.0, 4.0]
+    assert BLANK_LABEL in pivot(typed, "Orders", ["City"], "Qty")["City"].tolist()
+
+
+def test_date_range_and_bad_dimensions():
+    typed = typed_frame("Orders", _orders())
+    january = pivot(typed, "Orders", ["Customer"], "Profit", start=datetime(2026, 1, 1), end=datetime(2026, 2, 1))
+    assert january["Customer"].tolist() == ["Kamal", "Nimal", TOTAL]
+    with pytest.raises(ValueError):
+        pivot(typed, "Orders", ["Product"], "Sales", columns="Product")
+    with pytest.raises(ValueError):
+        pivot(typed, "Orders", [], "Sales")
+
+
+def test_engine_converts_new_order_lines_only(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    store.add_stock("Driver", 1, 1, 400.0, 650.0)
+    engine = PivotEngine(store)
+    sell(store)
+    assert engine.pivot("Orders", ["Product"], "Sales")["Sales"].tolist() == [150.0, 150.0]
+
+    sell(store, 1, "Driver", 1, city="Galle")
+    typed = engine.typed("Orders")
+    assert_frame_equal(typed, typed_frame("Orders", store.orders_frame()), check_categorical=False)
+    by_city = engine.pivot("Orders", ["City", "Product"], "Sales")
+    assert by_city.iloc[:-1].values.tolist() == [["Galle", "Driver", 650.0], ["Kandy", "Strip", 150.0]]
+
+
+def test_stock_pivot_follows_sales(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    engine = PivotEngine(store)
+    assert engine.pivot("Stock", ["Status"], "Pieces")["Status"].tolist() == ["IN_STOCK", TOTAL]
+    sell(store, 2)
+    table = engine.pivot("Stock", ["Status"], "Cost Value").set_index("Status")["Cost Value"]
+    assert table.to_dict() == {"IN_STOCK": 100.0, "SOLD": 200.0, TOTAL: 300.0}
@@ -0,0 +1,60 @@
+from result_cache import ResultCache
+
+
+def test_hit_needs_the_same_data_version():
+    cache = ResultCache()
+    cache.put("summary", 1, "figures")
+    assert cache.lookup("summary", 1) == (True, "figures")
+    assert cache.lookup("summary", 2) == (False, None)
+    assert cache.lookup("report", 1) == (False, None)
+
+
+def test_newer_version_drops_older_entries():
+    cache = ResultCache()
+    cache.put("summary", 1, "old")
+    cache.put("report", 2, "new")
+    assert cache.lookup("summary", 1) == (False, None)
+    assert cache.lookup("report", 2) == (True, "new")
+
+
+def test_result_of_outdated_data_is_not_stored():
+    cache = ResultCache()
+    cache.put("summary", 2, "current")
+    cache.put("summary", 1, "computed before the last write")
+    assert cache.lookup("summary", 2) == (True, "current")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(maxsize=2)
+    cache.put("a", 1, "A")
+    cache.put("b", 1, "B")
+    cache.lookup("a", 1)
+    cache.put("c", 1, "C")
+    assert cache.lookup("b", 1) == (False, None)
+    assert cache.lookup("a", 1) == (True, "A") and cache.lookup("c", 1) == (True, "C")
+
+
+def test_get_computes_once_per_version():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get("summary", 1, compute) == 1
+    assert cache.get("summary", 1, compute) == 1
+    assert cache.get("summary", 2, compute) == 2
+
+
+def test_store_writes_bump_the_version(store, sell):
+    versions = [store.version]
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    versions.append(store.version)
+    order_id = sell(store)
+    versions.append(store.version)
+    store.process_order_action(order_id, "CANCELLED")
+    versions.append(store.version)
+    store.undo()
+    versions.append(store.version)
+    assert versions == sorted(set(versions))
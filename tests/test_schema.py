@@ -0,0 +1,88 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from schema import SCHEMA_VERSION, read_version, write_version
+from store import CUSTOMER_DETAILS, DataStore, write_frame
+
+
+def _legacy_files(data_dir):
+    """Unversioned data: text dates and numbers, no statuses, customer details on every order line"""
+    write_frame(pd.DataFrame({
+        "piece_id": ["Strip_5m_1", "Strip_5m_2"], "product_name": "Strip", "length_m": ["5", "5"],
+        "date_added": ["03/05/2025 10:00", "2025-05-04 11:30:00"], "seller_price": ["150", "150"],
+        "unit_cost": ["100", "100"], "profit": ["50", "50"],
+    }), data_dir / "stock.xlsx")
+    write_frame(pd.DataFrame({
+        "order_id": ["ORD_1", "ORD_2"], "order_date": ["2025-06-01 09:00:00", "07/01/2025 10:00"],
+        "customer_name": "Nimal Perera", "address": "12 Lake Rd", "phone1": "0771234567", "city": "Kandy",
+        "item_name": "Strip", "length_m": 5, "qty": 1, "total_unit_cost": "100", "total_seller_price": "150",
+    }), data_dir / "orders.xlsx")
+
+
+def _frames(store):
+    return store.stock.copy(), store.orders.copy(), store.customers.frame()
+
+
+def test_legacy_data_is_upgraded_once(data_dir, monkeypatch):
+    _legacy_files(data_dir)
+    store = DataStore()
+    try:
+        upgraded = _frames(store)
+        assert read_version(store.schema_file) == SCHEMA_VERSION
+        assert store.stock["status"].tolist() == ["IN_STOCK", "IN_STOCK"]
+        assert store.stock["date_added"].dt.month.tolist() == [3, 5] and store.stock["unit_cost"].sum() == 200
+        assert store.orders["status"].tolist() == ["ACTIVE", "ACTIVE"]
+        assert store.orders["customer_id"].nunique() == 1 and len(upgraded[2]) == 1
+        # Every file is rewritten in the current layout
+        on_disk = pd.concat(store.partitions.read(), ignore_index=True)
+        assert on_disk["status"].tolist() == ["ACTIVE", "ACTIVE"] and on_disk["customer_id"].notna().all()
+        assert pd.read_excel(store.stock_file)["status"].tolist() == ["IN_STOCK", "IN_STOCK"]
+    finally:
+        store.close()
+
+    def upgrade(self):
+        raise AssertionError("data already in the current schema was upgraded again")
+
+    monkeypatch.setattr(DataStore, "_upgrade", upgrade)
+    store = DataStore()
+    try:
+        for before, after in zip(upgraded, _frames(store)):
+            assert_frame_equal(after, before, check_dtype=False)
+    finally:
+        store.close()
+
+
+def test_version_2_lines_get_their_customers_details(data_dir, sell):
+    store = DataStore()
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    sell(store)
+    sell(store, city="Galle")
+    store.close()
+
+    # Version 2 saved order lines without their shipping details
+    (key,) = store.partitions.keys()
+    lines = store.partitions.read([key])[0]
+    lines[CUSTOMER_DETAILS] = None
+    write_frame(lines, store.partitions.path(key))
+    write_version(store.schema_file, 2)
+
+    store = DataStore()
+    try:
+        assert read_version(store.schema_file) == SCHEMA_VERSION
+        assert store.orders["customer_name"].tolist() == ["Nimal Perera", "Nimal Perera"]
+        # Lines are given the customer's current details, which the later order updated
+        assert store.orders["city"].tolist() == ["Galle", "Galle"]
+        on_disk = store.partitions.read([key], dtype={"phone1": str})[0]
+        assert on_disk["phone1"].tolist() == ["0771234567", "0771234567"]
+    finally:
+        store.close()
+
+
+@pytest.mark.parametrize("text", ["", "two", "\n"])
+def test_unreadable_version_counts_as_legacy(tmp_path, text):
+    path = tmp_path / "schema_version.txt"
+    path.write_text(text, encoding="utf-8")
+    assert read_version(path) == 1
+    write_version(path)
+    assert read_version(path) == SCHEMA_VERSION
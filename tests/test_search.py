@@ -0,0 +1,54 @@
+import pandas as pd
+
+from backup import BackupSet
+from search import OrderSearchIndex
+
+
+def _lines(*rows):
+    return pd.DataFrame(rows, columns=["order_id", "customer_name", "phone1", "phone2", "address", "city"])
+
+
+def test_every_word_must_prefix_a_token():
+    index = OrderSearchIndex()
+    index.add(_lines(("ORD_1", "Nimal Perera", "077 123 4567", None, "12 Lake Rd", "Kandy"),
+                     ("ORD_2", "Kamal Perera", "0719876543", "", "3 Hill St", "Galle")), 0)
+    assert index.search("perera").tolist() == [0, 1]
+    assert index.search("per kand").tolist() == [0]
+    assert index.search("nimal galle").tolist() == []
+    assert index.search("ord_2").tolist() == [1]
+    assert index.search("").tolist() == []
+
+
+def test_phones_match_in_any_format():
+    index = OrderSearchIndex()
+    index.add(_lines(("ORD_1", "Nimal Perera", "077 123 4567", None, "12 Lake Rd", "Kandy")), 0)
+    assert index.search("+94 77 123 4567").tolist() == [0]
+    assert index.search("0771234567").tolist() == [0]
+
+
+def test_rows_are_indexed_once_in_order():
+    index = OrderSearchIndex()
+    line = ("ORD_1", "Nimal Perera", "", "", "", "Kandy")
+    index.add(_lines(line), 0)
+    index.add(_lines(line), 0)  # Already indexed by another thread
+    index.add(_lines(line), 1)
+    assert index.search("nimal").tolist() == [0, 1] and index.rows == 2
+
+
+def test_store_search_follows_new_cancelled_and_restored_orders(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    first = sell(store)
+    assert store.search_orders("nimal")["order_id"].tolist() == [first]
+    backups = BackupSet(store)
+    snapshot = backups.snapshot()
+
+    second = sell(store, name="Kamal Silva", phone1="0719876543", city="Galle")
+    assert store.search_orders("galle")["order_id"].tolist() == [second]
+    store.process_order_action(first, "CANCELLED")
+    assert store.search_orders("nimal kandy")["status"].tolist() == ["CANCELLED"]
+
+    backups.restore(snapshot)
+    assert store.search_orders("galle").empty
+    assert store.search_orders("0771234567")["status"].tolist() == ["ACTIVE"]
+    third = sell(store, name="Kamal Silva", phone1="0719876543", city="Galle")
+    assert store.search_orders("kamal")["order_id"].tolist() == [third]
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+
+from intake import OrderIntake
+from server import MAX_BODY_SIZE, ApiServer
+from store import DataLockedError, DataStore
+
+def test_second_store_on_same_directory_is_refused(store):
+    with pytest.raises(DataLockedError):
+        DataStore()
+
+
+def test_directory_can_be_reopened_after_close(store):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    store.close()
+    reopened = DataStore()
+    try:
+        assert reopened.available_count("Strip", 5) == 2
+    finally:
+        reopened.close()
+
+
+def _status(store, raw):
+    """Send one raw HTTP request to a fresh server and return the response status code"""
+    async def run():
+        server = ApiServer(store, port=0)
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        writer.close()
+        await server.close()
+        return status
+    return asyncio.run(run())
+
+
+def _post(body, length=None):
+    length = len(body) if length is None else length
+    return f"POST /orders HTTP/1.1\r\nContent-Length: {length}\r\nConnection: close\r\n\r\n".encode() + body
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length_is_rejected(store, length):
+    assert _status(store, _post(b"", length)) == 400
+
+
+def test_oversized_body_is_rejected(store):
+    assert _status(store, _post(b"", MAX_BODY_SIZE + 1)) == 413
+
+
+@pytest.mark.parametrize("body", [b"[1, 2]", b"42", b'"order"', b"{not json"])
+def test_body_must_be_a_json_object(store, body):
+    assert _status(store, _post(body)) == 400
+
+
+def test_order_is_placed(store, customer):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    body = json.dumps({"customer": customer, "items": [{"product": "Strip", "length": 5, "qty": 1}]})
+    assert _status(store, _post(body.encode())) == 201
+    assert store.available_count("Strip", 5) == 1
+
+
+def test_close_answers_queued_orders_and_idle_connections(store, customer):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    body = json.dumps({"customer": customer, "items": [{"product": "Strip", "length": 5, "qty": 1}]}).encode()
+
+    async def run():
+        # A long window keeps the order queued until the server is closed
+        server = ApiServer(store, port=0, intake=OrderIntake(store, window=30))
+        listener = await server.start()
+        port = listener.sockets[0].getsockname()[1]
+        idle_reader, _ = await asyncio.open_connection("127.0.0.1", port)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"POST /orders HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+        await asyncio.sleep(0.2)
+        await asyncio.wait_for(server.close(), 10)
+        return int((await reader.readline()).split()[1]), await idle_reader.read()
+
+    status, idle = asyncio.run(run())
+    assert status == 201 and idle == b""
+    store.close()
+
+    reopened = DataStore()
+    try:
+        assert reopened.available_count("Strip", 5) == 1
+    finally:
+        reopened.close()
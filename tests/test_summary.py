@@ -0,0 +1,149 @@
+import queue
+import threading
+import types
+
+import pytest
+
+import main
+from forecast import DemandForecast
+from metrics import FIELDS
+from result_cache import ResultCache
+
+# Fields of the Stock and Order Analysis sections (the KPI fields are in FIELDS)
+SECTION_FIELDS = ["total_instock", "total_sold", "total_removed", "seller_value", "total_cost", "total_profit",
+                  "total_orders", "cancellation_rate", "return_rate", "success_rate"]
+
+
+class _Var:
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+
+class _Label:
+    def __init__(self):
+        self.foreground = None
+
+    def configure(self, foreground=None):
+        self.foreground = foreground
+
+
+class _Text:
+    def __init__(self):
+        self.text = ""
+
+    def config(self, state=None):
+        pass
+
+    def delete(self, start, end):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text += text
+
+
+@pytest.fixture
+def app(store):
+    """The Summary tab's logic on a StockApp stand-in with plain objects for its widgets (no display needed)"""
+    app = types.SimpleNamespace(store=store, demand_forecast=DemandForecast(store), refreshed_charts=0,
+                                summary_vars={key: _Var() for key in [*FIELDS, *SECTION_FIELDS]},
+                                summary_labels={key: _Label() for key in [*FIELDS, *SECTION_FIELDS]},
+                                summary_insights_text=_Text())
+    for name in ("compute_summary", "show_summary"):
+        setattr(app, name, types.MethodType(getattr(main.StockApp, name), app))
+    app.refresh_trend_chart = lambda: setattr(app, "refreshed_charts", app.refreshed_charts + 1)
+    return app
+
+
+def test_summary_is_computed_without_touching_widgets(app, sell):
+    app.store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    sell(app.store, 2)
+    values, insights = app.compute_summary(None, None, None)
+    assert set(values) >= set(FIELDS) | set(SECTION_FIELDS)
+    assert (values["total_instock"], values["total_sold"], values["total_orders"]) == ("1", "2", "1")
+    assert values["total_revenue"] == "Rs. 300.00"
+    assert insights
+    assert all(var.value is None for var in app.summary_vars.values())
+
+
+def test_showing_a_summary_updates_the_existing_widgets(app, sell):
+    app.store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    widgets = dict(app.summary_vars), dict(app.summary_labels)
+    app.show_summary(*app.compute_summary(None, None, None))
+    sell(app.store)
+    app.show_summary(*app.compute_summary(None, None, None))
+
+    assert (app.summary_vars, app.summary_labels) == widgets
+    assert app.summary_vars["total_sold"].value == "1"
+    assert app.summary_labels["total_profit"].foreground == "green"
+    assert app.summary_insights_text.text.count("\n") == len(app.summary_last[1]) - 1
+    assert app.refreshed_charts == 2
+
+
+def test_filters_narrow_the_summary(app, sell):
+    app.store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    app.store.add_stock("Strip", 10, 2, 200.0, 300.0)
+    sell(app.store, 1, length=10)
+    values, _ = app.compute_summary(None, "Strip", 5)
+    assert (values["total_instock"], values["total_sold"], values["total_orders"]) == ("3", "0", "0")
+
+
+@pytest.fixture
+def worker_app(app):
+    """``app`` with the request/result queues of the Summary worker"""
+    app.summary_requests = queue.Queue()
+    app.summary_results = queue.Queue()
+    app.result_cache = ResultCache()
+    app.summary_status_var = _Var()
+    app.summary_generation = 0
+    app.scheduled = []
+    app.after = lambda delay, func: app.scheduled.append(func)
+    app.shown = []
+    app.show_summary = lambda values, insights: app.shown.append(values)
+    for name in ("summary_worker", "poll_summary"):
+        setattr(app, name, types.MethodType(getattr(main.StockApp, name), app))
+    return app
+
+
+def test_worker_skips_superseded_requests(worker_app):
+    computed = []
+    worker_app.compute_summary = lambda *filters: computed.append(filters) or ({}, [])
+    for generation, product in enumerate(["A", "B", "C"], 1):
+        worker_app.summary_requests.put((generation, (None, product, None)))
+    threading.Thread(target=worker_app.summary_worker, daemon=True).start()
+
+    assert worker_app.summary_results.get(timeout=5)[0] == 3
+    assert computed == [(None, "C", None)]
+
+
+def test_worker_reuses_results_of_unchanged_data(worker_app):
+    computed = []
+    worker_app.compute_summary = lambda *filters: computed.append(filters) or ({}, [])
+    threading.Thread(target=worker_app.summary_worker, daemon=True).start()
+    for generation in (1, 2):
+        worker_app.summary_requests.put((generation, (None, None, None)))
+        assert worker_app.summary_results.get(timeout=5)[0] == generation
+    assert len(computed) == 1
+
+
+def test_poll_shows_only_the_newest_result(worker_app):
+    worker_app.summary_generation = 2
+    worker_app.summary_results.put((1, ({"total_sold": "old"}, [])))
+    worker_app.poll_summary()
+    assert worker_app.shown == [] and len(worker_app.scheduled) == 1
+
+    worker_app.summary_results.put((2, ({"total_sold": "new"}, [])))
+    worker_app.scheduled.pop()()
+    assert worker_app.shown == [{"total_sold": "new"}]
+    assert worker_app.scheduled == [] and not worker_app.summary_polling
+
+
+def test_poll_reports_a_failed_summary(worker_app, monkeypatch):
+    errors = []
+    monkeypatch.setattr(main.messagebox, "showerror", lambda title, message: errors.append(message))
+    worker_app.summary_generation = 1
+    worker_app.summary_results.put((1, ValueError("bad filter")))
+    worker_app.poll_summary()
+    assert errors == ["Summary error: bad filter"] and worker_app.shown == []
@@ -0,0 +1,39 @@
+import types
+
+import numpy as np
+import pandas as pd
+
+import main
+from result_cache import ResultCache
+from table_sort import column_order, sort_view, sorted_positions
+
+
+def test_text_sorts_case_insensitively_with_missing_last():
+    positions, valid = column_order(["banana", None, "Apple", "cherry", np.nan, "apple"])
+    assert positions.tolist()[:valid] == [2, 5, 0, 3]  # Equal keys keep their row order
+    assert sorted(positions.tolist()[valid:]) == [1, 4]
+
+
+def test_descending_keeps_missing_values_last():
+    order = column_order([3.0, np.nan, 1.0, 2.0])
+    assert sorted_positions(order).tolist() == [2, 3, 0, 1]
+    assert sorted_positions(order, descending=True).tolist() == [0, 3, 2, 1]
+
+
+def test_filtered_view_is_put_in_column_order():
+    frame = pd.DataFrame({"price": [30.0, 10.0, 50.0, 20.0, 40.0]})
+    order = column_order(frame["price"])
+    view = frame[frame["price"] != 20.0]
+    assert sort_view(view, order)["price"].tolist() == [10.0, 30.0, 40.0, 50.0]
+    assert sort_view(view, order, descending=True, limit=2).index.tolist() == [2, 4]
+
+
+def test_whole_orders_table_is_sorted_without_copying_it(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    ids = [sell(store, 1, price=price) for price in (200, 100, 300)]
+    app = types.SimpleNamespace(store=store, result_cache=ResultCache(),
+                                table_sort={"orders": ("total_seller_price", True)})
+    sorted_rows = types.MethodType(main.StockApp.sorted_rows, app)
+    assert sorted_rows("orders", None, 2)["order_id"].tolist() == [ids[2], ids[0]]
+    view = store.orders_frame().iloc[:2]
+    assert sorted_rows("orders", view)["order_id"].tolist() == [ids[0], ids[1]]
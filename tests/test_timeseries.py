@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from store import DataStore
+from timeseries import SERIES, DailyArrays, TrendSeries
+
+
+def test_daily_arrays_grow_to_cover_earlier_and_later_days():
+    arrays = DailyArrays(1)
+    day = np.datetime64("2026-06-10")
+    arrays.add(np.array([day]), np.array([[2.0]]))
+    arrays.add(np.array([day - 2, day + 1, day]), np.array([[1.0, 4.0, 3.0]]))
+    assert arrays.origin == day - 2
+    assert arrays.values.tolist() == [[1.0, 0.0, 5.0, 4.0]]
+
+
+def _reopen_backdated(store, days):
+    """Move every stock and order date ``days`` back and reload, so the snapshot history is rebuilt"""
+    shift = pd.Timedelta(days=days)
+    stock = store.stock.assign(date_added=store.stock["date_added"] - shift,
+                               sold_date=store.stock["sold_date"] - shift)
+    orders = store.orders.assign(order_date=store.orders["order_date"] - shift)
+    store.replace(stock, orders, store.customers.frame())
+    store.close()
+    os.remove(store.history.path)
+    return DataStore()
+
+
+def test_series_run_from_the_first_day_to_the_live_total_today(data_dir, sell):
+    store = DataStore()
+    store.add_stock("Strip", 5, 4, 100.0, 150.0)
+    sell(store, 1, price=160.0)
+    store = _reopen_backdated(store, 2)
+    try:
+        sell(store, 1, price=170.0)
+        days, series = TrendSeries(store).series()
+        assert days[-1] == np.datetime64("today") and len(days) == 3
+        assert sorted(series) == sorted(SERIES)
+        assert series["Stock Level"].tolist() == [3, 3, 2]
+        assert series["Stock Cost"].tolist() == [300, 300, 200]
+        assert series["Daily Revenue"].tolist() == [160, 0, 170]
+        assert series["Cumulative Profit"].tolist() == [60, 60, 130]
+    finally:
+        store.close()
+
+
+def test_incremental_series_match_a_rebuild(data_dir, sell):
+    store = DataStore()
+    store.add_stock("Strip", 5, 6, 100.0, 150.0)
+    sell(store, 2)
+    store = _reopen_backdated(store, 3)
+    try:
+        trends = TrendSeries(store)
+        trends.series()
+        order_id = sell(store, 1)
+        store.add_stock("Driver", 1, 2, 500.0, 800.0)
+        for change in (None, lambda: store.process_order_action(order_id, "RETURNED")):
+            if change:
+                change()
+            days, series = trends.series()
+            fresh_days, fresh = TrendSeries(store).series()
+            assert (days == fresh_days).all()
+            for name in SERIES:
+                np.testing.assert_allclose(series[name], fresh[name])
+        assert series["Stock Level"].tolist() == [4, 4, 4, 6]
+        assert series["Cumulative Revenue"][-1] == 300
+    finally:
+        store.close()
@@ -0,0 +1,60 @@
+import pytest
+
+from pivot import TOTAL, PivotEngine
+from store import DataStore, OrderError
+from undo import VOIDED
+
+def _sales(engine):
+    table = engine.pivot("Orders", ["Product"], "Sales")
+    return table.loc[table["Product"] == TOTAL, "Sales"].iloc[0]
+
+
+def test_undone_order_is_voided_and_left_out_of_totals(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    engine = PivotEngine(store)
+    order_id = sell(store, 2)
+    assert _sales(engine) == 300.0
+
+    assert store.undo() == f"Place order {order_id}"
+    assert store.get_order(order_id)["status"].tolist() == [VOIDED]
+    assert store.available_count("Strip", 5) == 3
+    assert store.summary_metrics()["orders"] == 0
+    assert _sales(engine) == 0.0
+
+    with pytest.raises(OrderError):
+        store.process_order_action(order_id, "CANCELLED")
+
+
+def test_redo_restores_the_order(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    order_id = sell(store, 2)
+    before = store.stock_frame(), store.orders_frame()
+    store.undo()
+    store.redo()
+    assert store.stock_frame().equals(before[0])
+    assert store.orders_frame().equals(before[1])
+    assert store.summary_metrics()["active_orders"] == 1
+    assert store.get_order(order_id)["status"].tolist() == ["ACTIVE"]
+
+
+def test_undone_stock_addition_is_voided_everywhere(store):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    store.undo()
+    assert (store.stock["status"] == VOIDED).all()
+    assert store.available_count("Strip", 5) == 0
+    table = PivotEngine(store).pivot("Stock", ["Product"], "Pieces")
+    assert table["Product"].tolist() == [TOTAL]
+    assert table["Pieces"].sum() == 0
+
+
+def test_voiding_is_saved(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    order_id = sell(store)
+    store.undo()
+    store.close()
+    reopened = DataStore()
+    try:
+        assert reopened.get_order(order_id)["status"].tolist() == [VOIDED]
+        assert reopened.available_count("Strip", 5) == 3
+    finally:
+        reopened.close()
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from store import DataStore, write_frame
+from valuation import InventoryHistory
+
+
+def _stock():
+    # Three pieces added on 1 March; one sold on 3 March and one removed
+    return pd.DataFrame({
+        "product_name": "Strip", "length_m": 5,
+        "date_added": pd.to_datetime(["2026-03-01 09:00"] * 3),
+        "sold_date": pd.to_datetime([pd.NaT, "2026-03-03 15:00", pd.NaT]),
+        "unit_cost": [100.0, 100.0, np.nan], "seller_price": 150.0,
+        "status": ["IN_STOCK", "SOLD", "REMOVED"],
+    })
+
+
+def _pieces(snapshot):
+    return dict(zip(snapshot["status"], snapshot["pieces"]))
+
+
+def test_history_is_rebuilt_from_added_and_sold_dates(tmp_path):
+    history = InventoryHistory(tmp_path / "stock_snapshots.csv")
+    history.load(_stock())
+    assert history.as_of("2026-02-28").empty
+    assert _pieces(history.as_of("2026-03-02")) == {"IN_STOCK": 2, "REMOVED": 1}
+    march_3 = history.as_of("2026-03-03")
+    assert _pieces(march_3) == {"IN_STOCK": 1, "REMOVED": 1, "SOLD": 1}
+    # A piece without a cost is counted at zero cost
+    assert march_3.set_index("status").loc["REMOVED", "cost_value"] == 0.0
+
+
+def test_snapshots_survive_a_reload(tmp_path):
+    path = tmp_path / "stock_snapshots.csv"
+    history = InventoryHistory(path)
+    history.load(_stock())
+    before = history.as_of("2026-03-02")
+    reloaded = InventoryHistory(path)
+    reloaded.load(_stock())
+    pd.testing.assert_frame_equal(reloaded.as_of("2026-03-02"), before)
+
+
+def test_store_writes_are_recorded_for_today(store, sell):
+    store.add_stock("Strip", 5, 3, 100.0, 150.0)
+    sell(store, 2)
+    today = store.inventory_as_of(datetime.now())
+    assert _pieces(today) == {"IN_STOCK": 1, "SOLD": 2}
+    assert today.set_index("status").loc["SOLD", "sell_value"] == 300.0
+    assert store.inventory_as_of(datetime.now() - timedelta(days=1)).empty
+    assert _pieces(store.inventory_as_of(datetime.now(), product="Driver")) == {}
+    store.close()
+
+    reopened = DataStore()
+    try:
+        assert _pieces(reopened.inventory_as_of(datetime.now())) == {"IN_STOCK": 1, "SOLD": 2}
+    finally:
+        reopened.close()
+
+
+def test_changes_made_outside_the_app_are_picked_up(store):
+    store.add_stock("Strip", 5, 2, 100.0, 150.0)
+    store.close()
+    # The workbook is edited by hand: one piece is marked REMOVED
+    stock = pd.read_excel(store.stock_file)
+    stock.loc[0, "status"] = "REMOVED"
+    write_frame(stock, store.stock_file)
+
+    reopened = DataStore()
+    try:
+        assert _pieces(reopened.inventory_as_of(datetime.now())) == {"IN_STOCK": 1, "REMOVED": 1}
+    finally:
+        reopened.close()
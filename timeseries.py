@@ -0,0 +1,146 @@
+"""Daily trend series for the Summary tab charts.
+
+Every series is a dense array with one value per day from the first day on
+record to today, so ten years of a series take about 30 KB.  Daily changes
+are kept and folded in incrementally:
+
+* stock: the valuation snapshot table (see valuation.py) records each
+  (product, length, status) total whenever it changes, so the change of the
+  IN_STOCK totals per day is added as new snapshot rows appear.  Today's
+  point is the live running total.
+* orders: revenue and profit of ACTIVE order lines per order day.  New
+  order lines are added on their own; a cancel/return or reload rebuilds.
+
+Levels are cumulative sums of the daily changes, computed once per data
+version, so charts can zoom and pan over any range by slicing.
+
+``TrendSeries`` assumes the store's ``history.table`` is append-only and only
+reads the rows after those it has folded in.  The table is rewritten when the
+store installs new data (load, ``replace()`` on restore, ``_upgrade``); that
+also bumps ``store.order_edits``, which makes the series rebuild from scratch.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from valuation import KEY, VALUES
+
+STOCK_SERIES = ["Stock Level", "Stock Value", "Stock Cost"]  # From pieces, sell_value, cost_value
+ORDER_SERIES = ["Daily Revenue", "Daily Profit"]
+SERIES = STOCK_SERIES + ORDER_SERIES + ["Cumulative Revenue", "Cumulative Profit"]
+MONEY_SERIES = set(SERIES) - {"Stock Level"}
+
+_STOCK_VALUES = ["pieces", "sell_value", "cost_value"]
+
+
+def _days(dates):
+    return dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+
+class DailyArrays:
+    """Per-day sums of a few quantities, as dense arrays that grow to cover new days"""
+
+    def __init__(self, width):
+        self.width = width
+        self.origin = None
+        self.values = np.zeros((width, 0))
+
+    def add(self, days, values):
+        """Add ``values`` (width x n) to the given ``days`` (datetime64[D], n)"""
+        if not len(days):
+            return
+        self.cover(days.min(), days.max())
+        np.add.at(self.values, (slice(None), (days - self.origin).astype(np.int64)), values)
+
+    def cover(self, first, last):
+        """Extend the arrays so they span ``first`` to ``last``"""
+        if self.origin is None:
+            self.origin = first
+        if first < self.origin:
+            pad = int((self.origin - first).astype(np.int64))
+            self.values = np.pad(self.values, ((0, 0), (pad, 0)))
+            self.origin = first
+        end = int((last - self.origin).astype(np.int64)) + 1
+        if end > self.values.shape[1]:
+            self.values = np.pad(self.values, ((0, 0), (0, end - self.values.shape[1])))
+
+
+class TrendSeries:
+    """Daily stock and sales series for a DataStore, refreshed incrementally"""
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self._edits = None
+        self._key = None
+        self._series = None
+
+    def _reset(self):
+        self.stock = DailyArrays(len(_STOCK_VALUES))
+        self.sales = DailyArrays(len(ORDER_SERIES))
+        self._snapshot_rows = 0
+        self._order_rows = 0
+        self._last = pd.DataFrame(columns=VALUES, index=pd.MultiIndex.from_tuples([], names=KEY), dtype=float)
+
+    def _add_snapshots(self, rows):
+        """Fold in snapshot rows: each row's change from the previous total of its combination"""
+        rows = rows[rows["status"] == "IN_STOCK"]
+        if rows.empty:
+            return
+        rows = rows.set_index(KEY)
+        totals = rows[VALUES].astype(float)
+        previous = totals.groupby(level=KEY).shift(1)
+        first = previous[VALUES[0]].isna()
+        previous.loc[first.to_numpy()] = self._last.reindex(previous.index[first]).fillna(0).to_numpy()
+        changes = (totals - previous)[_STOCK_VALUES].to_numpy().T
+        self.stock.add(_days(rows["date"]), changes)
+
+        latest = totals.groupby(level=KEY).last()
+        self._last = pd.concat([self._last.drop(latest.index, errors="ignore"), latest])
+
+    def _add_orders(self, orders):
+        active = orders[(orders["status"] == "ACTIVE") & orders["order_date"].notna()]
+        values = active[["total_seller_price", "profit_total"]].fillna(0).to_numpy(dtype=float).T
+        self.sales.add(_days(active["order_date"]), values)
+
+    def series(self, today=None):
+        """``(days, {name: values})`` for SERIES; ``days`` runs from the first recorded day to today"""
+        today = np.datetime64(pd.Timestamp.now() if today is None else pd.Timestamp(today), "D")
+        store = self.store
+        with self.lock, store.lock:
+            key = (store.version, today)
+            if key == self._key:
+                return self._series
+
+            history = store.history
+            if store.order_edits != self._edits or len(store.orders) < self._order_rows:
+                self._reset()
+                self._edits = store.order_edits
+            past = history.table[history.table["date"] < pd.Timestamp(today)]
+            self._add_snapshots(past.iloc[self._snapshot_rows:])
+            self._snapshot_rows = len(past)
+            self._add_orders(store.orders.iloc[self._order_rows:])
+            self._order_rows = len(store.orders)
+
+            current = np.zeros(len(_STOCK_VALUES))
+            for (_, _, status), values in history.current.items():
+                if status == "IN_STOCK":
+                    current += np.asarray(values)[[VALUES.index(name) for name in _STOCK_VALUES]]
+
+            self.stock.cover(today, today)
+            self.sales.cover(self.stock.origin, today)
+            self.stock.cover(self.sales.origin, self.sales.origin + self.sales.values.shape[1] - 1)
+            origin = self.stock.origin
+            stock = np.cumsum(self.stock.values, axis=1)
+            stock[:, (today - origin).astype(np.int64):] = current[:, None]  # Today (and later) is the live total
+            sales = self.sales.values
+
+        series = dict(zip(STOCK_SERIES, stock))
+        series.update(zip(ORDER_SERIES, sales.copy()))
+        series["Cumulative Revenue"] = np.cumsum(sales[0])
+        series["Cumulative Profit"] = np.cumsum(sales[1])
+        days = origin + np.arange(stock.shape[1])
+        self._key = key
+        self._series = (days, series)
+        return self._series
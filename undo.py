@@ -0,0 +1,54 @@
+"""Undo/redo of stock and order writes.
+
+Every write to the store is recorded as the rows it touched, with the values
+of the columns it can change as they were before and after the write.
+Undoing puts the "before" values back and redoing puts the "after" values
+back, so either costs about as much as the write itself and nothing is read
+from disk.
+
+Rows a write appended (new stock pieces, the lines of a placed order) are not
+deleted on undo, since row positions are what the partition, search and
+queue indexes point at.  Their "before" state is the VOIDED status instead:
+voided pieces and order lines are kept in the files but left out of stock
+counts, order totals and allocation.
+"""
+from collections import deque
+
+VOIDED = "VOIDED"
+
+# Columns a write can change; everything else about a row is fixed once it exists
+STOCK_FIELDS = ["status", "sold_date", "order_id", "seller_price", "profit"]
+ORDER_FIELDS = ["status", "profit_total"]
+
+UNDO_LIMIT = 100
+
+
+class Change:
+    """One recorded write: the touched rows of each table before and after, indexed by row label"""
+
+    def __init__(self, label, stock_before, stock_after, order_before, order_after):
+        self.label = label
+        self.stock = {"before": stock_before, "after": stock_after}
+        self.orders = {"before": order_before, "after": order_after}
+
+
+class UndoHistory:
+    """Undo and redo stacks of ``Change`` records, the oldest dropped past ``limit``"""
+
+    def __init__(self, limit=UNDO_LIMIT):
+        self.done = deque(maxlen=limit)
+        self.undone = []
+
+    def record(self, change):
+        self.done.append(change)
+        self.undone = []
+
+    def clear(self):
+        self.done.clear()
+        self.undone = []
+
+    def undo_label(self):
+        return self.done[-1].label if self.done else None
+
+    def redo_label(self):
+        return self.undone[-1].label if self.undone else None
@@ -0,0 +1,154 @@
+"""Daily inventory valuation snapshots for as-of queries.
+
+The snapshot table holds, per (product, length, status), the number of
+pieces and their cost and sell value at the end of every day on which that
+combination changed.  The table is sparse, so the state on any date is the
+last row of each combination up to that date.
+
+The first load rebuilds the history from ``date_added`` / ``sold_date``.
+After that, every stock write adjusts running totals in place, and each save
+appends that day's changed totals to a CSV log next to the stock workbook.
+A later line for the same day and combination replaces an earlier one.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+KEY = ["product_name", "length_m", "status"]
+VALUES = ["pieces", "cost_value", "sell_value"]
+SNAPSHOT_COLUMNS = ["date"] + KEY + VALUES
+
+
+def _today():
+    return pd.Timestamp(datetime.now().date())
+
+
+def _rows(df):
+    """``(key, values)`` pairs for every priced stock row of ``df``"""
+    df = df.dropna(subset=["product_name", "length_m"])
+    cost = df["unit_cost"].fillna(0).tolist()
+    sell = df["seller_price"].fillna(0).tolist()
+    keys = zip(df["product_name"], df["length_m"].astype(int), df["status"])
+    return [(key, (1, c, s)) for key, c, s in zip(keys, cost, sell)]
+
+
+def _totals(df):
+    """Current totals per (product, length, status) as a dict of arrays"""
+    df = df.dropna(subset=["product_name", "length_m"])
+    grouped = pd.DataFrame({"product_name": df["product_name"], "length_m": df["length_m"].astype(int),
+                            "status": df["status"], "pieces": 1, "cost_value": df["unit_cost"].fillna(0),
+                            "sell_value": df["seller_price"].fillna(0)}).groupby(KEY)[VALUES].sum()
+    return {key: values.astype(float) for key, values in zip(grouped.index, grouped.to_numpy())}
+
+
+def backfill(df_stock):
+    """Snapshot rows rebuilt from each piece's ``date_added`` and ``sold_date``.
+
+    Pieces are IN_STOCK from the day they were added and SOLD from their
+    sold date on.  REMOVED pieces carry no removal date, so they count as
+    REMOVED from the day they were added.
+    """
+    df = df_stock.dropna(subset=["product_name", "length_m", "date_added"])
+    added = df["date_added"].dt.normalize()
+    sold_on = df["sold_date"].dt.normalize().where(lambda d: d >= added, added)
+    sold = (df["status"] == "SOLD") & df["sold_date"].notna()
+    first_status = df["status"].where(~sold, "IN_STOCK")
+
+    base = pd.DataFrame({"product_name": df["product_name"], "length_m": df["length_m"].astype(int),
+                         "cost_value": df["unit_cost"].fillna(0), "sell_value": df["seller_price"].fillna(0)})
+    events = pd.concat([
+        base.assign(date=added, status=first_status, sign=1),
+        base[sold].assign(date=sold_on[sold], status="IN_STOCK", sign=-1),
+        base[sold].assign(date=sold_on[sold], status="SOLD", sign=1),
+    ], ignore_index=True)
+    events["pieces"] = events["sign"]
+    events["cost_value"] *= events["sign"]
+    events["sell_value"] *= events["sign"]
+
+    daily = events.groupby(KEY + ["date"])[VALUES].sum().reset_index()
+    daily[VALUES] = daily.groupby(KEY)[VALUES].cumsum()
+    return daily.sort_values("date", kind="stable")[SNAPSHOT_COLUMNS].reset_index(drop=True)
+
+
+class InventoryHistory:
+    """Running valuation totals plus the daily snapshot table kept in ``path``"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self, df_stock):
+        """Read (or on first use rebuild) the snapshot table and sync it with ``df_stock``"""
+        if os.path.exists(self.path):
+            table = pd.read_csv(self.path, parse_dates=["date"], dtype={"product_name": str, "status": str})
+            table = table.drop_duplicates(["date"] + KEY, keep="last").sort_values("date", kind="stable")
+        else:
+            table = backfill(df_stock)
+            table.to_csv(self.path, index=False, date_format="%Y-%m-%d")
+
+        self.day = _today()
+        past = table["date"] < self.day
+        self.table = table[past].reset_index(drop=True)
+        self.day_rows = {tuple(key): np.array(values, dtype=float)
+                         for key, values in zip(table.loc[~past, KEY].itertuples(index=False, name=None),
+                                                table.loc[~past, VALUES].to_numpy())}
+
+        self.current = _totals(df_stock)
+
+        # Anything that changed outside the app since the last recorded snapshot
+        recorded = self._latest()
+        self._dirty = {key for key in set(self.current) | set(recorded)
+                       if not np.allclose(self.current.get(key, 0), recorded.get(key, 0))}
+
+    def apply(self, before, after):
+        """Move stock rows from their ``before`` to their ``after`` state (either may be None)"""
+        for frame, sign in ((before, -1), (after, 1)):
+            if frame is None or frame.empty:
+                continue
+            for key, values in _rows(frame):
+                totals = self.current.setdefault(key, np.zeros(3))
+                totals += np.multiply(values, sign)
+                self._dirty.add(key)
+
+    def flush(self):
+        """Record today's totals for the changed combinations and append them to the log"""
+        day = _today()
+        if day != self.day:
+            if self.day_rows:
+                rolled = pd.DataFrame([(self.day,) + key + tuple(values) for key, values in self.day_rows.items()],
+                                      columns=SNAPSHOT_COLUMNS)
+                self.table = pd.concat([self.table, rolled], ignore_index=True)
+            self.day = day
+            self.day_rows = {}
+        if not self._dirty:
+            return
+
+        for key in self._dirty:
+            self.day_rows[key] = self.current.get(key, np.zeros(3)).copy()
+        rows = pd.DataFrame([(day,) + key + tuple(self.day_rows[key]) for key in self._dirty],
+                            columns=SNAPSHOT_COLUMNS)
+        rows["pieces"] = rows["pieces"].round().astype(int)
+        self._dirty = set()
+        rows.to_csv(self.path, mode="a", header=not os.path.exists(self.path), index=False,
+                    date_format="%Y-%m-%d")
+
+    def _latest(self):
+        latest = {key: values for key, values in
+                  zip(self.table[KEY].itertuples(index=False, name=None), self.table[VALUES].to_numpy())}
+        latest.update(self.day_rows)
+        return latest
+
+    def as_of(self, date):
+        """Pieces, cost and sell value per (product, length, status) at the end of ``date``"""
+        date = pd.Timestamp(date).normalize()
+        if date >= self.day:
+            snapshot = pd.DataFrame([key + tuple(values) for key, values in self.current.items()],
+                                    columns=KEY + VALUES)
+        else:
+            end = self.table["date"].searchsorted(date, side="right")
+            snapshot = self.table.iloc[:end].drop_duplicates(KEY, keep="last")[KEY + VALUES]
+
+        snapshot = snapshot[snapshot["pieces"] > 0].copy()
+        snapshot["pieces"] = snapshot["pieces"].round().astype(int)
+        return snapshot.sort_values(KEY).reset_index(drop=True)